@@ -0,0 +1,69 @@
+# bench_imports.py
+"""
+Import-time guard for the cron entry points.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter,
+prints the slowest imports and fails when a heavy package leaks into
+module load again or the total goes over budget.
+
+Usage:
+    python bench_imports.py [--module score_tracker] [--budget-ms 150] [--runs 5]
+"""
+import sys
+import argparse
+import subprocess
+
+# Heavy packages the tracker must only import on the paths that need them
+FORBIDDEN = {
+    "score_tracker": ["pandas", "numpy", "pyarrow", "espn_api"],
+}
+
+
+def import_times(module):
+    """{module: (self_us, cumulative_us)} from one cold interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cum_us))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark for CLI entry points")
+    parser.add_argument("--module", default="score_tracker")
+    parser.add_argument("--budget-ms", type=float, default=150.0,
+                        help="fail if the median cumulative import time exceeds this")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    totals = sorted(r[args.module][1] / 1000 for r in runs)
+    median = totals[len(totals) // 2]
+
+    last = runs[-1]
+    print(f"[info] slowest imports of {args.module} (cumulative, last run):")
+    for name, (self_us, cum_us) in sorted(last.items(), key=lambda kv: -kv[1][1])[:args.top]:
+        print(f"  {cum_us / 1000:8.1f} ms  {name}")
+    print(f"[info] {args.module}: median {median:.1f} ms over {args.runs} runs "
+          f"(min {totals[0]:.1f}, max {totals[-1]:.1f}, budget {args.budget_ms:.0f})")
+
+    failed = False
+    leaked = [m for m in FORBIDDEN.get(args.module, []) if m in last]
+    if leaked:
+        print(f"[FAIL] heavy modules imported at load time: {', '.join(leaked)}")
+        failed = True
+    if median > args.budget_ms:
+        print(f"[FAIL] import time {median:.1f} ms is over the {args.budget_ms:.0f} ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
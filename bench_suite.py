@@ -0,0 +1,342 @@
+# bench_suite.py
+"""
+Offline benchmarks for the tracker and scraper hot paths.
+
+The inputs shipped with the repo are synthetic: no ESPN responses are
+recorded in bench_fixtures/espn/, and the FantasyCast pages in
+bench_fixtures/fantasycast/ are hand-written stand-ins (see the README
+there). The numbers compare our code paths between commits; they say
+nothing about ESPN's latency or page weight. Case names carry the input
+they ran on ([fake], [synthetic], [recorded], [custom html]) so results
+from different inputs are never compared with each other.
+
+    fetch    fetch_matchup_rows() against recorded ESPN responses in
+             bench_fixtures/espn/ (see `record`), or a FakeLeague with
+             --latency when nothing has been recorded yet
+    write    score_tracker.write_rows() and the plain CTW CSV append, in a
+             scratch directory
+    scrape   extract_state / list_pills / activate_pill (what scrapewp_ci's
+             get_current_team_names, get_ctw_percents and activate_pill_by_id
+             run) against saved FantasyCast HTML served from a local HTTP
+             server; needs Chrome, skipped otherwise
+
+Each case reports p50/p90/p99 latency and throughput; --json saves the
+results so two commits can be compared with `compare`.
+
+Usage:
+    python bench_suite.py [fetch write scrape http] [--reps 50] [--json out.json]
+    python bench_suite.py record [--weeks 1 2 3]      # needs ESPN credentials
+    python bench_suite.py compare before.json after.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import contextlib
+import threading
+import functools
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIXTURE_DIR = os.path.join(SCRIPT_DIR, "bench_fixtures")
+ESPN_FIXTURES = os.path.join(FIXTURE_DIR, "espn")
+HTML_FIXTURES = os.path.join(FIXTURE_DIR, "fantasycast")
+LEAGUE_ID = 31028552
+
+
+# ----------- timing -----------
+def _percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def measure(name, fn, reps, warmup=1, items=1, quiet=False):
+    """
+    Run fn reps times; items is how many units (rows, matchups) one call
+    handles. quiet swallows the [DEBUG] prints of the code under test.
+    """
+    samples = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull if quiet else sys.stdout):
+        for _ in range(warmup):
+            fn()
+        for _ in range(reps):
+            start = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - start)
+    samples.sort()
+    total = sum(samples)
+    result = {
+        "name": name, "reps": reps,
+        "p50_ms": _percentile(samples, 0.50) * 1000,
+        "p90_ms": _percentile(samples, 0.90) * 1000,
+        "p99_ms": _percentile(samples, 0.99) * 1000,
+        "mean_ms": total / reps * 1000,
+        "per_sec": reps * items / total if total else float("inf"),
+    }
+    print(f"  {name:<38} p50 {result['p50_ms']:9.2f} ms  p90 {result['p90_ms']:9.2f} ms  "
+          f"p99 {result['p99_ms']:9.2f} ms  {result['per_sec']:10.1f}/s")
+    return result
+
+
+# ----------- ESPN fixtures -----------
+def _recorded():
+    return any(name.endswith(".json") for name in os.listdir(ESPN_FIXTURES)) if os.path.isdir(ESPN_FIXTURES) else False
+
+
+def replay_league(fixture_dir=ESPN_FIXTURES, year=None):
+    """League whose league_get/get calls are served only from recorded responses."""
+    from espn_api.football import League
+    from espn_cache import ResponseCache
+
+    with open(os.path.join(fixture_dir, "meta.json"), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    league = League(league_id=meta["league_id"], year=year or meta["year"], fetch_league=False)
+
+    def offline(name):
+        def fail(params=None, headers=None, extend="", **kwargs):
+            raise RuntimeError(f"{name}({params}, extend={extend!r}) was not recorded; rerun `bench_suite.py record`")
+        return fail
+
+    for name in ("league_get", "get"):
+        setattr(league.espn_request, name, offline(name))
+    cache = ResponseCache(fixture_dir, static_ttl=float("inf"), live_ttl=float("inf"))
+    cache.install(league.espn_request)
+    league.fetch_league()
+    league.response_cache = cache
+    return league, meta["weeks"]
+
+
+def record(weeks):
+    """Fetch League + box_scores/scoreboard for weeks live and keep every response."""
+    from score_tracker import load_config_and_env
+    from espn_cache import cached_league
+
+    espn_s2, swid, year, _, _ = load_config_and_env()
+    os.makedirs(ESPN_FIXTURES, exist_ok=True)
+    league = cached_league(LEAGUE_ID, year, espn_s2, swid, cache_dir=ESPN_FIXTURES,
+                           static_ttl=float("inf"), live_ttl=float("inf"))
+    weeks = weeks or [league.current_week]
+    for w in weeks:
+        print(f"[info] week {w}: {len(league.box_scores(week=w))} box scores, "
+              f"{len(league.scoreboard(week=w))} scoreboard matchups")
+    with open(os.path.join(ESPN_FIXTURES, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"league_id": LEAGUE_ID, "year": year, "weeks": weeks,
+                   "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S")}, f, indent=1)
+    league.response_cache.report()
+    print(f"[info] fixtures written to {ESPN_FIXTURES} (they contain league data; review before committing)")
+
+
+def bench_fetch(reps, latency):
+    from score_tracker import fetch_matchup_rows
+
+    if _recorded():
+        league, weeks = replay_league()
+        source, tag = f"recorded fixtures, weeks {weeks}", "recorded"
+    else:
+        from fake_league import FakeLeague
+        league, weeks = FakeLeague(latency=latency), [3, 2]
+        source, tag = f"FakeLeague, {latency * 1000:.0f} ms per call (no recorded fixtures)", "fake"
+    print(f"[info] fetch_matchup_rows ({source})")
+
+    results = []
+    for workers in (1, 6):
+        rows = []
+
+        def run():
+            rows[:] = fetch_matchup_rows(league, weeks, max_workers=workers)[0]
+
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            run()
+        results.append(measure(f"fetch_matchup_rows workers={workers} [{tag}]", run, reps,
+                               items=max(len(rows), 1), quiet=True))
+    return results
+
+
+# ----------- write paths -----------
+def bench_write(reps):
+    import score_tracker
+    from winprob_mc import append_ctw_rows
+
+    print("[info] CSV write paths (scratch directory)")
+    rows = [{"timestamp": "2025-09-14 20:50:34", "week": 2, "home_team": f"Team {i}", "home_score": 39.18 + i,
+             "away_team": f"Team {i + 6}", "away_score": 88.8 - i} for i in range(6)]
+    ctw = [("2025-09-14T20:50:34", f"Team {i}", "34%", f"Team {i + 6}", "66%") for i in range(6)]
+    options = {"changed_only": False, "heartbeat_minutes": None}
+
+    scratch = tempfile.mkdtemp(prefix="bench_write_")
+    try:
+        return [
+            measure("score_tracker.write_rows (6 rows)",
+                    lambda: score_tracker.write_rows(rows, scratch, options), reps, items=len(rows), quiet=True),
+            measure("append_ctw_rows (6 rows)",
+                    lambda: append_ctw_rows(ctw, os.path.join(scratch, "ctw.csv")), reps, items=len(ctw)),
+        ]
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+# ----------- FantasyCast scrape -----------
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, fmt, *args):
+        pass
+
+
+def serve_dir(directory):
+    """Serve directory on an ephemeral localhost port; returns (server, base_url)."""
+    handler = functools.partial(_QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _html_tag(html_dir):
+    return "synthetic" if os.path.abspath(html_dir) == os.path.abspath(HTML_FIXTURES) else "custom html"
+
+
+def bench_scrape(reps, html_dir, page, delay_ms):
+    tag = _html_tag(html_dir)
+    try:
+        from fantasycast_session import build_options, start_driver, switch_into_matchup_iframe
+        from fantasycast_dom import extract_state, list_pills, activate_pill, scrape_all_pills
+    except ImportError as e:
+        print(f"[warn] skipping scrape benchmark: {e}")
+        return []
+
+    server, base = serve_dir(html_dir)
+    try:
+        try:
+            driver = start_driver(build_options(debugging_port=0))
+        except Exception as e:
+            print(f"[warn] skipping scrape benchmark, Chrome unavailable: {e}")
+            return []
+        try:
+            driver.get(f"{base}/{page}?delay={delay_ms}")
+            if switch_into_matchup_iframe(driver, timeout=10, state_file=None) is None:
+                print(f"[warn] {page} has no 'Chance to Win' panel; skipping scrape benchmark")
+                return []
+            pills = sorted(p["id"] for p in list_pills(driver))
+            print(f"[info] FantasyCast scrape ({page} from {html_dir}, {len(pills)} pills, "
+                  f"{delay_ms} ms re-render delay)")
+
+            cycle = iter(range(10 ** 9))
+            results = [
+                measure(f"extract_state (names + CTW %) [{tag}]", lambda: extract_state(driver), reps),
+                measure(f"list_pills [{tag}]", lambda: list_pills(driver), reps),
+                measure(f"activate_pill [{tag}]", lambda: activate_pill(driver, pills[next(cycle) % len(pills)]), reps),
+            ]
+            results.append(measure(f"scrape_all_pills [{tag}]", lambda: scrape_all_pills(driver),
+                                   max(1, reps // 10), items=len(pills) + 1, quiet=True))
+            from fantasycast_blocking import chrome_rss_mb
+            print(f"  Chrome process tree RSS: {chrome_rss_mb(driver)} MB")
+            return results
+        finally:
+            driver.quit()
+    finally:
+        server.shutdown()
+
+
+def bench_http(reps, html_dir):
+    tag = _html_tag(html_dir)
+    try:
+        import resource
+        from fantasycast_http import make_session, fetch_rows
+    except ImportError as e:
+        print(f"[warn] skipping http benchmark: {e}")
+        return []
+
+    server, base = serve_dir(html_dir)
+    try:
+        with make_session() as session:
+            rows = fetch_rows(session, f"{base}/league.json", f"{base}/static.html")
+            print(f"[info] FantasyCast over HTTP ({html_dir}, {len(rows)} matchups)")
+            results = [
+                measure(f"http fetch_rows (API) [{tag}]",
+                        lambda: fetch_rows(session, f"{base}/league.json", f"{base}/static.html"),
+                        reps, items=len(rows)),
+                measure(f"http fetch_rows (page fallback) [{tag}]",
+                        lambda: fetch_rows(session, f"{base}/missing.json", f"{base}/static.html"),
+                        reps, items=len(rows), quiet=True),
+            ]
+        print(f"  peak RSS of this process: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MB")
+        return results
+    finally:
+        server.shutdown()
+
+
+# ----------- compare -----------
+def compare(before_path, after_path):
+    with open(before_path, "r", encoding="utf-8") as f:
+        before = {r["name"]: r for r in json.load(f)["results"]}
+    with open(after_path, "r", encoding="utf-8") as f:
+        after = json.load(f)["results"]
+    print(f"{'case':<40}{'p50 before':>12}{'p50 after':>12}{'change':>9}")
+    for r in after:
+        old = before.get(r["name"])
+        if old is None:
+            print(f"{r['name']:<40}{'-':>12}{r['p50_ms']:>10.2f}ms{'new':>9}")
+            continue
+        change = (r["p50_ms"] - old["p50_ms"]) / old["p50_ms"] if old["p50_ms"] else 0.0
+        print(f"{r['name']:<40}{old['p50_ms']:>10.2f}ms{r['p50_ms']:>10.2f}ms{change:>+9.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite")
+    parser.add_argument("cases", nargs="*", default=["fetch", "write", "scrape", "http"],
+                        help="fetch, write, scrape, http; or `record` / `compare A B`")
+    parser.add_argument("--reps", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="FakeLeague seconds per call when no ESPN fixtures are recorded")
+    parser.add_argument("--html-dir", default=HTML_FIXTURES,
+                        help="directory served to Chrome (e.g. debug_artifacts)")
+    parser.add_argument("--page", default="index.html")
+    parser.add_argument("--delay-ms", type=int, default=150,
+                        help="re-render delay passed to the fixture page")
+    parser.add_argument("--weeks", type=int, nargs="*", default=None, help="record: weeks to fetch")
+    parser.add_argument("--json", default=None, help="write results here")
+    args = parser.parse_args()
+    # timing spans from the code under test would land in the real metrics file
+    os.environ["METRICS"] = "0"
+
+    if args.cases[:1] == ["record"]:
+        record(args.weeks)
+        return
+    if args.cases[:1] == ["compare"]:
+        if len(args.cases) != 3:
+            parser.error("compare needs two result files")
+        compare(args.cases[1], args.cases[2])
+        return
+
+    results = []
+    for case in args.cases:
+        if case == "fetch":
+            results += bench_fetch(args.reps, args.latency)
+        elif case == "write":
+            results += bench_write(args.reps)
+        elif case == "scrape":
+            results += bench_scrape(args.reps, args.html_dir, args.page, args.delay_ms)
+        elif case == "http":
+            results += bench_http(args.reps, HTML_FIXTURES)
+        else:
+            parser.error(f"unknown case: {case}")
+
+    if args.json:
+        import subprocess
+        try:
+            commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                    text=True, cwd=SCRIPT_DIR).stdout.strip()
+        except OSError:
+            commit = None
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"commit": commit, "at": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, f, indent=1)
+        print(f"[info] results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+# compact_data.py
+"""
+Fold the legacy data/scores_*.csv snapshots into one canonical store.
+
+Every snapshot is parsed once (in parallel, a bounded number of files in
+flight), both layouts are normalized into
+
+    timestamp, week, home_team, home_score, away_team, away_score, layout
+
+(early "timestamp,team,score" rows keep team/score in the home columns
+with layout=3), and rows are de-duplicated by (timestamp, matchup). The
+unique rows go to data/canonical/scores.csv.gz; manifest.csv records for
+each snapshot its header, the canonical row-id ranges it consists of, its
+size and sha256. verify rebuilds every snapshot from the store and checks
+the hash, so the originals can be dropped afterwards.
+
+Usage:
+    python compact_data.py compact [--workers 8] [--delete-originals]
+    python compact_data.py verify [--out-dir data/canonical]
+    python compact_data.py rebuild 2025-09-14T12-58-25Z [-o out.csv]
+"""
+import os
+import io
+import csv
+import sys
+import gzip
+import glob
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(SCRIPT_DIR, "data")
+CANONICAL_DIR = os.path.join(DATA_DIR, "canonical")
+STORE_FILE = "scores.csv.gz"
+MANIFEST_FILE = "manifest.csv"
+COLUMNS = ["timestamp", "week", "home_team", "home_score", "away_team", "away_score", "layout"]
+MANIFEST_COLUMNS = ["snapshot", "header", "ranges", "rows", "bytes", "sha256"]
+SEP = "\x00"
+
+
+def snapshot_id(path):
+    """scores_2025-09-14T12-58-25Z.csv -> 2025-09-14T12-58-25Z (scores_latest.csv -> latest)."""
+    name = os.path.basename(path)
+    return name[len("scores_"):-len(".csv")]
+
+
+def _render(fields):
+    """One CSV line the way the tracker wrote it (csv/pandas minimal quoting, \\n endings)."""
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator="\n").writerow(fields)
+    return buf.getvalue()
+
+
+def _render_row(row):
+    ts, week, home, hs, away, as_, layout = row
+    return _render([ts, home, hs] if layout == "3" else [ts, week, home, hs, away, as_])
+
+
+def parse_snapshot(path):
+    """
+    Worker: read one snapshot and normalize its rows.
+    Returns (snapshot_id, header, keys, lines, size, sha256) where keys is
+    one SEP-joined dedupe key per row and lines the matching canonical store
+    lines as a single CSV blob; a couple of big strings pickle far faster
+    than millions of tuples.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    text = raw.decode("utf-8")
+    first, _, body = text.partition("\n")
+    header = next(csv.reader([first]), [])
+    keys, out = [], io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    for line in body.splitlines():
+        # fast path: nothing quoted, so a plain split is exact and the line can be reused
+        rec = line.split(",") if '"' not in line else next(csv.reader([line]))
+        if len(rec) == 3:
+            ts, team, score = rec
+            row = (ts, "", team, score, "", "", "3")
+        elif len(rec) == 6:
+            row = (*rec, "6")
+        else:
+            raise ValueError(f"{path}: unexpected row with {len(rec)} fields: {rec!r}")
+        keys.append(f"{row[0]}|{row[1]}|{row[2].strip()}|{row[4].strip()}|{row[6]}")
+        if '"' in line:
+            writer.writerow(row)
+        elif len(rec) == 3:
+            out.write(f"{ts},,{team},{score},,,3\n")
+        else:
+            out.write(f"{line},6\n")
+    return snapshot_id(path), header, SEP.join(keys), out.getvalue(), len(raw), hashlib.sha256(raw).hexdigest()
+
+
+def _ranges(ids):
+    """[0, 1, 2, 7, 8] -> '0-3;7-9' (half-open runs of consecutive row ids)."""
+    runs = []
+    for i in ids:
+        if runs and runs[-1][1] == i:
+            runs[-1][1] = i + 1
+        else:
+            runs.append([i, i + 1])
+    return ";".join(f"{a}-{b}" for a, b in runs)
+
+
+def _parse_ranges(text):
+    for run in filter(None, text.split(";")):
+        a, b = run.split("-")
+        yield int(a), int(b)
+
+
+def _ordered(pool, fn, items, window):
+    """pool.map with at most `window` results in flight, so memory stays bounded."""
+    pending = []
+    for item in items:
+        pending.append(pool.submit(fn, item))
+        if len(pending) >= window:
+            yield pending.pop(0).result()
+    for fut in pending:
+        yield fut.result()
+
+
+def compact(data_dir=DATA_DIR, out_dir=CANONICAL_DIR, workers=None):
+    """Stream every snapshot once into the canonical store + manifest."""
+    paths = sorted(glob.glob(os.path.join(data_dir, "scores_*.csv")))
+    if not paths:
+        raise FileNotFoundError(f"No scores_*.csv files in {data_dir}")
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(out_dir, exist_ok=True)
+
+    row_ids = {}  # "timestamp|week|home|away|layout" -> canonical row id
+    store_lines = []  # canonical line per row id, to spot duplicates that disagree on score
+    conflicts = 0
+    store_tmp = os.path.join(out_dir, STORE_FILE + ".tmp")
+    manifest_tmp = os.path.join(out_dir, MANIFEST_FILE + ".tmp")
+    with gzip.open(store_tmp, "wt", encoding="utf-8", newline="") as store, \
+            open(manifest_tmp, "w", encoding="utf-8", newline="") as mf, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        store.write(_render(COLUMNS))
+        manifest = csv.writer(mf, lineterminator="\n")
+        manifest.writerow(MANIFEST_COLUMNS)
+
+        for sid, header, keys, lines, size, sha in _ordered(pool, parse_snapshot, paths, window=2 * workers):
+            ids = []
+            if keys:
+                for key, line in zip(keys.split(SEP), lines.splitlines(keepends=True)):
+                    rid = row_ids.get(key)
+                    if rid is None:
+                        rid = row_ids[key] = len(store_lines)
+                        store_lines.append(line)
+                        store.write(line)
+                    elif store_lines[rid] != line:
+                        conflicts += 1
+                    ids.append(rid)
+            manifest.writerow([sid, _render(header).rstrip("\n"), _ranges(ids), len(ids), size, sha])
+
+    os.replace(store_tmp, os.path.join(out_dir, STORE_FILE))
+    os.replace(manifest_tmp, os.path.join(out_dir, MANIFEST_FILE))
+    in_bytes = sum(os.path.getsize(p) for p in paths)
+    out_bytes = os.path.getsize(os.path.join(out_dir, STORE_FILE)) + os.path.getsize(os.path.join(out_dir, MANIFEST_FILE))
+    print(f"[info] {len(paths)} snapshots ({in_bytes / 1e6:.1f} MB) -> {len(row_ids)} unique rows "
+          f"({out_bytes / 1e6:.2f} MB) in {out_dir}")
+    if conflicts:
+        print(f"[warn] {conflicts} duplicate (timestamp, matchup) rows disagreed on score; "
+              f"verify will flag the affected snapshots")
+    return len(paths), len(row_ids)
+
+
+def read_manifest(out_dir=CANONICAL_DIR):
+    with open(os.path.join(out_dir, MANIFEST_FILE), "r", newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def load_lines(out_dir=CANONICAL_DIR):
+    """Canonical rows rendered back into their original line format, indexed by row id."""
+    with gzip.open(os.path.join(out_dir, STORE_FILE), "rt", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return [_render_row(row) for row in reader]
+
+
+def render_snapshot(entry, lines):
+    parts = [entry["header"] + "\n"]
+    for a, b in _parse_ranges(entry["ranges"]):
+        parts.extend(lines[a:b])
+    return "".join(parts).encode("utf-8")
+
+
+def rebuild(snapshot, out_dir=CANONICAL_DIR):
+    """Exact bytes of scores_<snapshot>.csv from the canonical store."""
+    for entry in read_manifest(out_dir):
+        if entry["snapshot"] == snapshot:
+            return render_snapshot(entry, load_lines(out_dir))
+    raise KeyError(f"Unknown snapshot: {snapshot}")
+
+
+_LINES = None
+
+
+def _init_verify(out_dir):
+    global _LINES
+    _LINES = load_lines(out_dir)
+
+
+def _verify_one(entry):
+    data = render_snapshot(entry, _LINES)
+    return entry["snapshot"], len(data) == int(entry["bytes"]) and hashlib.sha256(data).hexdigest() == entry["sha256"]
+
+
+def verify(out_dir=CANONICAL_DIR, workers=None):
+    """Rebuild every snapshot from the store and compare size + sha256. Returns the failures."""
+    entries = read_manifest(out_dir)
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_verify, initargs=(out_dir,)) as pool:
+        failed = [sid for sid, ok in _ordered(pool, _verify_one, entries, window=4 * workers) if not ok]
+    print(f"[info] verified {len(entries) - len(failed)}/{len(entries)} snapshots")
+    for sid in failed:
+        print(f"[FAIL] snapshot {sid} does not rebuild exactly")
+    return failed
+
+
+def main():
+    # shared options live on each subcommand, so they go after it on the command line
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--data-dir", default=DATA_DIR)
+    common.add_argument("--out-dir", default=CANONICAL_DIR)
+    common.add_argument("--workers", type=int, default=None)
+
+    parser = argparse.ArgumentParser(description="Compact legacy data/scores_*.csv snapshots")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_compact = sub.add_parser("compact", parents=[common], help="build the canonical store and verify it")
+    p_compact.add_argument("--delete-originals", action="store_true",
+                           help="remove the scores_*.csv files once every snapshot verifies")
+    sub.add_parser("verify", parents=[common], help="check every snapshot rebuilds exactly")
+    p_rebuild = sub.add_parser("rebuild", parents=[common], help="write one snapshot back out")
+    p_rebuild.add_argument("snapshot")
+    p_rebuild.add_argument("-o", "--output", default=None)
+    args = parser.parse_args()
+
+    if args.cmd == "compact":
+        compact(args.data_dir, args.out_dir, args.workers)
+        failed = verify(args.out_dir, args.workers)
+        if failed:
+            sys.exit(1)
+        if args.delete_originals:
+            removed = 0
+            for path in glob.glob(os.path.join(args.data_dir, "scores_*.csv")):
+                if snapshot_id(path) != "latest":  # the workflow still refreshes this one
+                    os.remove(path)
+                    removed += 1
+            print(f"[info] removed {removed} original snapshot files")
+    elif args.cmd == "verify":
+        sys.exit(1 if verify(args.out_dir, args.workers) else 0)
+    elif args.cmd == "rebuild":
+        data = rebuild(args.snapshot, args.out_dir)
+        if args.output:
+            with open(args.output, "wb") as f:
+                f.write(data)
+        else:
+            sys.stdout.buffer.write(data)
+
+
+if __name__ == "__main__":
+    main()
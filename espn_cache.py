@@ -0,0 +1,146 @@
+# espn_cache.py
+"""
+On-disk response cache for espn_api League requests.
+
+espn_api issues every call through league.espn_request.league_get()/get().
+We wrap those two methods on the League's request object so responses are
+persisted under .cache/espn/ with a TTL chosen from the requested views:
+league settings, teams, rosters and the pro schedule barely change within
+a week and get a long TTL; live scoring views get a short one.
+"""
+import os
+import json
+import time
+import hashlib
+import tempfile
+import functools
+import threading
+from contextlib import contextmanager
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.path.join(SCRIPT_DIR, ".cache", "espn")
+
+STATIC_TTL = 12 * 3600
+LIVE_TTL = 10
+
+# Views that carry in-game scoring; anything else is treated as static
+LIVE_VIEWS = {
+    "mMatchupScore", "mScoreboard", "mBoxscore", "mLiveScoring",
+    "kona_player_info", "kona_playercard", "kona_game_state",
+}
+
+
+def _views(params):
+    view = (params or {}).get("view")
+    if view is None:
+        return []
+    return [view] if isinstance(view, str) else list(view)
+
+
+class ResponseCache:
+    def __init__(self, cache_dir=CACHE_DIR, static_ttl=STATIC_TTL, live_ttl=LIVE_TTL):
+        self.cache_dir = cache_dir
+        self.static_ttl = static_ttl
+        self.live_ttl = live_ttl
+        self.hits = 0
+        self.misses = 0
+        # fetch_matchup_rows probes from a thread pool and several weeks'
+        # probes request the same static keys at once
+        self._lock = threading.Lock()
+        self._bypass = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def ttl_for(self, params):
+        return self.live_ttl if any(v in LIVE_VIEWS for v in _views(params)) else self.static_ttl
+
+    def _path(self, key):
+        digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry["stored_at"] > entry["ttl"]:
+            return None
+        return entry["data"]
+
+    def put(self, key, data, ttl):
+        path = self._path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"key": key, "stored_at": time.time(), "ttl": ttl, "data": data}, f)
+            with self._lock:
+                os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    @contextmanager
+    def bypass(self):
+        """Skip cached entries inside the block; fresh responses still replace them."""
+        with self._lock:
+            self._bypass += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._bypass -= 1
+
+    def wrap(self, requester, method_name):
+        """Replace requester.<method_name> with a caching version."""
+        original = getattr(requester, method_name)
+        prefix = f"{method_name}|{getattr(requester, 'league_id', '')}|{getattr(requester, 'year', '')}"
+
+        @functools.wraps(original)
+        def cached(params=None, headers=None, extend="", **kwargs):
+            key = prefix + "|" + json.dumps(
+                {"params": params, "headers": headers, "extend": extend, "kwargs": kwargs},
+                sort_keys=True, default=str,
+            )
+            data = None if self._bypass else self.get(key)
+            with self._lock:
+                if data is not None:
+                    self.hits += 1
+                    return data
+                self.misses += 1
+            data = original(params=params, headers=headers, extend=extend, **kwargs)
+            self.put(key, data, self.ttl_for(params))
+            return data
+
+        setattr(requester, method_name, cached)
+
+    def install(self, requester):
+        for name in ("league_get", "get"):
+            if hasattr(requester, name):
+                self.wrap(requester, name)
+
+    def report(self):
+        print(f"[DEBUG] ESPN cache: {self.hits} hits, {self.misses} misses ({self.cache_dir})")
+
+
+def cached_league(league_id, year, espn_s2, swid, enabled=True, cache_dir=CACHE_DIR,
+                  static_ttl=STATIC_TTL, live_ttl=LIVE_TTL):
+    """
+    Build a football League whose HTTP calls go through the on-disk cache.
+    The cache is attached as league.response_cache (None when disabled).
+    """
+    from espn_api.football import League
+
+    if not enabled:
+        league = League(league_id=league_id, year=year, espn_s2=espn_s2, swid=swid)
+        league.response_cache = None
+        return league
+
+    # Install the cache before the initial fetch so settings/teams/schedule are cached too
+    league = League(league_id=league_id, year=year, espn_s2=espn_s2, swid=swid, fetch_league=False)
+    cache = ResponseCache(cache_dir, static_ttl, live_ttl)
+    cache.install(league.espn_request)
+    league.fetch_league()
+    league.response_cache = cache
+    return league
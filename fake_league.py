@@ -0,0 +1,173 @@
+# fake_league.py
+"""
+Offline stand-in for espn_api.football.League.
+
+Implements just what the tracker touches (settings.name, current_week,
+teams, box_scores(), scoreboard()) with configurable per-call latency and
+failures, so fetch_matchup_rows() can be exercised without ESPN. Teams
+also carry a round-robin schedule/scores/outcomes for season_sim.py.
+
+Usage:
+    python fake_league.py [--latency 0.5] [--workers 6]
+"""
+import time
+import random
+import argparse
+import threading
+from types import SimpleNamespace
+
+STARTER_SLOTS = ["QB", "RB", "RB", "WR", "WR", "TE", "RB/WR/TE", "D/ST", "K"]
+BENCH_SLOTS = ["BE"] * 6
+
+
+class FakePlayer:
+    def __init__(self, name, slot_position, points=0.0, projected_points=0.0, game_played=0):
+        self.name = name
+        self.slot_position = slot_position
+        self.points = points
+        self.projected_points = projected_points
+        self.game_played = game_played
+
+
+class FakeTeam:
+    def __init__(self, team_id, team_name):
+        self.team_id = team_id
+        self.team_name = team_name
+        # filled in by FakeLeague: opponent Team per week, score and 'W'/'L'/'T'/'U'
+        self.schedule = []
+        self.scores = []
+        self.outcomes = []
+
+
+class FakeBoxScore:
+    def __init__(self, home_team, away_team, home_lineup, away_lineup):
+        self.home_team = home_team
+        self.away_team = away_team
+        self.home_lineup = home_lineup
+        self.away_lineup = away_lineup
+        self.home_score = round(sum(p.points for p in home_lineup if p.slot_position not in ("BE", "IR")), 2)
+        self.away_score = round(sum(p.points for p in away_lineup if p.slot_position not in ("BE", "IR")), 2)
+        self.home_projected = round(sum(p.projected_points for p in home_lineup if p.slot_position not in ("BE", "IR")), 2)
+        self.away_projected = round(sum(p.projected_points for p in away_lineup if p.slot_position not in ("BE", "IR")), 2)
+
+
+class FakeMatchup:
+    def __init__(self, box):
+        self.home_team = box.home_team
+        self.away_team = box.away_team
+        self.home_score = box.home_score
+        self.away_score = box.away_score
+
+
+class FakeLeague:
+    """
+    latency:     seconds each box_scores()/scoreboard() call sleeps
+    fail_weeks:  weeks whose calls raise, to exercise the error path
+    empty_weeks: weeks whose box_scores() returns [] (e.g. not started yet)
+    """
+
+    def __init__(self, n_teams=12, current_week=3, latency=0.0, fail_weeks=(), empty_weeks=(),
+                 name="Fake League", seed=0):
+        self.settings = SimpleNamespace(name=name, reg_season_count=14, playoff_team_count=4)
+        self.current_week = current_week
+        self.latency = latency
+        self.fail_weeks = set(fail_weeks)
+        self.empty_weeks = set(empty_weeks)
+        self.teams = [FakeTeam(i + 1, f"Team {i + 1}") for i in range(n_teams)]
+        self.calls = []
+        self._lock = threading.Lock()
+        self.seed = seed
+        self._rng = random.Random(seed)  # schedule only; calls get their own, see _call_rng
+        self._build_schedule()
+
+    def _build_schedule(self):
+        """Round-robin regular season; weeks before current_week are already decided."""
+        teams = list(self.teams)
+        n = len(teams)
+        for week in range(self.settings.reg_season_count):
+            order = [teams[0]] + teams[1:][week % (n - 1):] + teams[1:][:week % (n - 1)]
+            for i in range(n // 2):
+                h, a = order[i], order[n - 1 - i]
+                h.schedule.append(a)
+                a.schedule.append(h)
+                if week + 1 < self.current_week:
+                    hs, as_ = round(self._rng.gauss(110, 20), 2), round(self._rng.gauss(110, 20), 2)
+                    h.scores.append(hs)
+                    a.scores.append(as_)
+                    h.outcomes.append("W" if hs > as_ else "L" if hs < as_ else "T")
+                    a.outcomes.append("W" if as_ > hs else "L" if as_ < hs else "T")
+                else:
+                    h.scores.append(0.0)
+                    a.scores.append(0.0)
+                    h.outcomes.append("U")
+                    a.outcomes.append("U")
+
+    def _call_rng(self, method, week):
+        """
+        A generator per call seeded from (seed, method, week): probes run on a
+        thread pool, and one shared Random would make results depend on
+        thread timing (random.Random isn't safe to share across threads).
+        """
+        return random.Random(f"{self.seed}:{method}:{week}")
+
+    def _lineup(self, team, rng):
+        lineup = []
+        for i, slot in enumerate(STARTER_SLOTS + BENCH_SLOTS):
+            proj = round(rng.uniform(2, 22), 2)
+            played = rng.choice([0, 50, 100])
+            pts = round(max(0.0, rng.gauss(proj * played / 100, 3)), 2)
+            lineup.append(FakePlayer(f"{team.team_name} P{i}", slot, pts, proj, played))
+        return lineup
+
+    def _call(self, method, week):
+        with self._lock:
+            self.calls.append((method, week))
+        time.sleep(self.latency)
+        if week in self.fail_weeks:
+            raise RuntimeError(f"fake {method} failure for week {week}")
+
+    def box_scores(self, week=None):
+        week = week or self.current_week
+        self._call("box_scores", week)
+        if week in self.empty_weeks:
+            return []
+        rng = self._call_rng("box_scores", week)
+        boxes = []
+        for i in range(0, len(self.teams) - 1, 2):
+            h, a = self.teams[i], self.teams[i + 1]
+            boxes.append(FakeBoxScore(h, a, self._lineup(h, rng), self._lineup(a, rng)))
+        return boxes
+
+    def scoreboard(self, week=None):
+        week = week or self.current_week
+        self._call("scoreboard", week)
+        rng = self._call_rng("scoreboard", week)
+        boxes = []
+        for i in range(0, len(self.teams) - 1, 2):
+            h, a = self.teams[i], self.teams[i + 1]
+            boxes.append(FakeBoxScore(h, a, self._lineup(h, rng), self._lineup(a, rng)))
+        return [FakeMatchup(b) for b in boxes]
+
+
+def main():
+    from score_tracker import get_week_candidates, fetch_matchup_rows
+
+    parser = argparse.ArgumentParser(description="Run fetch_matchup_rows against a fake League")
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, default=6)
+    parser.add_argument("--timeout", type=float, default=None)
+    args = parser.parse_args()
+
+    # Hint week 5 has not started and week 3 errors, so the winner is box_scores(week=2)
+    for workers in (1, args.workers):
+        league = FakeLeague(current_week=3, latency=args.latency, fail_weeks={3}, empty_weeks={5})
+        candidates = get_week_candidates(league, week_hint=5)
+        start = time.perf_counter()
+        rows, used_week = fetch_matchup_rows(league, candidates, max_workers=workers, timeout=args.timeout)
+        elapsed = time.perf_counter() - start
+        print(f"[INFO] workers={workers}: {len(rows)} rows from week {used_week} in {elapsed:.2f}s "
+              f"({len(league.calls)} calls)")
+
+
+if __name__ == "__main__":
+    main()
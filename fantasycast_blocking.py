@@ -0,0 +1,165 @@
+# fantasycast_blocking.py
+"""
+Opt-in resource blocking for headless FantasyCast loads.
+
+The scraper only needs the FantasyCast scripts and the fantasy API; images,
+fonts, video, ads and analytics are dead weight. Blocking happens on two
+levels so it also covers the cross-site iframes Chrome runs out of process:
+
+  * launch flags (apply_launch_flags): third-party hosts resolve to
+    NOTFOUND for every frame, and images are switched off in Blink
+  * CDP Network.setBlockedURLs (install_url_blocking): URL patterns for the
+    blocked resource types on the main target
+
+What to block comes from config.json ("resource_blocking") on top of the
+defaults below; hosts listed under "allow" are never blocked:
+
+    "resource_blocking": {"enabled": true, "block_types": ["image", "font", "media"],
+                          "block_hosts": ["example-ads.com"], "allow": ["sourcepoint.mgr.consensu.org"]}
+
+resource_stats() reads the performance log and reports requests, bytes,
+blocked requests and memory, and compares them with the median of earlier
+unblocked runs recorded in the timing spans.
+"""
+import os
+import json
+import statistics
+
+import timing
+from fantasycast_network import performance_entries
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(SCRIPT_DIR, "config.json")
+
+TYPE_PATTERNS = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*"],
+    "font": ["*.woff*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*", "*.vtt*"],
+    "stylesheet": ["*.css*"],
+}
+DEFAULT_TYPES = ["image", "font", "media"]
+
+# Ad, analytics and tracking hosts the FantasyCast page pulls in
+DEFAULT_BLOCK_HOSTS = [
+    "doubleclick.net", "googlesyndication.com", "googletagservices.com", "googletagmanager.com",
+    "google-analytics.com", "adservice.google.com", "amazon-adsystem.com", "scorecardresearch.com",
+    "chartbeat.com", "chartbeat.net", "omtrdc.net", "demdex.net", "adobedtm.com", "everesttech.net",
+    "facebook.net", "connect.facebook.net", "taboola.com", "outbrain.com", "imrworldwide.com",
+    "moatads.com", "adsafeprotected.com", "krxd.net", "nr-data.net", "branch.io", "optimizely.com",
+    "bounceexchange.com", "bidswitch.net", "casalemedia.com", "rubiconproject.com", "pubmatic.com",
+]
+
+BLOCKED_ERRORS = ("net::ERR_BLOCKED_BY_CLIENT", "net::ERR_NAME_NOT_RESOLVED")
+
+
+def load_blocking_config(config_path=CONFIG_PATH):
+    """Blocking settings from config.json merged over the defaults."""
+    cfg = {}
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                cfg = json.load(f).get("resource_blocking", {}) or {}
+        except Exception as e:
+            print(f"[warn] could not read resource_blocking from config.json: {e}")
+    allow = [a.lower() for a in cfg.get("allow", [])]
+    hosts = [h.lower() for h in DEFAULT_BLOCK_HOSTS + list(cfg.get("block_hosts", []))]
+    return {
+        "enabled": bool(cfg.get("enabled", False)),
+        "types": list(cfg.get("block_types", DEFAULT_TYPES)),
+        "hosts": sorted({h for h in hosts if not any(a in h or h in a for a in allow)}),
+        "allow": allow,
+    }
+
+
+def apply_launch_flags(opts, config):
+    """Browser-wide part of the blocking (call before webdriver.Chrome)."""
+    if config["hosts"]:
+        rules = ", ".join(f"MAP {h} ~NOTFOUND, MAP *.{h} ~NOTFOUND" for h in config["hosts"])
+        opts.add_argument(f"--host-resolver-rules={rules}")
+    if "image" in config["types"]:
+        opts.add_argument("--blink-settings=imagesEnabled=false")
+    return opts
+
+
+def install_url_blocking(driver, config):
+    """Block the configured resource types by URL pattern (call before driver.get)."""
+    patterns = [p for t in config["types"] for p in TYPE_PATTERNS.get(t, [])]
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+    print(f"[info] blocking {len(patterns)} URL patterns ({', '.join(config['types'])}) "
+          f"and {len(config['hosts'])} hosts")
+    return patterns
+
+
+def chrome_rss_mb(driver):
+    """Resident memory of chromedriver's process tree (Linux /proc only)."""
+    try:
+        root = driver.service.process.pid
+    except AttributeError:
+        return None
+    children, rss = {}, {}
+    for pid in filter(str.isdigit, os.listdir("/proc") if os.path.isdir("/proc") else []):
+        try:
+            with open(f"/proc/{pid}/stat", "r") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(pid))
+            rss[int(pid)] = int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, IndexError, ValueError):
+            continue
+    total, stack = 0, [root]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return round(total / 1e6, 1) if total else None
+
+
+def _baseline(path=None, script="scrapewp_ci"):
+    """Median requests/bytes of earlier page loads without blocking."""
+    path = path or os.getenv("METRICS_FILE") or timing.METRICS_FILE
+    if not os.path.exists(path):
+        return None
+    runs = [dict(s["attrs"], ms=s["ms"]) for s in timing.load_spans(path, script)
+            if s["span"] == "page_resources" and not s.get("attrs", {}).get("blocking")]
+    if not runs:
+        return None
+    return {k: statistics.median(r.get(k) or 0 for r in runs) for k in ("requests", "bytes", "ms")}
+
+
+def resource_stats(driver, page_ready_ms, blocking):
+    """
+    Summarize the page load from the performance log, record it as a
+    'page_resources' timing span and print what blocking saved.
+    """
+    requests, finished, blocked = set(), {}, 0
+    for msg in performance_entries(driver):
+        method, params = msg.get("method"), msg.get("params", {})
+        if method == "Network.requestWillBeSent":
+            requests.add(params.get("requestId"))
+        elif method == "Network.loadingFinished":
+            finished[params.get("requestId")] = params.get("encodedDataLength", 0) or 0
+        elif method == "Network.loadingFailed":
+            if params.get("blockedReason") or params.get("errorText") in BLOCKED_ERRORS:
+                blocked += 1
+    try:
+        driver.execute_cdp_cmd("Performance.enable", {})
+        metrics = {m["name"]: m["value"] for m in driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]}
+        js_heap = round(metrics.get("JSHeapUsedSize", 0) / 1e6, 1)
+    except Exception:
+        js_heap = None
+
+    stats = {"blocking": blocking, "requests": len(requests) - blocked, "bytes": sum(finished.values()),
+             "blocked": blocked, "js_heap_mb": js_heap, "chrome_rss_mb": chrome_rss_mb(driver)}
+    base = _baseline() if blocking else None
+    timing.record("page_resources", page_ready_ms, **stats)
+
+    print(f"[info] page ready in {page_ready_ms / 1000:.1f}s: {stats['requests']} requests, "
+          f"{stats['bytes'] / 1e6:.2f} MB, {blocked} blocked, JS heap {js_heap} MB, "
+          f"Chrome RSS {stats['chrome_rss_mb']} MB")
+    if base:
+        print(f"[info] vs unblocked median: {base['requests'] - stats['requests']:+.0f} requests saved, "
+              f"{(base['bytes'] - stats['bytes']) / 1e6:+.2f} MB saved, "
+              f"{(base['ms'] - page_ready_ms) / 1000:+.1f}s faster")
+    elif blocking:
+        print("[info] no unblocked baseline yet (run once with --resource-stats and no blocking)")
+    return stats
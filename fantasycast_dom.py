@@ -0,0 +1,322 @@
+# fantasycast_dom.py
+"""
+Single-roundtrip DOM reads and waits for the FantasyCast matchup iframe.
+
+Every find_elements()/.text call is its own WebDriver HTTP round trip.
+EXTRACT_JS does the same lookups the old helpers did (same XPaths and
+CSS selectors) inside the page and returns one JSON object:
+
+    {"teams": [a, b], "percents": [p1, p2], "selected": <data-id or null>,
+     "pills": [{"id": 3, "teams": [..], "scores": [..], "selected": false}, ...]}
+
+"pills" is only filled when asked for (all_pills=True).
+
+ACTIVATE_JS clicks a pill and waits in-page with a MutationObserver until
+the Chance to Win panel shows the pill's two teams, so a matchup switch
+returns as soon as the DOM updates instead of after fixed sleeps. The
+pill's selected class alone doesn't count: ESPN sets it before the panel
+re-renders, and reading then returns the previous matchup.
+
+scrape_matchups() captures each matchup once: pills whose matchup is
+already known (from the data-id -> pair map cached per week) are skipped
+and the loop stops once the expected number of matchups is in.
+"""
+import time
+import datetime
+
+from selenium.common.exceptions import TimeoutException
+
+import timing
+
+PANEL_XPATH = "//*[contains(normalize-space(),'Chance to Win')]/ancestor::*[self::div or self::section][1]"
+
+# Shared helpers prepended to the scripts below
+HELPERS_JS = r"""
+const txt = el => ((el && (el.innerText || el.textContent)) || "").trim();
+const xpathAll = (xp, ctx) => {
+  const snap = document.evaluate(xp, ctx || document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+  const out = [];
+  for (let i = 0; i < snap.snapshotLength; i++) out.push(snap.snapshotItem(i));
+  return out;
+};
+const visible = el => !!(el && (el.offsetWidth || el.offsetHeight || el.getClientRects().length));
+const panelTeams = panel => {
+  const names = [];
+  const cand = Array.from(panel.querySelectorAll("span.teamName"))
+    .concat(xpathAll(".//h1|.//h2|.//h3|.//span[contains(@class,'TeamName')]", panel));
+  for (const e of cand) {
+    const t = txt(e);
+    if (t && !names.includes(t)) names.push(t);
+    if (names.length === 2) break;
+  }
+  return names;
+};
+const pairKey = names => names.map(n => (n || "").trim()).filter(Boolean).sort().join("|");
+"""
+
+EXTRACT_JS = HELPERS_JS + r"""
+const wantPills = arguments[0];
+const panelXPath = arguments[1];
+
+const out = {teams: [], percents: [], selected: null, pills: []};
+const panel = xpathAll(panelXPath)[0];
+if (panel && visible(panel)) {
+  out.teams = panelTeams(panel);
+  let percs = Array.from(panel.querySelectorAll("div.totalPerc")).map(txt).filter(Boolean);
+  if (percs.length < 2) {
+    percs = xpathAll(".//*[contains(text(),'%')]", panel).map(txt).filter(p => p.includes("%")).slice(0, 2);
+  }
+  out.percents = percs.slice(0, 2);
+}
+
+const pills = xpathAll("//div[contains(@class,'Thumbnails__Item') and contains(@class,'pointer') and @data-id]");
+for (const p of pills) {
+  const cls = p.className || "";
+  const isSel = cls.includes("selected") || cls.includes("Thumbnails__Item--active");
+  const id = p.getAttribute("data-id");
+  if (isSel && out.selected === null) out.selected = id;
+  if (wantPills && /^\d+$/.test(id) && !out.pills.some(x => x.id === Number(id))) {
+    out.pills.push({
+      id: Number(id),
+      teams: Array.from(p.querySelectorAll(".ScoreCell__TeamName")).map(txt),
+      scores: Array.from(p.querySelectorAll(".ScoreCell__Score:not(.ScoreCell__Score--record)")).map(txt),
+      selected: isSel,
+    });
+  }
+}
+return out;
+"""
+
+
+# runSwitch(did, timeoutMs, panelXPath, done): click the pill, then call done()
+# from a MutationObserver once the panel shows the pill's teams (or, for a pill
+# without team names, once the panel's teams change)
+SWITCH_JS = HELPERS_JS + r"""
+const runSwitch = (did, timeoutMs, panelXPath, done) => {
+  did = String(did);
+  const pillXPath = `//div[contains(@class,'Thumbnails__Item') and @data-id='${did}']`;
+  const panelPair = () => {
+    const panel = xpathAll(panelXPath)[0];
+    return panel ? pairKey(panelTeams(panel)) : "";
+  };
+  const before = panelPair();
+  let observer = null, timer = null, clicked = false, finished = false, expected = "";
+
+  const finish = (switched, reason) => {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    if (timer) clearTimeout(timer);
+    done({switched: switched, reason: reason, teams: panelPair()});
+  };
+
+  const check = () => {
+    if (finished) return;
+    const slide = xpathAll(pillXPath)[0];
+    if (slide && !expected) expected = pairKey(Array.from(slide.querySelectorAll(".ScoreCell__TeamName")).map(txt));
+    if (!clicked) {
+      if (expected && before === expected) return finish(true, "already");
+      const links = slide ? xpathAll(".//a[contains(@class,'ScoreCell__Link')]", slide) : [];
+      if (!links.length) return;  // wait for the pill to render
+      const link = links[links.length - 1];
+      try { link.scrollIntoView({block: "nearest", inline: "center"}); } catch (e) {}
+      const strip = slide.closest("[data-gallery-thumbnail]")?.parentElement || slide.parentElement;
+      if (strip && strip.scrollLeft !== undefined) strip.scrollLeft = slide.offsetLeft - 50;
+      clicked = true;
+      link.click();
+    }
+    const now = panelPair();
+    if (expected) {
+      if (now === expected) finish(true, "teams");
+      return;
+    }
+    if (before && now && now !== before) return finish(true, "teams");
+  };
+
+  observer = new MutationObserver(check);
+  observer.observe(document.body, {subtree: true, childList: true, characterData: true,
+                                   attributes: true, attributeFilter: ["class"]});
+  timer = setTimeout(() => finish(false, clicked ? "timeout" : "no-link"), timeoutMs);
+  check();
+};
+"""
+
+ACTIVATE_JS = SWITCH_JS + r"""
+runSwitch(arguments[0], arguments[1], arguments[2], arguments[arguments.length - 1]);
+"""
+
+# Split form for driving several tabs: start the switch now, collect the result later
+START_SWITCH_JS = SWITCH_JS + r"""
+window.__ctwSwitch = new Promise(resolve => runSwitch(arguments[0], arguments[1], arguments[2], resolve));
+return true;
+"""
+
+AWAIT_SWITCH_JS = r"""
+const done = arguments[arguments.length - 1];
+(window.__ctwSwitch || Promise.resolve({switched: false, reason: "not-started"})).then(done);
+"""
+
+
+def extract_state(driver, all_pills=False, timeout=15, poll=0.2):
+    """
+    Run EXTRACT_JS until the Chance to Win panel shows two team names.
+    Raises TimeoutException if it never does within timeout seconds.
+    """
+    end = time.time() + timeout
+    while True:
+        state = driver.execute_script(EXTRACT_JS, all_pills, PANEL_XPATH) or {}
+        if len(state.get("teams", [])) >= 2:
+            percs = list(state.get("percents", []))
+            while len(percs) < 2:
+                percs.append("")
+            state["percents"] = percs
+            return state
+        if time.time() >= end:
+            raise TimeoutException("Team names not found")
+        time.sleep(poll)
+
+
+def list_pills(driver):
+    """All pills in the strip (data-id, team names, scores, selected) in one call."""
+    state = driver.execute_script(EXTRACT_JS, True, PANEL_XPATH) or {}
+    return state.get("pills", [])
+
+
+def activate_pill(driver, did, timeout=8.0):
+    """
+    Click pill data-id=did and wait (in-page, event driven) for the switch.
+    Returns True once the panel shows the pill's teams (already did, or
+    changed teams for a pill without names), False on timeout; raises
+    TimeoutException if the pill never rendered.
+    """
+    driver.set_script_timeout(timeout + 5)
+    res = driver.execute_async_script(ACTIVATE_JS, str(did), int(timeout * 1000), PANEL_XPATH) or {}
+    if res.get("reason") == "no-link":
+        raise TimeoutException(f"No clickable link for data-id={did}")
+    return bool(res.get("switched"))
+
+
+def start_pill_switch(driver, did, timeout=8.0):
+    """Click pill data-id=did and start the in-page wait without blocking on it."""
+    driver.execute_script(START_SWITCH_JS, str(did), int(timeout * 1000), PANEL_XPATH)
+
+
+def await_pill_switch(driver, did, timeout=8.0):
+    """Collect the result of start_pill_switch() in the current tab."""
+    driver.set_script_timeout(timeout + 5)
+    res = driver.execute_async_script(AWAIT_SWITCH_JS) or {}
+    if res.get("reason") == "no-link":
+        raise TimeoutException(f"No clickable link for data-id={did}")
+    return bool(res.get("switched"))
+
+
+def read_row(driver, state=None):
+    """(ts, teamA, pctA, teamB, pctB) of the matchup the panel shows."""
+    state = state or extract_state(driver)
+    (a, b), (p1, p2) = state["teams"][:2], state["percents"][:2]
+    return (datetime.datetime.now().isoformat(timespec="seconds"), a, p1, b, p2)
+
+
+def capture_row(captured, pair_map, row, did=None):
+    """
+    Add row to captured ({pair: row}) unless its pair is already there;
+    remember which pill showed it. Returns True for a new matchup.
+    """
+    pair = (row[1], row[3])
+    if did is not None:
+        pair_map[int(did)] = pair
+    if pair in captured:
+        return False
+    captured[pair] = row
+    return True
+
+
+def plan_pills(ids, pair_map, captured):
+    """
+    (todo, rest): one pill per known-but-missing matchup first (from the
+    cached map), then pills never seen this week; rest are the pills whose
+    matchup is already captured, worth clicking only if the map is stale.
+    """
+    known, unknown, planned = [], [], set()
+    for did in ids:
+        pair = pair_map.get(did)
+        if pair is None:
+            unknown.append(did)
+        elif pair not in captured and pair not in planned:
+            planned.add(pair)
+            known.append(did)
+    todo = known + unknown
+    return todo, [did for did in ids if did not in todo]
+
+
+def pill_pair_count(pills):
+    """Distinct matchups in the strip, from the team names each pill shows (None if unnamed)."""
+    pairs = {frozenset(t.strip() for t in p.get("teams", [])) for p in pills if len(p.get("teams", [])) >= 2}
+    return len(pairs) or None
+
+
+def scrape_matchups(driver, pair_map, expected=None, timeout=8.0, captured=None, on_row=None):
+    """
+    Read the current matchup, then click only the pills whose matchup isn't
+    captured yet, stopping once expected matchups are in (default: the
+    number of distinct pairs the pills show). pair_map ({data-id: pair})
+    is updated in place; on_row(row) is called once per new matchup.
+    Returns (captured {pair: row}, pills clicked, data-ids).
+    """
+    captured = {} if captured is None else captured
+
+    def take(row, did):
+        new = capture_row(captured, pair_map, row, did)
+        if new and on_row:
+            on_row(row)
+        return new
+
+    def done():
+        return expected is not None and len(captured) >= expected
+
+    try:
+        with timing.span("matchup", data_id="current"):
+            state = extract_state(driver)
+            take(read_row(driver, state), state.get("selected"))
+    except Exception as e:
+        print(f"[warn] initial scrape failed: {e}")
+
+    with timing.span("list_pills") as sp:
+        pills = list_pills(driver)
+        ids = sorted({p["id"] for p in pills})
+        sp["count"] = len(ids)
+    expected = expected or pill_pair_count(pills)
+    todo, rest = plan_pills(ids, pair_map, captured)
+    clicked = 0
+    # pills the map marked as already captured come last, and only if the
+    # expected count still isn't reached (the cached map may be stale)
+    for did in todo + rest:
+        if done() or (did in rest and expected is None):
+            break
+        # an earlier click may have shown this pill's matchup already
+        if did in todo and pair_map.get(did) in captured:
+            continue
+        clicked += 1
+        try:
+            with timing.span("matchup", data_id=did) as sp:
+                switched = activate_pill(driver, did, timeout)
+                sp["new"] = take(read_row(driver), did if switched else None)
+        except Exception as e:
+            print(f"[warn] data-id {did} failed: {e}")
+    return captured, clicked, ids
+
+
+def scrape_all_pills(driver, timeout=8.0):
+    """
+    Read the current matchup, then switch to every pill in the strip.
+    Returns [(ts, teamA, pctA, teamB, pctB)] in data-id order (current first).
+    Benchmark baseline; scrapers use scrape_matchups().
+    """
+    rows = [read_row(driver)]
+    for did in sorted(p["id"] for p in list_pills(driver)):
+        try:
+            activate_pill(driver, did, timeout)
+            rows.append(read_row(driver))
+        except Exception as e:
+            print(f"[warn] data-id {did} failed: {e}")
+    return rows
@@ -0,0 +1,208 @@
+# fantasycast_http.py
+"""
+Browserless FantasyCast "Chance to Win": plain HTTP + lxml, no Chrome.
+
+The FantasyCast app is rendered client-side from the ESPN fantasy API, so
+the cheapest source is that API itself: one pooled requests.Session call
+for the league's scoreboard views, parsed with the same extract_ctw_rows()
+network-capture mode uses. When the API carries no win probabilities the
+FantasyCast page is fetched and parsed with lxml, first for the app state
+ESPN embeds in a <script> (window['__espnfitt__'] or the Next.js
+__NEXT_DATA__ assignment), then for a server-rendered Chance to Win panel
+(span.teamName / div.totalPerc).
+
+The panel parser is tested against a captured page
+(tests/fixtures/fantasycast_matchup_header.html). The pages captured so
+far carry only league config in __NEXT_DATA__, so the embedded-state and
+API paths are only exercised with synthetic payloads.
+
+fetch_rows() returns [] when neither source has the numbers; callers then
+fall back to Selenium (scrapewp_ci --http does this automatically).
+
+Usage:
+    python fantasycast_http.py [--api-url URL] [--page-url URL]
+"""
+import os
+import re
+import json
+import argparse
+import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree, html as lxml_html
+
+import timing
+from fantasycast_network import extract_ctw_rows
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(SCRIPT_DIR, "config.json")
+
+API_URL = "https://lm-api-reads.fantasy.espn.com/apis/v3/games/ffl/seasons/{year}/segments/0/leagues/{league_id}"
+API_VIEWS = ("mMatchupScore", "mScoreboard", "mTeam", "mStatus")
+PAGE_URL = "https://fantasy.espn.com/football/fantasycast?leagueId={league_id}"
+USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/126.0 Safari/537.36")
+TIMEOUT = 15
+LEAGUE_ID = 31028552  # same league as fantasycast_session.URL
+
+# start of an inlined state object; the JSON itself is read with raw_decode
+# because the same <script> usually goes on with more code after it
+EMBEDDED_STATE_RE = re.compile(r"(?:window\[['\"]__espnfitt__['\"]\]|__NEXT_DATA__)\s*=\s*")
+PCT_RE = re.compile(r"\d+(?:[.,]\d+)?\s*%")
+
+
+def load_settings(config_path=CONFIG_PATH):
+    """league_id / year / swid / espn_s2 / week / matchups from env, then config.json."""
+    cfg = {}
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                cfg = json.load(f)
+        except Exception as e:
+            print(f"[warn] could not read config.json: {e}")
+    return {
+        "league_id": os.getenv("LEAGUE_ID") or cfg.get("league_id") or LEAGUE_ID,
+        "year": os.getenv("YEAR") or cfg.get("year") or datetime.date.today().year,
+        "swid": os.getenv("SWID") or cfg.get("swid"),
+        "espn_s2": os.getenv("ESPN_S2") or cfg.get("espn_s2"),
+        # for the pill loop: which week the data-id map belongs to, how many matchups to expect
+        "week": os.getenv("WEEK") or cfg.get("week"),
+        "matchups": int(os.getenv("MATCHUP_COUNT") or cfg.get("matchup_count") or 0) or None,
+    }
+
+
+def make_session(swid=None, espn_s2=None, pool_size=4, retries=2):
+    """Keep-alive session with a small connection pool and retries on 5xx/429."""
+    session = requests.Session()
+    retry = Retry(total=retries, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=("GET",))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "es-ES,es;q=0.9,en;q=0.8"})
+    # private leagues need the ESPN session cookies
+    if swid and espn_s2:
+        session.cookies.set("SWID", swid, domain=".espn.com")
+        session.cookies.set("espn_s2", espn_s2, domain=".espn.com")
+    return session
+
+
+# ----------- API -----------
+def fetch_api_payloads(session, api_url, timeout=TIMEOUT):
+    """The league scoreboard JSON as a one-element payload list (network-mode format)."""
+    resp = session.get(api_url, params=[("view", v) for v in API_VIEWS],
+                       headers={"Accept": "application/json"}, timeout=timeout)
+    resp.raise_for_status()
+    return [{"url": resp.url, "body": resp.json()}]
+
+
+# ----------- page -----------
+def _schedule_holders(obj, out):
+    """Every dict inside obj that looks like a league payload (has a 'schedule' list)."""
+    if isinstance(obj, dict):
+        if isinstance(obj.get("schedule"), list):
+            out.append(obj)
+        for v in obj.values():
+            _schedule_holders(v, out)
+    elif isinstance(obj, list):
+        for v in obj:
+            _schedule_holders(v, out)
+    return out
+
+
+def embedded_states(doc):
+    """Parsed app-state objects inlined into the page (assignments or a JSON <script>)."""
+    decoder, states = json.JSONDecoder(), []
+    for text in doc.xpath("//script[@id='__NEXT_DATA__']/text()"):
+        try:
+            states.append(json.loads(text))
+        except ValueError:
+            continue
+    for text in doc.xpath("//script[not(@src) and not(@id='__NEXT_DATA__')]/text()"):
+        for m in EMBEDDED_STATE_RE.finditer(text):
+            try:
+                states.append(decoder.raw_decode(text, m.end())[0])
+            except ValueError:
+                continue
+    return states
+
+
+def embedded_payloads(doc):
+    """League payloads found in the app state ESPN inlines into the page."""
+    return [{"url": "embedded", "body": body}
+            for state in embedded_states(doc) for body in _schedule_holders(state, [])]
+
+
+def panel_rows(doc):
+    """
+    [(teamA, pctA, teamB, pctB)] from a server-rendered Chance to Win
+    panel: the same span.teamName / div.totalPerc the Selenium path reads.
+    """
+    rows = []
+    for panel in doc.xpath("//*[contains(normalize-space(text()), 'Chance to Win')]/ancestor::*[.//span[contains(@class, 'teamName')]][1]"):
+        names = [n.text_content().strip() for n in panel.xpath(".//span[contains(@class, 'teamName')]")]
+        pcts = [p.text_content().strip() for p in panel.xpath(".//div[contains(@class, 'totalPerc')]")]
+        pcts = [p for p in pcts if PCT_RE.search(p)]
+        if len(names) >= 2 and len(pcts) >= 2:
+            rows.append((names[0], pcts[0], names[1], pcts[1]))
+    return rows
+
+
+def fetch_page_rows(session, page_url, timeout=TIMEOUT):
+    resp = session.get(page_url, headers={"Accept": "text/html"}, timeout=timeout)
+    resp.raise_for_status()
+    doc = lxml_html.fromstring(resp.content)
+    return extract_ctw_rows(embedded_payloads(doc)) or panel_rows(doc)
+
+
+# ----------- entry point -----------
+def fetch_rows(session, api_url, page_url, timeout=TIMEOUT):
+    """
+    [(timestamp, teamA, pctA, teamB, pctB)] without a browser, API first and
+    the FantasyCast page second. Returns [] when neither has the numbers.
+    """
+    rows = []
+    with timing.span("http_api") as sp:
+        try:
+            rows = extract_ctw_rows(fetch_api_payloads(session, api_url, timeout))
+        except (requests.RequestException, ValueError) as e:
+            print(f"[warn] API fetch failed: {e}")
+        sp["rows"] = len(rows)
+    if not rows:
+        with timing.span("http_page") as sp:
+            try:
+                rows = fetch_page_rows(session, page_url, timeout)
+            except (requests.RequestException, ValueError, etree.ParserError) as e:
+                print(f"[warn] FantasyCast page fetch failed: {e}")
+            sp["rows"] = len(rows)
+    ts = datetime.datetime.now().isoformat(timespec="seconds")
+    return [(ts, a, p1, b, p2) for a, p1, b, p2 in rows]
+
+
+def default_urls(settings):
+    return (API_URL.format(year=settings["year"], league_id=settings["league_id"]),
+            PAGE_URL.format(league_id=settings["league_id"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch FantasyCast Chance to Win without a browser")
+    parser.add_argument("--api-url", default=None)
+    parser.add_argument("--page-url", default=None)
+    args = parser.parse_args()
+
+    settings = load_settings()
+    api_url, page_url = default_urls(settings)
+    with make_session(settings["swid"], settings["espn_s2"]) as session:
+        rows = fetch_rows(session, args.api_url or api_url, args.page_url or page_url)
+    if not rows:
+        print("[warn] no Chance to Win values over HTTP; use scrapewp_ci.py (Selenium)")
+    for _, a, p1, b, p2 in rows:
+        print(f"{a}: {p1}")
+        print(f"{b}: {p2}")
+        print("-" * 30)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+# fantasycast_network.py
+"""
+Network-capture mode for FantasyCast "Chance to Win".
+
+Instead of clicking every Thumbnails__Item pill, turn on Chrome's
+performance log, let the FantasyCast app load once, and pull the JSON
+payloads it already fetched from the ESPN fantasy API. Win probabilities
+for every matchup are read from those payloads in one pass.
+
+Captured payloads can be saved to debug_artifacts/ and replayed offline:
+    python fantasycast_network.py debug_artifacts/fantasycast_payloads_<ts>.json
+"""
+import os
+import re
+import sys
+import json
+import base64
+import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ARTIFACTS_DIR = os.path.join(SCRIPT_DIR, "debug_artifacts")
+
+# Hosts the FantasyCast app reads league/matchup data from
+API_HOST_RE = re.compile(r"https://(lm-api-reads|fantasy)\.(fantasy\.)?espn\.com/apis/", re.I)
+# Keys that hold a win probability, on a matchup side or on the matchup itself
+WIN_PROB_RE = re.compile(r"win.?prob|chance.?to.?win", re.I)
+
+
+def enable_performance_logging(opts):
+    """Ask chromedriver to record DevTools network events (call before webdriver.Chrome)."""
+    opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return opts
+
+
+def performance_entries(driver):
+    """
+    Every DevTools message logged so far, as parsed dicts. get_log() drains
+    chromedriver's buffer, so entries are kept on the driver and several
+    readers (payload capture, resource stats) all see the full log.
+    """
+    kept = driver.__dict__.setdefault("_performance_log", [])
+    for entry in driver.get_log("performance"):
+        try:
+            kept.append(json.loads(entry["message"])["message"])
+        except (KeyError, ValueError):
+            continue
+    return kept
+
+
+def capture_json_payloads(driver, url_re=API_HOST_RE):
+    """
+    Read the performance log and return [{"url": ..., "body": <parsed JSON>}]
+    for every JSON response from the ESPN fantasy API seen so far.
+    """
+    payloads, seen = [], set()
+    for msg in performance_entries(driver):
+        if msg.get("method") != "Network.responseReceived":
+            continue
+        params = msg.get("params", {})
+        resp = params.get("response", {})
+        url, rid = resp.get("url", ""), params.get("requestId")
+        if rid in seen or not url_re.search(url) or "json" not in (resp.get("mimeType") or ""):
+            continue
+        seen.add(rid)
+        try:
+            body = driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": rid})
+        except Exception as e:
+            print(f"[warn] could not read body for {url}: {e}")
+            continue
+        text = body.get("body", "")
+        if body.get("base64Encoded"):
+            text = base64.b64decode(text).decode("utf-8", errors="replace")
+        try:
+            payloads.append({"url": url, "body": json.loads(text)})
+        except ValueError:
+            continue
+    print(f"[info] captured {len(payloads)} JSON payloads")
+    return payloads
+
+
+def save_payloads(payloads, out_dir=ARTIFACTS_DIR):
+    os.makedirs(out_dir, exist_ok=True)
+    ts = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(out_dir, f"fantasycast_payloads_{ts}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payloads, f, ensure_ascii=False)
+    print(f"[info] saved payloads to {path}")
+    return path
+
+
+def load_payloads(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _team_names(body):
+    names = {}
+    for t in body.get("teams", []) or []:
+        name = t.get("name") or f"{t.get('location', '')} {t.get('nickname', '')}"
+        if t.get("id") is not None:
+            names[t["id"]] = name.strip()
+    return names
+
+
+def _as_pct(value, percent):
+    """Format like the widget ('52%'); percent says whether the payload uses 0-100."""
+    try:
+        v = float(value)
+    except (TypeError, ValueError):
+        return ""
+    return f"{round(v if percent else v * 100)}%"
+
+
+def _win_prob(obj, side=None):
+    """First win-probability-looking value in obj (optionally for 'home'/'away')."""
+    for k, v in obj.items():
+        if not WIN_PROB_RE.search(k) or isinstance(v, (dict, list)):
+            continue
+        if side is None or side in k.lower():
+            return v
+    return None
+
+
+def _is_percent(values):
+    """
+    ESPN sends probabilities as 0-1 or 0-100. Decide once per payload: any
+    value above 1 means percentages, so a 0.8% underdog isn't read as 80%.
+    """
+    for v in values:
+        try:
+            if float(v) > 1.0:
+                return True
+        except (TypeError, ValueError):
+            continue
+    return False
+
+
+def extract_ctw_rows(payloads):
+    """
+    Return [(teamA, pctA, teamB, pctB)] (home first) for every matchup in the
+    current scoring period that carries a win probability. Pairs seen in
+    several payloads are reported once, latest payload wins.
+    """
+    names = {}
+    for p in payloads:
+        names.update(_team_names(p["body"]) if isinstance(p["body"], dict) else {})
+
+    rows = {}
+    for p in payloads:
+        body = p["body"]
+        if not isinstance(body, dict):
+            continue
+        period = (body.get("status") or {}).get("currentMatchupPeriod")
+        found = []
+        for m in body.get("schedule", []) or []:
+            if period is not None and m.get("matchupPeriodId") not in (None, period):
+                continue
+            home, away = m.get("home") or {}, m.get("away") or {}
+            if not home or not away:
+                continue
+            ph = _win_prob(home)
+            pa = _win_prob(away)
+            if ph is None:
+                ph = _win_prob(m, "home")
+            if pa is None:
+                pa = _win_prob(m, "away")
+            if ph is not None or pa is not None:
+                found.append((home, away, ph, pa))
+
+        percent = _is_percent(v for _, _, ph, pa in found for v in (ph, pa) if v is not None)
+        whole = 100.0 if percent else 1.0
+        for home, away, ph, pa in found:
+            if pa is None:
+                pa = whole - float(ph)
+            if ph is None:
+                ph = whole - float(pa)
+            a = names.get(home.get("teamId"), str(home.get("teamId")))
+            b = names.get(away.get("teamId"), str(away.get("teamId")))
+            rows[(a, b)] = (a, _as_pct(ph, percent), b, _as_pct(pa, percent))
+    return list(rows.values())
+
+
+def main():
+    if len(sys.argv) != 2:
+        print("usage: python fantasycast_network.py <payloads.json>")
+        sys.exit(2)
+    for a, pa, b, pb in extract_ctw_rows(load_payloads(sys.argv[1])):
+        print(f"{a}: {pa}")
+        print(f"{b}: {pb}")
+        print("-" * 30)
+
+
+if __name__ == "__main__":
+    main()
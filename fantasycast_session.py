@@ -0,0 +1,378 @@
+# fantasycast_session.py
+"""
+Browser setup shared by the FantasyCast scrapers: headless Chrome options,
+consent dismissal and locating the matchup iframe. Everything takes the
+driver explicitly so a long-lived session (scrapewp_daemon.py) can reuse it.
+
+The iframe path that last worked (indices plus id/src fingerprints) is kept
+in .cache/fantasycast/frame_path.json per page URL, so later runs go
+straight to it and only fall back to the DFS when the page layout changed.
+Cookies (consent + ESPN session) are kept next to it in cookies.json and
+restored before the first page load, so a run with a valid consent cookie
+skips dismiss_consent() altogether.
+pairs.json maps each pill's data-id to the matchup it showed, per league
+week, so a later run can go straight to the pills it still needs.
+"""
+import os
+import json
+import time
+import datetime
+from urllib.parse import urlsplit
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import StaleElementReferenceException
+
+import timing
+
+URL = "https://fantasy.espn.com/football/fantasycast?leagueId=31028552"
+CTW_XPATH = "//*[contains(normalize-space(),'Chance to Win')]"
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_DIR = os.path.join(SCRIPT_DIR, ".cache", "fantasycast")
+FRAME_STATE_FILE = os.path.join(STATE_DIR, "frame_path.json")
+COOKIE_FILE = os.path.join(STATE_DIR, "cookies.json")
+PAIR_STATE_FILE = os.path.join(STATE_DIR, "pairs.json")
+PAIR_WEEKS_KEPT = 4
+# Fantasy weeks run Thursday night to Monday night (early Tuesday UTC);
+# the fallback week key rolls over at this point of Tuesday, UTC
+WEEK_ROLLOVER = datetime.timedelta(days=1, hours=12)
+
+# Cookies the consent managers on espn.com set once the banner is accepted
+CONSENT_COOKIES = {"euconsent-v2", "consentUUID", "_sp_v1_consent", "OptanonAlertBoxClosed", "OptanonConsent"}
+# Fields Network.setCookies accepts out of what Network.getAllCookies returns
+COOKIE_FIELDS = ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite", "expires")
+
+
+def build_options(debugging_port=9222):
+    """Headless Chrome options used in CI (no user-data-dir)."""
+    opts = webdriver.ChromeOptions()
+    opts.add_argument("--window-size=1400,1000")
+    opts.add_argument("--disable-gpu")
+    opts.add_argument("--no-default-browser-check")
+    opts.add_argument("--no-first-run")
+    opts.add_argument("--lang=es-ES")
+
+    opts.add_argument("--headless=new")
+    opts.add_argument("--disable-dev-shm-usage")
+    opts.add_argument("--no-sandbox")
+    opts.add_argument(f"--remote-debugging-port={debugging_port}")
+    opts.add_argument("--disable-browser-side-navigation")
+    opts.add_argument("--disable-features=VizDisplayCompositor")
+    return opts
+
+
+def start_driver(opts):
+    import chromedriver_autoinstaller  # pip install chromedriver-autoinstaller
+
+    # install correct driver
+    with timing.span("chromedriver_install"):
+        chromedriver_autoinstaller.install()
+    with timing.span("chrome_start"):
+        return webdriver.Chrome(options=opts)
+
+
+# ----------- cookies -----------
+def _live(cookie, now=None):
+    expires = cookie.get("expires", -1)
+    return expires in (None, -1) or expires > (now or time.time())
+
+
+def save_cookies(driver, cookie_file=COOKIE_FILE):
+    """Store every cookie in the browser (all domains, via CDP) for the next run."""
+    try:
+        cookies = driver.execute_cdp_cmd("Network.getAllCookies", {})["cookies"]
+    except Exception:
+        cookies = driver.get_cookies()  # current domain only
+    cookies = [{k: c[k] for k in COOKIE_FIELDS if k in c} for c in cookies if _live(c)]
+    os.makedirs(os.path.dirname(cookie_file), exist_ok=True)
+    tmp = cookie_file + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"), "cookies": cookies}, f)
+    os.replace(tmp, cookie_file)
+    return len(cookies)
+
+
+def restore_cookies(driver, cookie_file=COOKIE_FILE):
+    """
+    Load saved cookies into the browser before the first driver.get().
+    Returns True when a consent cookie that hasn't expired was restored.
+    """
+    try:
+        with open(cookie_file, "r", encoding="utf-8") as f:
+            cookies = [c for c in json.load(f).get("cookies", []) if _live(c)]
+    except (OSError, ValueError):
+        return False
+    if not cookies:
+        return False
+    try:
+        driver.execute_cdp_cmd("Network.setCookies", {"cookies": cookies})
+    except Exception as e:
+        print(f"[warn] could not restore cookies: {e}")
+        return False
+    consent = any(c["name"] in CONSENT_COOKIES for c in cookies)
+    print(f"[info] restored {len(cookies)} cookies (consent cookie: {'yes' if consent else 'no'})")
+    return consent
+
+
+def open_fantasycast(driver, url=URL, max_wait=25):
+    """
+    Restore cookies, load the page and dismiss the consent banner unless a
+    consent cookie came back with the restored session. Returns True when
+    consent is known to be given.
+    """
+    with timing.span("restore_cookies") as sp:
+        sp["consent"] = restore_cookies(driver)
+    with timing.span("page_load"):
+        driver.get(url)
+    if sp["consent"]:
+        print("[info] consent cookie restored; skipping consent banner")
+        return True
+    with timing.span("dismiss_consent") as sp:
+        sp["dismissed"] = dismiss_consent(driver, max_wait)
+    print(f"[info] Consent dismissed? {sp['dismissed']}")
+    return sp["dismissed"]
+
+
+# ----------- consent -----------
+def dismiss_consent(driver, max_wait=25):
+    end = time.time() + max_wait
+    btn_x = [
+        "//button[normalize-space()='Aceptar']",
+        "//button[contains(., 'Aceptar todo') or contains(., 'Aceptar todas')]",
+        "//button[contains(., 'Estoy de acuerdo') or contains(., 'Consentir') or contains(., 'Continuar')]",
+        "//span[normalize-space()='Aceptar']/ancestor::button",
+        "//button[normalize-space()='Accept']",
+        "//button[contains(., 'Accept All') or contains(., 'Agree') or contains(., 'Continue')]",
+        "//span[normalize-space()='Accept']/ancestor::button",
+    ]
+    iframe_sel = (
+        "iframe[id^='sp_message_iframe'],iframe[title*='privacy' i],"
+        "iframe[title*='consent' i],iframe[src*='consent' i],iframe[src*='privacy' i]"
+    )
+    while time.time() < end:
+        driver.switch_to.default_content()
+        for xp in btn_x:
+            els = driver.find_elements(By.XPATH, xp)
+            if els:
+                driver.execute_script("arguments[0].click();", els[0]); return True
+        for fr in driver.find_elements(By.CSS_SELECTOR, iframe_sel):
+            try:
+                driver.switch_to.frame(fr)
+                for xp in btn_x:
+                    els = driver.find_elements(By.XPATH, xp)
+                    if els:
+                        driver.execute_script("arguments[0].click();", els[0]); return True
+            finally:
+                driver.switch_to.default_content()
+        time.sleep(0.3)
+    return False
+
+
+# ----------- find the fantasy iframe by visible text anchor -----------
+def enter_frame_path(driver, path):
+    """Switch from the top document into the iframe at the given index path."""
+    driver.switch_to.default_content()
+    for idx in path:
+        frames = driver.find_elements(By.TAG_NAME, "iframe")
+        driver.switch_to.frame(frames[idx])
+
+
+def has_ctw(driver):
+    try:
+        return bool(driver.find_elements(By.XPATH, CTW_XPATH))
+    except Exception:
+        return False
+
+
+def _page_key(url):
+    parts = urlsplit(url or "")
+    return f"{parts.scheme}://{parts.netloc}{parts.path}"
+
+
+def frame_fingerprint(frame):
+    """id plus src without its query string (ESPN adds cache-busters there)."""
+    return {"id": frame.get_attribute("id") or "", "src": _page_key(frame.get_attribute("src"))}
+
+
+def wait_document_ready(driver, timeout=15.0, poll=0.1):
+    """Wait for the top document's readyState to be 'complete'."""
+    driver.switch_to.default_content()
+    end = time.time() + timeout
+    while time.time() < end:
+        try:
+            if driver.execute_script("return document.readyState") == "complete":
+                return True
+        except Exception:
+            pass
+        time.sleep(poll)
+    return False
+
+
+def load_frame_state(state_file=FRAME_STATE_FILE):
+    try:
+        with open(state_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_frame_path(driver, path, state_file=FRAME_STATE_FILE):
+    """Record path and the fingerprints of the frames along it for this page."""
+    frames = []
+    driver.switch_to.default_content()
+    for idx in path:
+        frame = driver.find_elements(By.TAG_NAME, "iframe")[idx]
+        frames.append(frame_fingerprint(frame))
+        driver.switch_to.frame(frame)
+    state = load_frame_state(state_file)
+    state[_page_key(driver.current_url)] = {
+        "path": path, "frames": frames, "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    tmp = state_file + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1)
+    os.replace(tmp, state_file)
+
+
+# ----------- data-id -> matchup map -----------
+def week_key(league_id, year, week=None, now=None):
+    """
+    Key the pair map is stored under: the matchup week when known, else a
+    Tuesday-to-Monday week (an ISO week would split SNF/MNF off into the next).
+    """
+    if week:
+        return f"{league_id}:{year}:w{week}"
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return f"{league_id}:{year}:" + (now - WEEK_ROLLOVER).strftime("%G-W%V")
+
+
+def load_pair_map(week_key, state_file=PAIR_STATE_FILE):
+    """{data-id: (teamA, teamB)} learned for this week, {} when unknown."""
+    try:
+        with open(state_file, "r", encoding="utf-8") as f:
+            weeks = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {int(did): tuple(pair) for did, pair in weeks.get(week_key, {}).get("pairs", {}).items()}
+
+
+def save_pair_map(week_key, pairs, state_file=PAIR_STATE_FILE):
+    """Store this week's map; only the last PAIR_WEEKS_KEPT weeks are kept."""
+    try:
+        with open(state_file, "r", encoding="utf-8") as f:
+            weeks = json.load(f)
+    except (OSError, ValueError):
+        weeks = {}
+    weeks.pop(week_key, None)
+    weeks[week_key] = {"pairs": {str(did): list(pair) for did, pair in sorted(pairs.items())},
+                       "saved_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    weeks = dict(list(weeks.items())[-PAIR_WEEKS_KEPT:])
+    os.makedirs(os.path.dirname(state_file), exist_ok=True)
+    tmp = state_file + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(weeks, f, indent=1)
+    os.replace(tmp, state_file)
+
+
+def _enter_cached_path(driver, cached):
+    """
+    Walk the cached path, matching each level by fingerprint (the index is
+    only a hint, in case ads shifted the frame order). Returns the actual
+    index path when 'Chance to Win' is visible at the end, else None.
+    """
+    driver.switch_to.default_content()
+    path = []
+    for idx, want in zip(cached["path"], cached["frames"]):
+        frames = driver.find_elements(By.TAG_NAME, "iframe")
+        order = ([idx] if idx < len(frames) else []) + [i for i in range(len(frames)) if i != idx]
+        for i in order:
+            if frame_fingerprint(frames[i]) == want:
+                driver.switch_to.frame(frames[i])
+                path.append(i)
+                break
+        else:
+            return None
+    return path if has_ctw(driver) else None
+
+
+def _dfs_for_ctw(driver, max_depth):
+    driver.switch_to.default_content()
+    if has_ctw(driver):
+        return []
+
+    def dfs(path, depth=0):
+        if depth > max_depth:
+            return None
+        for i in range(len(driver.find_elements(By.TAG_NAME, "iframe"))):
+            try:
+                enter_frame_path(driver, path)  # fresh handles at this level
+                frames = driver.find_elements(By.TAG_NAME, "iframe")
+                if i >= len(frames):
+                    continue
+                driver.switch_to.frame(frames[i])
+                if has_ctw(driver):
+                    return path + [i]
+                found = dfs(path + [i], depth + 1)
+                if found:
+                    return found
+            except StaleElementReferenceException:
+                continue
+        return None
+
+    return dfs([])
+
+
+def switch_into_matchup_iframe(driver, timeout=20.0, max_depth=4, poll=0.25, state_file=FRAME_STATE_FILE):
+    """
+    Find the frame showing 'Chance to Win' and leave the driver inside it.
+    Tries the cached path for this page first (polling until it shows up,
+    no fixed sleep), then DFS over nested iframes until timeout.
+    Returns the iframe index path ([] for the top document) or None.
+    """
+    end = time.time() + timeout
+    wait_document_ready(driver, timeout)
+    page = _page_key(driver.current_url)
+    cached = load_frame_state(state_file).get(page) if state_file else None
+
+    found = None
+    if cached:
+        with timing.span("iframe_cached_path") as sp:
+            # the app fills its iframes in after readyState; give the known path a few seconds
+            cached_end = min(end, time.time() + 5.0)
+            while found is None and time.time() < cached_end:
+                try:
+                    found = _enter_cached_path(driver, cached)
+                except StaleElementReferenceException:
+                    found = None
+                if found is None:
+                    time.sleep(poll)
+            sp["hit"] = found is not None
+        if found is None:
+            print("[info] cached iframe path missed; searching all frames")
+        elif found != cached["path"]:
+            try:
+                save_frame_path(driver, found, state_file)  # same frames, shifted indices
+            except Exception as e:
+                print(f"[warn] could not save iframe path: {e}")
+
+    if found is None:
+        with timing.span("iframe_dfs") as sp:
+            while True:
+                found = _dfs_for_ctw(driver, max_depth)
+                if found is not None or time.time() >= end:
+                    break
+                time.sleep(4 * poll)  # the DFS is expensive, poll it less often
+            sp["found"] = found is not None
+        if found is not None and state_file:
+            try:
+                save_frame_path(driver, found, state_file)
+            except Exception as e:
+                print(f"[warn] could not save iframe path: {e}")
+
+    if found is None:
+        driver.switch_to.default_content()
+        return None
+    enter_frame_path(driver, found)
+    return found
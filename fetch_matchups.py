@@ -1,16 +1,18 @@
+import sys
 import json
 from datetime import datetime
-from espn_api.football import League
+from espn_cache import cached_league
 
 # Load config
 with open("config.json") as f:
     cfg = json.load(f)
 
-league = League(
+league = cached_league(
     league_id=cfg["league_id"],
     year=cfg["year"],
     swid=cfg["swid"],
-    espn_s2=cfg["espn_s2"]
+    espn_s2=cfg["espn_s2"],
+    enabled="--no-cache" not in sys.argv,
 )
 
 timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
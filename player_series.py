@@ -0,0 +1,338 @@
+# player_series.py
+"""
+Compact per-player scoring curves built from the tracker's box score ticks.
+
+Every tick fetch_matchup_rows() sees each rostered player's points and
+lineup slot. They are stored column-wise:
+
+  * players, fantasy teams and slots are interned once; observations hold
+    small integer codes (array('H') / array('B'))
+  * points and projections are array('f'), the share of the player's game
+    played array('B') (0-100), tick times array('l') epoch seconds
+  * only changes are kept: a player gets a new observation when their
+    points, slot or team differ from the previous one that week, so the many
+    ticks where nothing moved cost nothing
+
+A full season of 15-minute ticks for every rostered player stays in the
+low MB. On disk the observations are an append-only log per week,
+data/players/week-NN.jsonl, one line per tick holding only the players
+that changed; score_tracker appends to it on every write and the curves
+are rebuilt by replaying the log on read.
+
+Usage:
+    python player_series.py curve "Ja'Marr Chase" [--week 3]
+    python player_series.py at "Ja'Marr Chase" "2025-09-14 21:30:00" [--week 2]
+    python player_series.py team "Team A" --week 3
+    python player_series.py stats
+"""
+import os
+import json
+import argparse
+from array import array
+from bisect import bisect_right
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SERIES_DIR = os.path.join(SCRIPT_DIR, "data", "players")
+WEEK_FILE = "week-{:02d}.jsonl"
+
+
+def _epoch(ts):
+    if isinstance(ts, (int, float)):
+        return int(ts)
+    if not isinstance(ts, datetime):
+        ts = datetime.fromisoformat(str(ts))
+    return int(ts.timestamp())
+
+
+class PlayerSeries:
+    def __init__(self):
+        # interned tables; observations refer to these by position
+        self.player_ids, self.player_names, self.positions = [], [], []
+        self.teams, self.slots = [], []
+        # one entry per tick
+        self.tick_times = array("l")
+        self.tick_weeks = array("H")
+        # one entry per (tick, player) whose points/slot/team changed
+        self.obs_tick = array("I")
+        self.obs_player = array("H")
+        self.obs_team = array("B")
+        self.obs_slot = array("B")
+        self.obs_points = array("f")
+        self.obs_projected = array("f")
+        self.obs_played = array("B")
+        self._reindex()
+
+    def _reindex(self):
+        self._player_index = {pid: i for i, pid in enumerate(self.player_ids)}
+        self._team_index = {t: i for i, t in enumerate(self.teams)}
+        self._slot_index = {s: i for i, s in enumerate(self.slots)}
+        self._by_player = {}   # player code -> array of observation positions
+        self._last = {}        # (week, player code) -> (team, slot, points, projected, played) last stored
+        for k in range(len(self.obs_tick)):
+            self._note(k)
+
+    def _note(self, k):
+        p = self.obs_player[k]
+        self._by_player.setdefault(p, array("I")).append(k)
+        week = self.tick_weeks[self.obs_tick[k]]
+        self._last[(week, p)] = (self.obs_team[k], self.obs_slot[k], self.obs_points[k],
+                                 self.obs_projected[k], self.obs_played[k])
+
+    @staticmethod
+    def _intern(value, table, index):
+        i = index.get(value)
+        if i is None:
+            i = index[value] = len(table)
+            table.append(value)
+        return i
+
+    # ----------- building -----------
+    def add_tick(self, ts, week, players):
+        """
+        Record one tick. players yields (team, player_id, name, position,
+        slot, points[, projected, played %]). Ticks at or before the last
+        recorded one are ignored, so re-flushing the same rows is harmless.
+        Returns observations added.
+        """
+        t = _epoch(ts)
+        if self.tick_times and t <= self.tick_times[-1]:
+            return 0
+        week = int(week or 0)
+        tick = len(self.tick_times)
+        self.tick_times.append(t)
+        self.tick_weeks.append(week)
+
+        added = 0
+        for team, pid, name, position, slot, points, *extra in players:
+            projected, played = (list(extra) + [0.0, 0])[:2]
+            p = self._player_index.get(pid)
+            if p is None:
+                p = self._player_index[pid] = len(self.player_ids)
+                self.player_ids.append(pid)
+                self.player_names.append(name)
+                self.positions.append(position)
+            code = (self._intern(team, self.teams, self._team_index),
+                    self._intern(slot or "", self.slots, self._slot_index),
+                    array("f", [float(points or 0.0)])[0],  # compare at stored precision
+                    array("f", [float(projected or 0.0)])[0],
+                    min(max(int(played or 0), 0), 100))
+            if self._last.get((week, p)) == code:
+                continue
+            self.obs_tick.append(tick)
+            self.obs_player.append(p)
+            self.obs_team.append(code[0])
+            self.obs_slot.append(code[1])
+            self.obs_points.append(code[2])
+            self.obs_projected.append(code[3])
+            self.obs_played.append(code[4])
+            self._note(len(self.obs_tick) - 1)
+            added += 1
+        return added
+
+    def add_rows(self, rows):
+        """Add tracker rows that carry a 'players' list; rows of one tick share a timestamp."""
+        ticks = {}
+        for r in rows:
+            if r.get("players"):
+                ticks.setdefault((r["timestamp"], r.get("week")), []).extend(r["players"])
+        return sum(self.add_tick(ts, week, players) for (ts, week), players in sorted(ticks.items(), key=lambda kv: str(kv[0][0])))
+
+    # ----------- queries -----------
+    def find(self, player):
+        """Interned code for an ESPN player id or a (case-insensitive, then partial) name."""
+        if isinstance(player, int) or str(player).isdigit():
+            p = self._player_index.get(int(player))
+            if p is not None:
+                return p
+        want = str(player).strip().lower()
+        names = [n.lower() for n in self.player_names]
+        if want in names:
+            return names.index(want)
+        hits = [i for i, n in enumerate(names) if want in n]
+        if len(hits) == 1:
+            return hits[0]
+        raise KeyError(f"{'Ambiguous' if hits else 'Unknown'} player: {player}")
+
+    def _observations(self, p, week=None):
+        for k in self._by_player.get(p, ()):
+            if week is None or self.tick_weeks[self.obs_tick[k]] == week:
+                yield k
+
+    def curve(self, player, week=None):
+        """[(datetime, points, slot, team)] at every change, oldest first."""
+        return self._curve(self.find(player), week)
+
+    def _curve(self, p, week=None):
+        return [(datetime.fromtimestamp(self.tick_times[self.obs_tick[k]]), round(self.obs_points[k], 2),
+                 self.slots[self.obs_slot[k]], self.teams[self.obs_team[k]])
+                for k in self._observations(p, week)]
+
+    def at(self, player, when, week=None):
+        """(points, slot, team) of player at when, or None before their first tick."""
+        p = self.find(player)
+        obs = list(self._observations(p, week))
+        times = [self.tick_times[self.obs_tick[k]] for k in obs]
+        i = bisect_right(times, _epoch(when)) - 1
+        if i < 0:
+            return None
+        k = obs[i]
+        return round(self.obs_points[k], 2), self.slots[self.obs_slot[k]], self.teams[self.obs_team[k]]
+
+    def team_curves(self, team, week):
+        """{player name: curve} for everyone who was on team's roster that week."""
+        t = self._team_index.get(team)
+        if t is None:
+            raise KeyError(f"Unknown team: {team}")
+        out = {}
+        for p in sorted({self.obs_player[k] for k in range(len(self.obs_tick))
+                         if self.obs_team[k] == t and self.tick_weeks[self.obs_tick[k]] == week}):
+            out[self.player_names[p]] = self._curve(p, week)
+        return out
+
+    def lineups_at(self, week, when):
+        """
+        {team: [(slot, points, projected, played %)]} for week as it stood
+        at when: every player's latest observation up to then. A player
+        dropped mid-week stays with their last team.
+        """
+        t, latest = _epoch(when), {}
+        for k in range(len(self.obs_tick)):
+            tick = self.obs_tick[k]
+            if self.tick_weeks[tick] == week and self.tick_times[tick] <= t:
+                latest[self.obs_player[k]] = k
+        out = {}
+        for k in latest.values():
+            out.setdefault(self.teams[self.obs_team[k]], []).append(
+                (self.slots[self.obs_slot[k]], self.obs_points[k], self.obs_projected[k], self.obs_played[k]))
+        return out
+
+    def week_ticks(self, week):
+        """Epoch times of the logged ticks of week, oldest first."""
+        return [t for t, w in zip(self.tick_times, self.tick_weeks) if w == week]
+
+    def nbytes(self):
+        cols = (self.tick_times, self.tick_weeks, self.obs_tick, self.obs_player,
+                self.obs_team, self.obs_slot, self.obs_points, self.obs_projected, self.obs_played)
+        return sum(c.itemsize * len(c) for c in cols)
+
+    def __len__(self):
+        return len(self.obs_tick)
+
+    # ----------- persistence -----------
+    def tick_lines(self, start=0):
+        """
+        (week, log line) for every tick from position start on that added
+        observations; a line is {"t": epoch, "w": week, "p": [[team, id,
+        name, position, slot, points, projected, played], ...]}, replayable
+        with add_tick.
+        """
+        by_tick = {}
+        for k in range(len(self.obs_tick)):
+            tick = self.obs_tick[k]
+            if tick >= start:
+                p = self.obs_player[k]
+                by_tick.setdefault(tick, []).append(
+                    [self.teams[self.obs_team[k]], self.player_ids[p], self.player_names[p], self.positions[p],
+                     self.slots[self.obs_slot[k]], round(self.obs_points[k], 2),
+                     round(self.obs_projected[k], 2), self.obs_played[k]])
+        for tick in sorted(by_tick):
+            week = self.tick_weeks[tick]
+            line = json.dumps({"t": self.tick_times[tick], "w": week, "p": by_tick[tick]}, ensure_ascii=False)
+            yield week, line
+
+
+def _week_path(root, week):
+    return os.path.join(root, WEEK_FILE.format(int(week or 0)))
+
+
+def _log_weeks(root):
+    weeks = []
+    for name in os.listdir(root) if os.path.isdir(root) else []:
+        stem = name[len("week-"):-len(".jsonl")]
+        if name.startswith("week-") and name.endswith(".jsonl") and stem.isdigit():
+            weeks.append(int(stem))
+    return sorted(weeks)
+
+
+def load(root=SERIES_DIR, weeks=None):
+    """Rebuild the series by replaying the week logs (all of them, or just weeks)."""
+    series = PlayerSeries()
+    for week in sorted(weeks) if weeks is not None else _log_weeks(root):
+        path = _week_path(root, week)
+        if not os.path.exists(path):
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    tick = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash mid-append
+                series.add_tick(tick["t"], tick["w"], (tuple(p) for p in tick["p"]))
+    return series
+
+
+# week logs already replayed by record() in this process: (root, week) -> (bytes read, series)
+_loaded = {}
+
+
+def record(rows, root=SERIES_DIR):
+    """
+    Append the changes carried by tracker rows to the week logs. Only the
+    weeks in rows are replayed (once per process while the log isn't
+    touched by anyone else). Returns (series of the newest week, observations added).
+    """
+    weeks = sorted({int(r.get("week") or 0) for r in rows if r.get("players")})
+    series, added = PlayerSeries(), 0
+    for week in weeks:
+        path = _week_path(root, week)
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        key = (os.path.abspath(root), week)
+        cached = _loaded.get(key)
+        series = cached[1] if cached and cached[0] == size else load(root, [week])
+        start = len(series.tick_times)
+        added += series.add_rows([r for r in rows if int(r.get("week") or 0) == week])
+        lines = [line for _, line in series.tick_lines(start)]
+        if lines:
+            os.makedirs(root, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            size = os.path.getsize(path)
+        _loaded[key] = (size, series)
+    return series, added
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-player scoring curves")
+    parser.add_argument("--dir", default=SERIES_DIR)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_curve = sub.add_parser("curve", help="points over time for one player")
+    p_curve.add_argument("player")
+    p_curve.add_argument("--week", type=int, default=None)
+    p_at = sub.add_parser("at", help="points of one player at a point in time")
+    p_at.add_argument("player")
+    p_at.add_argument("when")
+    p_at.add_argument("--week", type=int, default=None)
+    p_team = sub.add_parser("team", help="curves for a fantasy team's roster")
+    p_team.add_argument("team")
+    p_team.add_argument("--week", type=int, required=True)
+    sub.add_parser("stats", help="size of the series")
+    args = parser.parse_args()
+
+    series = load(args.dir, weeks=[args.week] if getattr(args, "week", None) else None)
+    if args.cmd == "curve":
+        for when, pts, slot, team in series.curve(args.player, args.week):
+            print(f"{when:%Y-%m-%d %H:%M}  {pts:7.2f}  {slot:<8} {team}")
+    elif args.cmd == "at":
+        print(series.at(args.player, args.when, args.week))
+    elif args.cmd == "team":
+        for name, curve in series.team_curves(args.team, args.week).items():
+            last = curve[-1]
+            print(f"{name:<28}{last[1]:7.2f}  {last[2]:<8} ({len(curve)} changes)")
+    elif args.cmd == "stats":
+        print(f"{len(series.tick_times)} ticks, {len(series.player_ids)} players, {len(series.teams)} teams, "
+              f"{len(series)} observations, {series.nbytes() / 1e6:.2f} MB of columns")
+
+
+if __name__ == "__main__":
+    main()
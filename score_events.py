@@ -0,0 +1,279 @@
+# score_events.py
+"""
+Streaming score-change events for the tracker.
+
+Each fetch_matchup_rows() result is compared with the previous one and
+turned into typed events:
+
+    big_play         a team gained >= big_play points since the last tick
+    lead_change      the other side of a matchup is now ahead
+    stat_correction  a team's score went down
+    score_reset      a team's score dropped to zero (ESPN mid-refresh glitch);
+                     reported once, until the score comes back
+
+Only the last score per (week, team) and the leader per matchup are kept,
+so a tick costs the same however long the season's history is. State is a
+small JSON sidecar (score_events_state.json) so cron runs pick up where
+the last one stopped.
+
+Events go to sinks: callables taking one event dict. Built-in kinds are
+"jsonl[:path]" (default data/events/events.jsonl), "print" and
+"webhook:<url>" (posted from a background thread, so a slow endpoint
+never holds up a tick); "py:<module>.<callable>" loads a factory from
+any module and register_sink() adds new kinds. The tracker reads the list from
+EVENT_SINKS / config.json "event_sinks".
+
+Usage:
+    python score_events.py [--type big_play] [--team "Team A"] [--last 20]
+"""
+import os
+import json
+import queue
+import argparse
+import importlib
+import threading
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+EVENTS_FILE = os.path.join(SCRIPT_DIR, "data", "events", "events.jsonl")
+STATE_FILE = os.path.join(SCRIPT_DIR, "score_events_state.json")
+BIG_PLAY_POINTS = 6.0
+EVENT_TYPES = ("big_play", "lead_change", "stat_correction", "score_reset")
+
+
+# ----------- sinks -----------
+class JsonlSink:
+    def __init__(self, path=EVENTS_FILE):
+        self.path = path
+
+    def __call__(self, event):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+
+def print_sink(event):
+    t = event["type"]
+    if t == "big_play":
+        print(f"[INFO] Big play! {event['team']} jumped {event['delta']:.2f} points to {event['score']}")
+    elif t == "lead_change":
+        print(f"[INFO] Lead change: {event['team']} now leads {event['opponent']} "
+              f"{event['score']} - {event['opponent_score']}")
+    elif t == "stat_correction":
+        print(f"[INFO] Stat correction: {event['team']} {event['previous']} -> {event['score']}")
+    else:
+        print(f"[WARN] Score reset: {event['team']} dropped from {event['previous']} to 0")
+
+
+class WebhookSink:
+    """
+    POST each event as JSON (stdlib only). Calls only enqueue; a daemon
+    thread does the posting with a short timeout, and events are dropped
+    with a warning when the endpoint falls max_pending behind.
+    """
+
+    def __init__(self, url, timeout=3, max_pending=200):
+        self.url, self.timeout = url, timeout
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = None
+
+    def __call__(self, event):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="webhook-sink", daemon=True)
+            self._thread.start()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            print(f"[WARN] Webhook {self.url} is behind; dropped a {event['type']} event")
+
+    def _post(self, event):
+        from urllib.request import Request, urlopen
+        req = Request(self.url, data=json.dumps(event).encode("utf-8"),
+                      headers={"Content-Type": "application/json"}, method="POST")
+        with urlopen(req, timeout=self.timeout) as resp:
+            resp.read()
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            try:
+                self._post(event)
+            except Exception as e:
+                print(f"[WARN] Webhook {self.url} failed: {e}")
+            finally:
+                self._queue.task_done()
+
+    def close(self, wait=10):
+        """Give queued events up to wait seconds to go out (one-shot runs exit right after)."""
+        if self._thread is None:
+            return
+        done = threading.Thread(target=self._queue.join, daemon=True)
+        done.start()
+        done.join(wait)
+        if done.is_alive():
+            print(f"[WARN] Webhook {self.url}: {self._queue.qsize()} event(s) not sent")
+
+
+def _python_sink(target):
+    module, _, attr = target.rpartition(".")
+    return getattr(importlib.import_module(module), attr)()
+
+
+SINK_FACTORIES = {
+    "jsonl": lambda arg: JsonlSink(arg or EVENTS_FILE),
+    "print": lambda arg: print_sink,
+    "webhook": lambda arg: WebhookSink(arg),
+    "py": _python_sink,
+}
+
+
+def register_sink(kind, factory):
+    """factory(arg) -> callable(event); arg is the text after 'kind:' (or '')."""
+    SINK_FACTORIES[kind] = factory
+
+
+def build_sinks(specs):
+    """['jsonl', 'print', 'webhook:https://...'] (or one comma-separated string) -> callables."""
+    if isinstance(specs, str):
+        specs = [s for s in specs.split(",") if s.strip()]
+    sinks = []
+    for spec in specs:
+        kind, _, arg = spec.strip().partition(":")
+        factory = SINK_FACTORIES.get(kind)
+        if factory is None:
+            print(f"[WARN] Unknown event sink {spec!r}; known: {', '.join(SINK_FACTORIES)}")
+            continue
+        try:
+            sinks.append(factory(arg))
+        except Exception as e:
+            print(f"[WARN] Could not set up event sink {spec!r}: {e}")
+    return sinks
+
+
+# ----------- detection -----------
+class ScoreEventDetector:
+    def __init__(self, sinks=(), big_play=BIG_PLAY_POINTS, state_path=STATE_FILE):
+        self.sinks = list(sinks)
+        self.big_play = big_play
+        self.state_path = state_path
+        self.scores = {}    # "week|team" -> last score
+        self.leaders = {}   # "week|home|away" -> "home" / "away" / None (tied)
+        self.resets = set()  # "week|team" keys currently reading 0 after a real score
+        self.week = None    # newest week seen; older weeks' state is dropped
+        if state_path and os.path.exists(state_path):
+            try:
+                with open(state_path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+                self.scores, self.leaders, self.week = state["scores"], state["leaders"], state.get("week")
+                self.resets = set(state.get("resets", []))
+            except Exception as e:
+                print(f"[WARN] Could not read {state_path}, starting event detection fresh: {e}")
+
+    def _side(self, ts, week, team, score, opponent, events):
+        """Update one team's score; returns False when the value is a reset to ignore."""
+        key = f"{week}|{team}"
+        prev = self.scores.get(key)
+        base = {"timestamp": ts, "week": week, "team": team, "opponent": opponent,
+                "score": score, "previous": prev}
+        if prev is None:
+            self.scores[key] = score
+            return True
+        delta = round(score - prev, 2)
+        if score == 0 and prev > 0:
+            # keep the last good value so the recovery isn't reported as a big play,
+            # and report the reset once rather than on every tick it lasts
+            if key not in self.resets:
+                self.resets.add(key)
+                events.append(dict(base, type="score_reset", delta=delta))
+            return False
+        self.resets.discard(key)
+        if delta >= self.big_play:
+            events.append(dict(base, type="big_play", delta=delta))
+        elif delta < 0:
+            events.append(dict(base, type="stat_correction", delta=delta))
+        self.scores[key] = score
+        return True
+
+    def process(self, rows):
+        """Compare one tick of tracker rows with the previous tick; emit and return the events."""
+        events = []
+        weeks = [r["week"] for r in rows if r.get("week") is not None]
+        if weeks and (self.week is None or max(weeks) > self.week):
+            self.week = max(weeks)
+            keep = (f"{self.week}|", f"{self.week - 1}|")
+            self.scores = {k: v for k, v in self.scores.items() if k.startswith(keep)}
+            self.leaders = {k: v for k, v in self.leaders.items() if k.startswith(keep)}
+            self.resets = {k for k in self.resets if k.startswith(keep)}
+
+        for r in rows:
+            ts, week = r["timestamp"], r.get("week")
+            home, away = r["home_team"], r["away_team"]
+            hs, as_ = round(float(r["home_score"] or 0.0), 2), round(float(r["away_score"] or 0.0), 2)
+            ok = self._side(ts, week, home, hs, away, events)
+            ok = self._side(ts, week, away, as_, home, events) and ok
+            if not ok:
+                continue
+
+            key = f"{week}|{home}|{away}"
+            leader = "home" if hs > as_ else "away" if as_ > hs else None
+            prev = self.leaders.get(key)
+            if leader and prev and leader != prev:
+                team, opp, score, opp_score = (home, away, hs, as_) if leader == "home" else (away, home, as_, hs)
+                events.append({"timestamp": ts, "week": week, "type": "lead_change", "team": team,
+                               "opponent": opp, "score": score, "opponent_score": opp_score})
+            if leader:
+                self.leaders[key] = leader
+
+        for event in events:
+            for sink in self.sinks:
+                try:
+                    sink(event)
+                except Exception as e:
+                    print(f"[WARN] Event sink {getattr(sink, '__name__', type(sink).__name__)} failed: {e}")
+        return events
+
+    def save(self):
+        if not self.state_path:
+            return
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"week": self.week, "scores": self.scores, "leaders": self.leaders,
+                       "resets": sorted(self.resets)}, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, self.state_path)
+
+    def close(self):
+        """Let sinks with background work (webhooks) finish before the process exits."""
+        for sink in self.sinks:
+            if hasattr(sink, "close"):
+                sink.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show recorded score events")
+    parser.add_argument("--file", default=EVENTS_FILE)
+    parser.add_argument("--type", choices=EVENT_TYPES, default=None)
+    parser.add_argument("--team", default=None)
+    parser.add_argument("--last", type=int, default=20)
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"[INFO] No events recorded yet ({args.file})")
+        return
+    events = []
+    with open(args.file, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                ev = json.loads(line)
+            except ValueError:
+                continue
+            if args.type and ev["type"] != args.type:
+                continue
+            if args.team and args.team not in (ev.get("team"), ev.get("opponent")):
+                continue
+            events.append(ev)
+    for ev in events[-args.last:]:
+        print(f"{ev['timestamp']}  wk{ev['week']}  {ev['type']:<16}{ev['team']:<28}"
+              f"{ev.get('previous', '')!s:>8} -> {ev['score']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# score_history.py
+"""
+Time-indexed view of scores.csv for point-in-time questions.
+
+Rows are kept sorted by timestamp per (week, home, away) matchup, so
+"score of X vs Y at 21:30" is a binary search instead of a file scan.
+The index is pickled under .cache/ together with the byte offset it has
+read up to; refresh() only parses what score_tracker appended since.
+
+Usage:
+    python score_history.py at "Team A" "Team B" "2025-09-14 21:30:00"
+    python score_history.py range "Team A" "Team B" [--since ...] [--until ...]
+    python score_history.py team "Team A" [--week 2]
+"""
+import os
+import csv
+import pickle
+import argparse
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from heapq import merge
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCORES_FILE = os.path.join(SCRIPT_DIR, "scores.csv")
+INDEX_FILE = os.path.join(SCRIPT_DIR, ".cache", "score_history.pkl")
+HEAD_BYTES = 4096
+
+
+def _to_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+class Series:
+    """Parallel timestamp/score lists for one matchup, sorted by timestamp."""
+
+    __slots__ = ("times", "home_scores", "away_scores")
+
+    def __init__(self):
+        self.times, self.home_scores, self.away_scores = [], [], []
+
+    def add(self, ts, hs, as_):
+        if not self.times or ts >= self.times[-1]:  # tracker appends in order
+            i = len(self.times)
+        else:
+            i = bisect_right(self.times, ts)
+        self.times.insert(i, ts)
+        self.home_scores.insert(i, hs)
+        self.away_scores.insert(i, as_)
+
+    def at(self, when):
+        """Index of the last row at or before when, or None."""
+        i = bisect_right(self.times, when) - 1
+        return i if i >= 0 else None
+
+    def between(self, since=None, until=None):
+        lo = 0 if since is None else bisect_left(self.times, since)
+        hi = len(self.times) if until is None else bisect_right(self.times, until)
+        return range(lo, hi)
+
+
+class ScoreHistory:
+    def __init__(self, csv_path=SCORES_FILE):
+        self.csv_path = csv_path
+        self.offset = 0
+        self.head = b""
+        self.series = {}    # (week, home, away) -> Series
+        self.by_team = {}   # team -> sorted list of (week, home, away) keys
+        self.by_pair = {}   # frozenset(teams) -> keys, oldest meeting first
+
+    # ----------- building -----------
+    def add_rows(self, rows):
+        """Add tracker rows (dicts with timestamp/week/home_team/home_score/...)."""
+        for r in rows:
+            week = int(r["week"]) if r.get("week") not in (None, "") else None
+            home, away = str(r["home_team"]).strip(), str(r["away_team"]).strip()
+            key = (week, home, away)
+            s = self.series.get(key)
+            if s is None:
+                s = self.series[key] = Series()
+                for team in (home, away):
+                    insort(self.by_team.setdefault(team, []), key, key=lambda k: (k[0] is None, k[0] or 0, k))
+                self.by_pair.setdefault(frozenset((home, away)), []).append(key)
+            s.add(_to_datetime(r["timestamp"]), float(r["home_score"]), float(r["away_score"]))
+
+    def _parse_lines(self, lines):
+        rows = []
+        # csv.writer quotes names with commas/quotes, so parse like score_store.read_tracker_csv
+        for rec in csv.reader(line.decode("utf-8") for line in lines):
+            if len(rec) != 6:
+                continue  # the early timestamp,team,score rows
+            ts, week, home, hs, away, as_ = rec
+            try:
+                rows.append({"timestamp": datetime.fromisoformat(ts), "week": week,
+                             "home_team": home, "home_score": hs, "away_team": away, "away_score": as_})
+            except ValueError:
+                continue
+        self.add_rows(rows)
+        return len(rows)
+
+    def refresh(self):
+        """
+        Index whatever was appended to the CSV since the last refresh.
+        A file that shrank or was rewritten triggers a full rebuild.
+        Returns the number of rows added.
+        """
+        if not os.path.exists(self.csv_path):
+            return 0
+        with open(self.csv_path, "rb") as f:
+            head = f.read(HEAD_BYTES)
+            size = os.fstat(f.fileno()).st_size
+            if size < self.offset or head[:len(self.head)] != self.head:
+                print("[info] scores.csv was rewritten; rebuilding history index")
+                self.__init__(self.csv_path)
+            self.head = head
+            f.seek(self.offset)
+            chunk = f.read()
+        if not chunk:
+            return 0
+        end = chunk.rfind(b"\n") + 1  # leave a half-written last line for next time
+        lines = chunk[:end].split(b"\n")[:-1]
+        if self.offset == 0 and lines:
+            lines = lines[1:]  # header
+        self.offset += end
+        return self._parse_lines(lines)
+
+    # ----------- queries -----------
+    def _meeting(self, team_a, team_b, when, week=None):
+        keys = self.by_pair.get(frozenset((team_a.strip(), team_b.strip())), [])
+        if week is not None:
+            keys = [k for k in keys if k[0] == int(week)]
+        # latest meeting that had started by `when`
+        best = None
+        for k in keys:
+            s = self.series[k]
+            if s.times and s.times[0] <= when and (best is None or s.times[0] >= self.series[best].times[0]):
+                best = k
+        return best
+
+    def _row(self, key, i):
+        week, home, away = key
+        s = self.series[key]
+        return {"timestamp": s.times[i], "week": week, "home_team": home, "home_score": s.home_scores[i],
+                "away_team": away, "away_score": s.away_scores[i]}
+
+    def score_at(self, team_a, team_b, when, week=None):
+        """Last recorded row of the A-vs-B matchup at or before when, or None."""
+        when = _to_datetime(when)
+        key = self._meeting(team_a, team_b, when, week)
+        if key is None:
+            return None
+        i = self.series[key].at(when)
+        return None if i is None else self._row(key, i)
+
+    def matchup_range(self, team_a, team_b, since=None, until=None, week=None):
+        """All rows of A-vs-B meetings between since and until, oldest first."""
+        since, until = _to_datetime(since), _to_datetime(until)
+        keys = self.by_pair.get(frozenset((team_a.strip(), team_b.strip())), [])
+        out = []
+        for k in keys:
+            if week is None or k[0] == int(week):
+                out.extend(self._row(k, i) for i in self.series[k].between(since, until))
+        return sorted(out, key=lambda r: r["timestamp"])
+
+    def team_series(self, team, since=None, until=None, week=None):
+        """
+        One team's score over time across all its matchups.
+        Yields (timestamp, week, score, opponent, opponent_score), oldest first.
+        """
+        team = team.strip()
+        since, until = _to_datetime(since), _to_datetime(until)
+
+        def one(key):
+            wk, home, away = key
+            s = self.series[key]
+            is_home = home == team
+            for i in s.between(since, until):
+                if is_home:
+                    yield s.times[i], wk, s.home_scores[i], away, s.away_scores[i]
+                else:
+                    yield s.times[i], wk, s.away_scores[i], home, s.home_scores[i]
+
+        keys = [k for k in self.by_team.get(team, []) if week is None or k[0] == int(week)]
+        return merge(*(one(k) for k in keys), key=lambda x: x[0])
+
+    def __len__(self):
+        return sum(len(s.times) for s in self.series.values())
+
+
+def load(csv_path=SCORES_FILE, index_path=INDEX_FILE):
+    """Load the pickled index (if any), catch up with the CSV and save it back."""
+    hist = None
+    if os.path.exists(index_path):
+        try:
+            with open(index_path, "rb") as f:
+                hist = pickle.load(f)
+            if os.path.abspath(hist.csv_path) != os.path.abspath(csv_path):
+                hist = None
+        except Exception as e:
+            print(f"[warn] ignoring unreadable history index: {e}")
+            hist = None
+    hist = hist or ScoreHistory(csv_path)
+    if hist.refresh():
+        save(hist, index_path)
+    return hist
+
+
+def save(hist, index_path=INDEX_FILE):
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp = index_path + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(hist, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, index_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Point-in-time queries over scores.csv")
+    parser.add_argument("--csv", default=SCORES_FILE)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_at = sub.add_parser("at", help="score of a matchup at a given time")
+    p_at.add_argument("team_a")
+    p_at.add_argument("team_b")
+    p_at.add_argument("when")
+    p_at.add_argument("--week", type=int, default=None)
+
+    p_range = sub.add_parser("range", help="rows of a matchup between two times")
+    p_range.add_argument("team_a")
+    p_range.add_argument("team_b")
+    p_range.add_argument("--since", default=None)
+    p_range.add_argument("--until", default=None)
+    p_range.add_argument("--week", type=int, default=None)
+
+    p_team = sub.add_parser("team", help="one team's score over time")
+    p_team.add_argument("team")
+    p_team.add_argument("--since", default=None)
+    p_team.add_argument("--until", default=None)
+    p_team.add_argument("--week", type=int, default=None)
+    args = parser.parse_args()
+
+    hist = load(args.csv)
+    if args.cmd == "at":
+        row = hist.score_at(args.team_a, args.team_b, args.when, args.week)
+        print(row if row else "[info] no score recorded at that time")
+    elif args.cmd == "range":
+        for r in hist.matchup_range(args.team_a, args.team_b, args.since, args.until, args.week):
+            print(f"{r['timestamp']}  wk{r['week']}  {r['home_team']} {r['home_score']} - "
+                  f"{r['away_score']} {r['away_team']}")
+    elif args.cmd == "team":
+        for ts, week, score, opp, opp_score in hist.team_series(args.team, args.since, args.until, args.week):
+            print(f"{ts}  wk{week}  {score:7.2f}  vs {opp} ({opp_score:.2f})")
+
+
+if __name__ == "__main__":
+    main()
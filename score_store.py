@@ -0,0 +1,243 @@
+# score_store.py
+"""
+Columnar score store: week partitions under data/store/week=<n>/, with team
+names dictionary-encoded. Every append writes one small part-<ts>.parquet
+file holding just the new rows, so a tick costs O(new rows); queries scan
+all parts of the partitions they need. `compact` folds a week's parts into
+one file; the tracker calls `auto_compact` after each append, which does
+that for finished weeks and for the current week every MAX_PARTS parts.
+
+Usage:
+    python score_store.py backfill [--csv scores.csv]
+    python score_store.py compact [--week N]
+    python score_store.py query [--team NAME] [--week N] [--since "2025-10-05 17:00:00"]
+"""
+import os
+import csv
+import shutil
+import argparse
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.path.join(SCRIPT_DIR, "data", "store")
+PART_PREFIX = "part-"
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+MAX_PARTS = 64  # current-week parts allowed before auto_compact folds them
+
+TEAM_TYPE = pa.dictionary(pa.int32(), pa.string())
+SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("s")),
+    ("home_team", TEAM_TYPE),
+    ("home_score", pa.float64()),
+    ("away_team", TEAM_TYPE),
+    ("away_score", pa.float64()),
+])
+PARTITIONING = ds.partitioning(pa.schema([("week", pa.int32())]), flavor="hive")
+# Parquet hands second timestamps back as ms; reading with this schema casts them back
+DATASET_SCHEMA = SCHEMA.append(pa.field("week", pa.int32()))
+
+
+def _to_datetime(value):
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.strptime(str(value), TS_FORMAT)
+
+
+def _rows_to_table(rows):
+    """Build an Arrow table (without the week column) from tracker rows."""
+    return pa.table({
+        "timestamp": pa.array([_to_datetime(r["timestamp"]) for r in rows], type=pa.timestamp("s")),
+        "home_team": pa.array([r["home_team"] for r in rows], type=pa.string()).dictionary_encode(),
+        "home_score": pa.array([float(r["home_score"]) for r in rows], type=pa.float64()),
+        "away_team": pa.array([r["away_team"] for r in rows], type=pa.string()).dictionary_encode(),
+        "away_score": pa.array([float(r["away_score"]) for r in rows], type=pa.float64()),
+    }, schema=SCHEMA)
+
+
+def _week_dir(root, week):
+    return os.path.join(root, f"week={int(week)}")
+
+
+def _part_name():
+    # sorts in write order; pid keeps two writers in the same microsecond apart
+    return f"{PART_PREFIX}{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}-{os.getpid()}.parquet"
+
+
+def _write_part(table, week_dir):
+    os.makedirs(week_dir, exist_ok=True)
+    path = os.path.join(week_dir, _part_name())
+    tmp = path + ".tmp"
+    pq.write_table(table, tmp, use_dictionary=True, compression="zstd")
+    os.replace(tmp, path)
+    return path
+
+
+def append_rows(rows, root=STORE_DIR):
+    """
+    Append tracker rows (dicts with timestamp/week/home_team/...) to the store.
+    Each week present in rows gets one new part file; nothing existing is
+    read or rewritten.
+    """
+    by_week = {}
+    for r in rows:
+        if r.get("week") is None:
+            continue
+        by_week.setdefault(int(r["week"]), []).append(r)
+
+    for week, week_rows in by_week.items():
+        path = _write_part(_rows_to_table(week_rows), _week_dir(root, week))
+        print(f"[DEBUG] Store: week {week} +{len(week_rows)} rows ({os.path.basename(path)})")
+
+
+def _read_week(week, columns=None, root=STORE_DIR):
+    week_dir = _week_dir(root, week)
+    if not os.path.isdir(week_dir) or not any(n.endswith(".parquet") for n in os.listdir(week_dir)):
+        return SCHEMA.empty_table() if columns is None else SCHEMA.empty_table().select(columns)
+    dataset = ds.dataset(week_dir, format="parquet", schema=SCHEMA, exclude_invalid_files=True)
+    return dataset.to_table(columns=columns)
+
+
+def load_week(week, columns=None, root=STORE_DIR):
+    """Read a single week's partition (all its parts) without touching other weeks."""
+    return _read_week(week, columns, root).to_pandas()
+
+
+def compact(week=None, root=STORE_DIR):
+    """Fold each week's part files into one (all weeks when week is None)."""
+    if not os.path.isdir(root):
+        return
+    weeks = [int(week)] if week is not None else sorted(
+        int(d.split("=", 1)[1]) for d in os.listdir(root) if d.startswith("week="))
+    for w in weeks:
+        week_dir = _week_dir(root, w)
+        parts = sorted(n for n in os.listdir(week_dir) if n.endswith(".parquet")) if os.path.isdir(week_dir) else []
+        if len(parts) < 2:
+            continue
+        table = _read_week(w, root=root).combine_chunks().unify_dictionaries()
+        _write_part(table, week_dir)
+        for name in parts:
+            os.remove(os.path.join(week_dir, name))
+        print(f"[INFO] Store: week {w} compacted {len(parts)} parts -> 1 ({table.num_rows} rows)")
+
+
+def _part_count(root, week):
+    week_dir = _week_dir(root, week)
+    return sum(1 for n in os.listdir(week_dir) if n.endswith(".parquet")) if os.path.isdir(week_dir) else 0
+
+
+def auto_compact(current_week, root=STORE_DIR, max_parts=MAX_PARTS):
+    """
+    Keep single-week reads cheap as ticks pile up: weeks before current_week
+    are folded to one file, the current week once it passes max_parts parts.
+    """
+    if current_week is None or not os.path.isdir(root):
+        return
+    for d in os.listdir(root):
+        if not d.startswith("week="):
+            continue
+        w = int(d.split("=", 1)[1])
+        n = _part_count(root, w)
+        if (w < current_week and n > 1) or n > max_parts:
+            compact(w, root)
+
+
+def history(team=None, week=None, since=None, until=None, columns=None, root=STORE_DIR):
+    """
+    Query the store as a pandas DataFrame.
+
+    team:   only matchups involving this team (home or away)
+    week:   int or list of ints; prunes partitions
+    since/until: datetime or "YYYY-MM-DD HH:MM:SS" bounds on timestamp
+    columns: subset of columns to return (week is always available)
+    """
+    if not os.path.isdir(root):
+        return SCHEMA.empty_table().to_pandas()
+
+    dataset = ds.dataset(root, format="parquet", partitioning=PARTITIONING, schema=DATASET_SCHEMA,
+                         exclude_invalid_files=True)
+
+    expr = None
+    def _and(e):
+        return e if expr is None else expr & e
+
+    if week is not None:
+        weeks = [int(week)] if isinstance(week, (int, str)) else [int(w) for w in week]
+        expr = _and(ds.field("week").isin(weeks))
+    if since is not None:
+        expr = _and(ds.field("timestamp") >= pa.scalar(_to_datetime(since), type=pa.timestamp("s")))
+    if until is not None:
+        expr = _and(ds.field("timestamp") <= pa.scalar(_to_datetime(until), type=pa.timestamp("s")))
+
+    read_cols = None
+    if columns is not None:
+        read_cols = list(columns)
+        if team is not None:
+            read_cols += [c for c in ("home_team", "away_team") if c not in read_cols]
+
+    df = dataset.to_table(columns=read_cols, filter=expr).to_pandas()
+
+    # Team filter runs on the decoded categoricals (cheap once partitions are pruned)
+    if team is not None:
+        df = df[(df["home_team"] == team) | (df["away_team"] == team)]
+        if columns is not None:
+            df = df[list(columns)]
+    return df.reset_index(drop=True)
+
+
+def read_tracker_csv(csv_path):
+    """Yield matchup rows from scores.csv, skipping the early timestamp,team,score rows."""
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for rec in reader:
+            if len(rec) != 6:
+                continue
+            ts, week, home, hs, away, as_ = rec
+            yield {
+                "timestamp": ts, "week": int(week) if week else None,
+                "home_team": home, "home_score": hs, "away_team": away, "away_score": as_,
+            }
+
+
+def backfill(csv_path, root=STORE_DIR):
+    """Rebuild the store from scratch out of scores.csv."""
+    if os.path.isdir(root):
+        shutil.rmtree(root)
+    rows = list(read_tracker_csv(csv_path))
+    append_rows(rows, root)
+    print(f"[INFO] Backfilled {len(rows)} rows into {root}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Week-partitioned columnar score store")
+    parser.add_argument("--root", default=STORE_DIR)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_back = sub.add_parser("backfill", help="rebuild the store from scores.csv")
+    p_back.add_argument("--csv", default=os.path.join(SCRIPT_DIR, "scores.csv"))
+
+    p_compact = sub.add_parser("compact", help="merge each week's part files into one")
+    p_compact.add_argument("--week", type=int, default=None)
+
+    p_query = sub.add_parser("query", help="print matching rows")
+    p_query.add_argument("--team", default=None)
+    p_query.add_argument("--week", type=int, default=None)
+    p_query.add_argument("--since", default=None)
+    p_query.add_argument("--until", default=None)
+    args = parser.parse_args()
+
+    if args.cmd == "backfill":
+        backfill(args.csv, args.root)
+    elif args.cmd == "compact":
+        compact(args.week, args.root)
+    elif args.cmd == "query":
+        df = history(team=args.team, week=args.week, since=args.since, until=args.until, root=args.root)
+        print(df if not df.empty else "[INFO] (no rows)")
+
+
+if __name__ == "__main__":
+    main()
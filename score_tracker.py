@@ -1,9 +1,25 @@
 # score_tracker.py
+# Keep module-level imports light: this runs under cron, so pyarrow (score_store)
+# and espn_api (inside cached_league) are only imported on the paths that use
+# them. bench_imports.py guards this.
 import os
+import csv
 import json
+import time
+import argparse
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
 from datetime import datetime
-import pandas as pd
-from espn_api.football import League
+from espn_cache import cached_league
+from snapshot_archive import archive_snapshot
+import score_history
+import player_series
+import score_events
+import timing
+
+STATE_FILE = "scores_state.json"
+TS_FORMAT = "%Y-%m-%d %H:%M:%S"
+CSV_COLUMNS = ["timestamp", "week", "home_team", "home_score", "away_team", "away_score"]
 
 
 def load_config_and_env():
@@ -59,6 +75,47 @@ def load_config_and_env():
     return espn_s2, swid, year_int, week_int, script_dir
 
 
+def _truthy(value):
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+def load_tracker_options(script_dir):
+    """Load tracker behaviour options from env, then config.json (if present)."""
+    cfg = {}
+    config_path = os.path.join(script_dir, "config.json")
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, "r") as f:
+                cfg = json.load(f)
+        except Exception as e:
+            print(f"[WARN] Could not read config.json options: {e}")
+
+    def opt(env_name, cfg_key, default=None):
+        value = os.getenv(env_name)
+        return value if value is not None else cfg.get(cfg_key, default)
+
+    heartbeat = opt("HEARTBEAT_MINUTES", "heartbeat_minutes")
+    fetch_timeout = opt("FETCH_TIMEOUT", "fetch_timeout")
+    options = {
+        # Only write rows whose score changed since the last write
+        "changed_only": _truthy(opt("CHANGED_ONLY", "changed_only", False)),
+        # In changed_only mode, still write an unchanged matchup every N minutes
+        "heartbeat_minutes": float(heartbeat) if heartbeat not in (None, "") else None,
+        # Concurrent week probing in fetch_matchup_rows (1 = serial; >1 fans out after a first miss)
+        "fetch_workers": int(opt("FETCH_WORKERS", "fetch_workers", 1)),
+        "fetch_timeout": float(fetch_timeout) if fetch_timeout not in (None, "") else None,
+        # On-disk ESPN response cache (see espn_cache.py); TTLs in seconds
+        "cache": not _truthy(opt("NO_CACHE", "no_cache", False)),
+        "cache_static_ttl": float(opt("CACHE_STATIC_TTL", "cache_static_ttl", 12 * 3600)),
+        "cache_live_ttl": float(opt("CACHE_LIVE_TTL", "cache_live_ttl", 10)),
+        # Score-change events (see score_events.py): big-play threshold and where events go
+        "big_play_points": float(opt("BIG_PLAY_POINTS", "big_play_points", score_events.BIG_PLAY_POINTS)),
+        "event_sinks": opt("EVENT_SINKS", "event_sinks", "jsonl,print"),
+    }
+    print(f"[DEBUG] Tracker options: {options}")
+    return options
+
+
 def get_week_candidates(league, week_hint=None):
     """Build a list of week candidates to try (hint, current, current-1)."""
     try:
@@ -85,11 +142,18 @@ def get_week_candidates(league, week_hint=None):
     return candidates
 
 
-def fetch_matchup_rows(league, week_candidates):
+def fetch_matchup_rows(league, week_candidates, max_workers=None, timeout=None):
     """
     Prefer live totals from box_scores(). If b.home_score/b.away_score are
     missing/zero, compute from starters' lineups (sum of player.points).
     Fall back to scoreboard() only if needed.
+
+    Probes run serially by default. With max_workers > 1 the first probe
+    (box_scores for the first candidate, the usual winner) still goes out
+    alone; only when it misses are the remaining box_scores/scoreboard
+    probes sent at once on a thread pool. Results are still taken in the
+    same preference order and the rest are cancelled once a winner is
+    known. timeout is the overall budget in seconds for the fan-out.
     """
     from math import isfinite
     ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -111,82 +175,377 @@ def fetch_matchup_rows(league, week_candidates):
             total += float(pts)
         return round(total, 2)
 
-    # 1) Try box_scores first (best for live)
-    for w in week_candidates:
-        try:
+    def lineup_players(team_name, lineup):
+        """
+        (team, player_id, name, position, slot, points, projected, played %)
+        for player_series and winprob_mc.
+        """
+        out = []
+        for p in lineup:
+            pts = getattr(p, "points", 0.0) or 0.0
+            proj = getattr(p, "projected_points", 0.0) or 0.0
+            out.append((team_name, getattr(p, "playerId", None) or getattr(p, "name", None),
+                        getattr(p, "name", None), getattr(p, "position", None),
+                        getattr(p, "slot_position", None), float(pts) if isfinite(pts) else 0.0,
+                        float(proj) if isfinite(proj) else 0.0, getattr(p, "game_played", 0) or 0))
+        return out
+
+    # 1) box_scores (best for live)
+    def box_score_rows(w):
+        with timing.span("box_scores", week=w) as sp:
             bs = league.box_scores(week=w) if w else league.box_scores()
-            print(f"[DEBUG] box_scores(week={w}) -> {len(bs)} matchups")
-
-            rows = []
-            for b in bs:
-                h, a = b.home_team, b.away_team
-
-                # ESPN sometimes gives zeros/None mid-refresh; compute from lineup as backup
-                hs = b.home_score if (b.home_score is not None and b.home_score > 0) else sum_starter_points(b.home_lineup)
-                as_ = b.away_score if (b.away_score is not None and b.away_score > 0) else sum_starter_points(b.away_lineup)
-
-                print(f"[DEBUG] Live: {h.team_name} {hs} vs {a.team_name} {as_}")
-                rows.append({
-                    "timestamp": ts,
-                    "week": w if w is not None else getattr(league, "current_week", None),
-                    "home_team": h.team_name,
-                    "home_score": hs,
-                    "away_team": a.team_name,
-                    "away_score": as_,
-                })
-            if rows:
-                return rows, w
-        except Exception as e:
-            print(f"[ERROR] box_scores(week={w}) failed: {e}")
-
-    # 2) Fallback to scoreboard (useful for completed weeks / after boxscore downtime)
-    for w in week_candidates:
-        try:
+            sp["matchups"] = len(bs)
+        print(f"[DEBUG] box_scores(week={w}) -> {len(bs)} matchups")
+
+        rows = []
+        for b in bs:
+            h, a = b.home_team, b.away_team
+
+            # ESPN sometimes gives zeros/None mid-refresh; compute from lineup as backup
+            hs = b.home_score if (b.home_score is not None and b.home_score > 0) else sum_starter_points(b.home_lineup)
+            as_ = b.away_score if (b.away_score is not None and b.away_score > 0) else sum_starter_points(b.away_lineup)
+
+            print(f"[DEBUG] Live: {h.team_name} {hs} vs {a.team_name} {as_}")
+            rows.append({
+                "timestamp": ts,
+                "week": w if w is not None else getattr(league, "current_week", None),
+                "home_team": h.team_name,
+                "home_score": hs,
+                "away_team": a.team_name,
+                "away_score": as_,
+                "players": lineup_players(h.team_name, b.home_lineup) + lineup_players(a.team_name, b.away_lineup),
+            })
+        return rows
+
+    # 2) scoreboard (useful for completed weeks / after boxscore downtime)
+    def scoreboard_rows(w):
+        with timing.span("scoreboard", week=w) as sp:
             sb = league.scoreboard(week=w) if w else league.scoreboard()
-            print(f"[DEBUG] scoreboard(week={w}) -> {len(sb)} matchups")
-            rows = []
-            for m in sb:
-                h, a = m.home_team, m.away_team
-                print(f"[DEBUG] Scoreboard: {h.team_name} {m.home_score} vs {a.team_name} {m.away_score}")
-                rows.append({
-                    "timestamp": ts,
-                    "week": w if w is not None else getattr(league, "current_week", None),
-                    "home_team": h.team_name,
-                    "home_score": m.home_score,
-                    "away_team": a.team_name,
-                    "away_score": m.away_score,
-                })
+            sp["matchups"] = len(sb)
+        print(f"[DEBUG] scoreboard(week={w}) -> {len(sb)} matchups")
+        rows = []
+        for m in sb:
+            h, a = m.home_team, m.away_team
+            print(f"[DEBUG] Scoreboard: {h.team_name} {m.home_score} vs {a.team_name} {m.away_score}")
+            rows.append({
+                "timestamp": ts,
+                "week": w if w is not None else getattr(league, "current_week", None),
+                "home_team": h.team_name,
+                "home_score": m.home_score,
+                "away_team": a.team_name,
+                "away_score": m.away_score,
+            })
+        return rows
+
+    # Preference order: box_scores for every candidate, then scoreboard for every candidate
+    probes = [("box_scores", box_score_rows, w) for w in week_candidates]
+    probes += [("scoreboard", scoreboard_rows, w) for w in week_candidates]
+
+    serial = probes if not max_workers or max_workers <= 1 else probes[:1]
+    for name, fn, w in serial:
+        try:
+            rows = fn(w)
             if rows:
                 return rows, w
         except Exception as e:
-            print(f"[ERROR] scoreboard(week={w}) failed: {e}")
+            print(f"[ERROR] {name}(week={w}) failed: {e}")
+
+    probes = probes[len(serial):]
+    if probes:
+        workers = min(max_workers, len(probes))
+        print(f"[DEBUG] Probing {len(probes)} requests concurrently (workers={workers}, timeout={timeout})")
+        pool = ThreadPoolExecutor(max_workers=workers)
+        futures = [pool.submit(fn, w) for _, fn, w in probes]
+        deadline = time.monotonic() + timeout if timeout else None
+        try:
+            for (name, _, w), fut in zip(probes, futures):
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                try:
+                    rows = fut.result(timeout=remaining)
+                except FuturesTimeout:
+                    print(f"[ERROR] {name}(week={w}) timed out")
+                    continue
+                except Exception as e:
+                    print(f"[ERROR] {name}(week={w}) failed: {e}")
+                    continue
+                if rows:
+                    return rows, w
+        finally:
+            # Drop queued probes; in-flight ones finish in the background and are ignored
+            pool.shutdown(wait=False, cancel_futures=True)
 
     print("[DEBUG] No matchup data found from box_scores or scoreboard.")
     return [], None
 
 
-def main():
-    espn_s2, swid, year, week_hint, script_dir = load_config_and_env()
+def make_event_detector(script_dir, options):
+    return score_events.ScoreEventDetector(
+        score_events.build_sinks(options["event_sinks"]), big_play=options["big_play_points"],
+        state_path=os.path.join(script_dir, "score_events_state.json"),
+    )
 
-    print("[DEBUG] Initializing League...")
-    league = League(league_id=31028552, year=year, espn_s2=espn_s2, swid=swid)
-    print("[DEBUG] League initialized.")
 
-    week_candidates = get_week_candidates(league, week_hint)
-    rows, used_week = fetch_matchup_rows(league, week_candidates)
+def detect_events(detector, rows):
+    """Streaming stage: compare this tick with the last one and emit events (O(teams) per tick)."""
+    try:
+        with timing.span("events") as sp:
+            events = detector.process(rows)
+            detector.save()
+            sp["events"] = len(events)
+        if events:
+            print(f"[DEBUG] Score events: {', '.join(e['type'] for e in events)}")
+    except Exception as e:
+        print(f"[WARN] Score event detection failed: {e}")
 
-    df = pd.DataFrame(rows, columns=[
-        "timestamp", "week", "home_team", "home_score", "away_team", "away_score"
-    ])
-    print("[DEBUG] DataFrame:")
-    print(df if not df.empty else "[DEBUG] (empty)")
 
+def filter_changed_rows(rows, state_path, heartbeat_minutes=None):
+    """
+    Keep only rows whose scores moved since the matchup was last written.
+    The last-written score per (week, home_team, away_team) lives in a small
+    JSON sidecar; with heartbeat_minutes set, an unchanged matchup is still
+    written once that many minutes have passed since its last row.
+    """
+    state = {}
+    if os.path.exists(state_path):
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except Exception as e:
+            print(f"[WARN] Could not read {state_path}, treating all rows as changed: {e}")
+
+    kept = []
+    for r in rows:
+        key = f"{r['week']}|{r['home_team']}|{r['away_team']}"
+        prev = state.get(key)
+        hs, as_ = round(float(r["home_score"] or 0.0), 2), round(float(r["away_score"] or 0.0), 2)
+
+        changed = prev is None or prev["home_score"] != hs or prev["away_score"] != as_
+        heartbeat_due = False
+        if not changed and heartbeat_minutes:
+            last = datetime.strptime(prev["written_at"], TS_FORMAT)
+            now = datetime.strptime(r["timestamp"], TS_FORMAT)
+            heartbeat_due = (now - last).total_seconds() >= heartbeat_minutes * 60
+
+        if changed or heartbeat_due:
+            kept.append(r)
+            state[key] = {"home_score": hs, "away_score": as_, "written_at": r["timestamp"]}
+
+    tmp = state_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=1)
+    os.replace(tmp, state_path)
+
+    print(f"[DEBUG] Change detection: keeping {len(kept)} of {len(rows)} rows")
+    return kept
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Append live matchup scores to scores.csv")
+    parser.add_argument("--no-cache", action="store_true", help="bypass the on-disk ESPN response cache")
+    parser.add_argument("--daemon", action="store_true",
+                        help="keep one League session and poll at an adaptive interval")
+    parser.add_argument("--min-interval", type=float, default=30,
+                        help="daemon: seconds between polls while scores are moving")
+    parser.add_argument("--max-interval", type=float, default=900,
+                        help="daemon: longest back-off outside NFL game windows")
+    parser.add_argument("--flush-interval", type=float, default=300,
+                        help="daemon: seconds between writes to scores.csv and the stores")
+    parser.add_argument("--max-runtime", type=float, default=None,
+                        help="daemon: exit (after a final flush) once this many seconds have passed")
+    return parser.parse_args()
+
+
+def write_rows(rows, script_dir, options):
+    """Append rows to scores.csv and mirror them into the archive, store and history index."""
+    # Player points go in for every tick, before change filtering: a bench
+    # player scoring doesn't move the team totals
+    try:
+        with timing.span("player_series") as sp:
+            series, sp["added"] = player_series.record(rows, os.path.join(script_dir, "data", "players"))
+        print(f"[DEBUG] Player series: {sp['added']} new observations ({series.nbytes() / 1e6:.2f} MB)")
+    except Exception as e:
+        print(f"[WARN] Could not update player series: {e}")
+
+    if options["changed_only"]:
+        state_path = os.path.join(script_dir, STATE_FILE)
+        rows = filter_changed_rows(rows, state_path, options["heartbeat_minutes"])
+
+    print(f"[DEBUG] Rows to write: {len(rows)}")
+    for r in rows:
+        print(f"[DEBUG]   {r['timestamp']} wk{r['week']} {r['home_team']} {r['home_score']} "
+              f"vs {r['away_team']} {r['away_score']}")
+
+    # Plain csv append (same layout pandas' to_csv produced: no index, "\n" endings, None -> "")
     csv_path = os.path.join(script_dir, "scores.csv")
     header = not os.path.exists(csv_path)
     print(f"[DEBUG] Writing to {csv_path} (header={header})")
-    df.to_csv(csv_path, mode="a", index=False, header=header)
+    with timing.span("csv_write", rows=len(rows)), open(csv_path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        if header:
+            writer.writerow(CSV_COLUMNS)
+        for r in rows:
+            rec = [r.get(c) for c in CSV_COLUMNS]
+            rec[3] = float(rec[3]) if rec[3] is not None else None
+            rec[5] = float(rec[5]) if rec[5] is not None else None
+            writer.writerow(rec)
     print("[DEBUG] Write complete")
 
+    # Record this tick in the delta-encoded archive (only new rows are stored)
+    archive_dir = os.path.join(script_dir, "data", "archive")
+    with timing.span("archive"):
+        entry = archive_snapshot(csv_path, archive_dir)
+    print(f"[DEBUG] Archived snapshot {entry['snapshot']} ({entry['rows']} rows)")
+
+    # Mirror the rows into the week-partitioned columnar store used for analysis
+    try:
+        with timing.span("store"):
+            import score_store  # pulls in pyarrow
+            store_dir = os.path.join(script_dir, "data", "store")
+            score_store.append_rows(rows, store_dir)
+            score_store.auto_compact(max((r["week"] for r in rows if r.get("week") is not None), default=None),
+                                     store_dir)
+    except Exception as e:
+        print(f"[WARN] Could not update columnar store: {e}")
+
+    # Catch the point-in-time history index up with the rows just appended
+    try:
+        with timing.span("history_index"):
+            hist = score_history.load(csv_path, os.path.join(script_dir, ".cache", "score_history.pkl"))
+        print(f"[DEBUG] History index: {len(hist)} rows")
+    except Exception as e:
+        print(f"[WARN] Could not update history index: {e}")
+    return rows
+
+
+# ----------- daemon mode -----------
+# NFL windows in UTC as (weekday, first hour, last hour), matching the
+# test-schedule cron: Thursday night, Sunday, Sunday/Monday night, Monday night.
+GAME_WINDOWS = [(4, 0, 4), (6, 17, 23), (0, 0, 4), (1, 0, 4)]
+IN_WINDOW_MAX_INTERVAL = 120
+# Re-read league settings (current_week etc.) this often in a long-lived session
+LEAGUE_REFRESH_SECONDS = 6 * 3600
+
+
+def in_game_window(now=None):
+    now = now or datetime.utcnow()
+    return any(now.weekday() == day and lo <= now.hour <= hi for day, lo, hi in GAME_WINDOWS)
+
+
+def next_interval(interval, changed, min_interval, max_interval, now=None):
+    """
+    Poll again quickly while scores move; otherwise double the wait, capped
+    at a couple of minutes inside a game window and max_interval outside.
+    """
+    if changed:
+        return min_interval
+    cap = min(IN_WINDOW_MAX_INTERVAL, max_interval) if in_game_window(now) else max_interval
+    return min(max(interval * 2, min_interval), cap)
+
+
+def run_daemon(league, week_hint, script_dir, options, args):
+    """Poll one League session until interrupted, flushing buffered rows on a schedule."""
+    import signal
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    # SIGTERM (CI cancel, systemd stop) takes the same path as Ctrl+C so the buffer is flushed
+    signal.signal(signal.SIGTERM, stop)
+    # Polls repeat unchanged scores, so the daemon always writes changes (+ heartbeat) only
+    options = dict(options, changed_only=True)
+
+    detector = make_event_detector(script_dir, options)
+    started = time.monotonic()
+    last_flush = last_refresh = started
+    interval = args.min_interval
+    last_scores = {}
+    buffer = []
+    polls = 0
+    try:
+        while True:
+            if time.monotonic() - last_refresh >= LEAGUE_REFRESH_SECONDS and hasattr(league, "fetch_league"):
+                try:
+                    # the static TTL would otherwise hand back the settings fetched at startup
+                    cache = getattr(league, "response_cache", None)
+                    with cache.bypass() if cache else contextlib.nullcontext():
+                        league.fetch_league()
+                    print(f"[INFO] League refreshed (current_week={league.current_week})")
+                except Exception as e:
+                    print(f"[WARN] League refresh failed, keeping the old session: {e}")
+                last_refresh = time.monotonic()
+
+            week_candidates = get_week_candidates(league, week_hint)
+            with timing.span("poll") as sp:
+                rows, _ = fetch_matchup_rows(
+                    league, week_candidates,
+                    max_workers=options["fetch_workers"], timeout=options["fetch_timeout"],
+                )
+                sp["rows"] = len(rows)
+            polls += 1
+            detect_events(detector, rows)
+            scores = {(r["week"], r["home_team"], r["away_team"]): (r["home_score"], r["away_score"]) for r in rows}
+            changed = scores != last_scores
+            last_scores = scores
+            buffer.extend(rows)
+
+            now = time.monotonic()
+            if buffer and now - last_flush >= args.flush_interval:
+                write_rows(buffer, script_dir, options)
+                buffer, last_flush = [], now
+
+            interval = next_interval(interval, changed, args.min_interval, args.max_interval)
+            if args.max_runtime is not None:
+                left = args.max_runtime - (now - started)
+                if left <= 0:
+                    break
+                interval = min(interval, left)
+            print(f"[INFO] Daemon poll {polls}: {len(rows)} rows, changed={changed}, "
+                  f"buffered={len(buffer)}, next poll in {interval:.1f}s")
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("[INFO] Daemon stopping")
+    finally:
+        if buffer:
+            write_rows(buffer, script_dir, options)
+        detector.close()
+        if league.response_cache:
+            league.response_cache.report()
+
+
+def main():
+    args = parse_args()
+    espn_s2, swid, year, week_hint, script_dir = load_config_and_env()
+    options = load_tracker_options(script_dir)
+    if args.no_cache:
+        options["cache"] = False
+
+    timing.configure("score_tracker")
+    print("[DEBUG] Initializing League...")
+    with timing.span("league_init", cache=options["cache"]):
+        league = cached_league(
+            31028552, year, espn_s2, swid, enabled=options["cache"],
+            static_ttl=options["cache_static_ttl"], live_ttl=options["cache_live_ttl"],
+        )
+    print("[DEBUG] League initialized.")
+
+    if args.daemon:
+        run_daemon(league, week_hint, script_dir, options, args)
+        return
+
+    week_candidates = get_week_candidates(league, week_hint)
+    rows, used_week = fetch_matchup_rows(
+        league, week_candidates,
+        max_workers=options["fetch_workers"], timeout=options["fetch_timeout"],
+    )
+
+    if league.response_cache:
+        league.response_cache.report()
+
+    detector = make_event_detector(script_dir, options)
+    detect_events(detector, rows)
+    write_rows(rows, script_dir, options)
+    detector.close()
+
     if used_week is None:
         print("[INFO] Tip: Set WEEK explicitly (env or config.json) if you want a specific week.")
 
@@ -4,23 +4,39 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import (
-    StaleElementReferenceException, TimeoutException, ElementClickInterceptedException
+from selenium.common.exceptions import StaleElementReferenceException
+import time, sys, argparse
+from fantasycast_dom import extract_state, list_pills, activate_pill
+from fantasycast_network import (
+    enable_performance_logging, capture_json_payloads, save_payloads, extract_ctw_rows
 )
-import time, re
+import timing
 
 URL = "https://fantasy.espn.com/football/fantasycast?leagueId=31028552"
 
 # ----------- setup -----------
+timing.configure("scrapewp_all")
 opts = webdriver.ChromeOptions()
 opts.add_argument("--window-size=1400,1000")
 opts.add_argument("--disable-gpu")
 opts.add_argument("--no-default-browser-check")
 opts.add_argument("--no-first-run")
 opts.add_argument("--lang=es-ES")   # Spain
-driver = webdriver.Chrome(service=Service(), options=opts)
+
+parser = argparse.ArgumentParser(description="Print FantasyCast Chance to Win for every matchup")
+parser.add_argument("--network", action="store_true",
+                    help="read Chance to Win from the app's JSON payloads instead of clicking every pill")
+parser.add_argument("--save-payloads", action="store_true",
+                    help="with --network, save captured payloads to debug_artifacts/")
+args = parser.parse_args()
+if args.network:
+    enable_performance_logging(opts)
+
+with timing.span("chrome_start"):
+    driver = webdriver.Chrome(service=Service(), options=opts)
 wait = WebDriverWait(driver, 30)
-driver.get(URL)
+with timing.span("page_load"):
+    driver.get(URL)
 
 # ----------- consent -----------
 def dismiss_consent(max_wait=25):
@@ -58,7 +74,9 @@ def dismiss_consent(max_wait=25):
         time.sleep(0.3)
     return False
 
-print(f"[info] Consent dismissed? {dismiss_consent()}")
+with timing.span("dismiss_consent") as sp:
+    sp["dismissed"] = dismiss_consent()
+print(f"[info] Consent dismissed? {sp['dismissed']}")
 
 # ----------- find the fantasy iframe by visible text anchor -----------
 def switch_into_matchup_iframe():
@@ -103,152 +121,67 @@ def switch_into_matchup_iframe():
         return True
     return False
 
-if not switch_into_matchup_iframe():
+with timing.span("find_iframe") as sp:
+    sp["found"] = switch_into_matchup_iframe()
+if not sp["found"]:
     raise RuntimeError("Could not find the FantasyCast iframe with 'Chance to Win'")
 
 wait.until(EC.visibility_of_element_located((By.XPATH, "//*[contains(normalize-space(),'Chance to Win')]")))
 print("[info] In matchup iframe.")
 
 # ----------- helpers -----------
-def get_current_team_names():
-    panel = WebDriverWait(driver, 15).until(
-        EC.visibility_of_element_located(
-            (By.XPATH, "//*[contains(normalize-space(),'Chance to Win')]/ancestor::*[self::div or self::section][1]")
-        )
-    )
-    cand = []
-    cand += panel.find_elements(By.CSS_SELECTOR, "span.teamName")
-    cand += panel.find_elements(By.XPATH, ".//h1|.//h2|.//h3|.//span[contains(@class,'TeamName')]")
-    names, seen_local = [], set()
-    for e in cand:
-        t = (e.text or "").strip()
-        if t and t not in seen_local:
-            names.append(t); seen_local.add(t)
-        if len(names) == 2:
-            break
-    if len(names) < 2:
-        raise TimeoutException("Team names not found")
-    return names[0], names[1]
-
-def get_ctw_percents():
-    panel = WebDriverWait(driver, 10).until(
-        EC.visibility_of_element_located(
-            (By.XPATH, "//*[contains(normalize-space(),'Chance to Win')]/ancestor::*[self::div or self::section][1]")
-        )
-    )
-    percs = [e.text.strip() for e in panel.find_elements(By.CSS_SELECTOR, "div.totalPerc") if e.text.strip()]
-    if len(percs) < 2:
-        extra = [e.text.strip() for e in panel.find_elements(By.XPATH, ".//*[contains(text(),'%')]")]
-        percs = [p for p in extra if '%' in p][:2]
-    while len(percs) < 2:
-        percs.append("")
-    return percs[0], percs[1]
-
 def get_unique_data_ids():
-    # Dedupe by data-id seen in DOM; re-query fresh each time
-    ids = set()
-    for n in driver.find_elements(By.XPATH, "//div[contains(@class,'Thumbnails__Item') and contains(@class,'pointer') and @data-id]"):
-        did = n.get_attribute("data-id")
-        if did and did.isdigit():
-            ids.add(int(did))
-    return sorted(ids)
+    return sorted(p["id"] for p in list_pills(driver))
 
 def activate_pill_by_id(did):
-    """
-    Click the pill (by data-id) by firing the click on its inner link:
-      //div[contains(@class,'Thumbnails__Item') and @data-id='{did}']//a[contains(@class,'ScoreCell__Link')]
-    Then wait until the pill's container becomes selected OR team names change.
-    """
-    # snapshot current teams (if visible)
-    try:
-        before = get_current_team_names()
-    except Exception:
-        before = None
-
-    link = None
-    slide_container = None
-
-    # Find the clickable link and its slide container (fresh each time)
-    for _ in range(4):
-        links = driver.find_elements(
-            By.XPATH,
-            f"//div[contains(@class,'Thumbnails__Item') and @data-id='{did}']//a[contains(@class,'ScoreCell__Link')]"
-        )
-        if links:
-            link = links[-1]  # take the last/visible duplicate
-            try:
-                slide_container = driver.find_element(
-                    By.XPATH,
-                    f"//div[contains(@class,'Thumbnails__Item') and @data-id='{did}']"
-                )
-            except Exception:
-                slide_container = None
-            break
-        time.sleep(0.2)
-
-    if not link:
-        raise TimeoutException(f"No clickable link for data-id={did}")
-
-    # Nudge strip and click via JS
-    driver.execute_script("""
-      const el = arguments[0];
-      try { el.scrollIntoView({block:'nearest', inline:'center'}); } catch(e){}
-      const slide = arguments[1];
-      if (slide) {
-          const strip = slide.closest('[data-gallery-thumbnail]')?.parentElement || slide.parentElement;
-          if (strip && strip.scrollLeft !== undefined) strip.scrollLeft = slide.offsetLeft - 50;
-      }
-    """, link, slide_container)
-
-    try:
-        driver.execute_script("arguments[0].click();", link)
-    except Exception:
-        try:
-            link.click()
-        except Exception:
-            pass
-
-    # Wait for selected class on container OR team names to change
-    for _ in range(24):  # ~8s
-        try:
-            if slide_container:
-                cls = slide_container.get_attribute("class") or ""
-                if "selected" in cls or "Thumbnails__Item--active" in cls:
-                    return True
-            if before:
-                now = get_current_team_names()
-                if now != before:
-                    return True
-        except StaleElementReferenceException:
-            return True  # container rebuilt -> assume switched
-        time.sleep(0.33)
-    return False
+    # click + MutationObserver wait happen in-page; returns as soon as the DOM switches
+    return activate_pill(driver, did, timeout=8)
 
 def scrape_current():
-    a, b = get_current_team_names()
-    p1, p2 = get_ctw_percents()
+    # one round trip for names + percentages
+    state = extract_state(driver)
+    (a, b), (p1, p2) = state["teams"][:2], state["percents"][:2]
     print(f"{a}: {p1}")
     print(f"{b}: {p2}")
     print("-" * 30)
     return (a, b)
 
+# ----------- network capture mode -----------
+if args.network:
+    with timing.span("network_capture"):
+        payloads = capture_json_payloads(driver)
+    if args.save_payloads:
+        save_payloads(payloads)
+    rows = extract_ctw_rows(payloads)
+    if rows:
+        for a, p1, b, p2 in rows:
+            print(f"{a}: {p1}")
+            print(f"{b}: {p2}")
+            print("-" * 30)
+        driver.quit()
+        sys.exit(0)
+    print("[warn] network mode: no Chance to Win values in payloads; clicking pills instead")
+
 # ----------- scrape ALL matchups -----------
 # scrape initially visible
 seen_pairs = set()
 try:
-    seen_pairs.add(scrape_current())
+    with timing.span("matchup", data_id="current"):
+        seen_pairs.add(scrape_current())
 except Exception as e:
     print(f"[warn] initial scrape failed: {e}")
 
 # click through all pills by data-id (now clicking the inner link)
-all_ids = get_unique_data_ids()
+with timing.span("list_pills") as sp:
+    all_ids = get_unique_data_ids()
+    sp["count"] = len(all_ids)
 print(f"[info] data-ids found: {all_ids}")
 
 for did in all_ids:
     try:
-        ok = activate_pill_by_id(did)
-        time.sleep(0.5)
-        pair = scrape_current()
+        with timing.span("matchup", data_id=did):
+            ok = activate_pill_by_id(did)
+            pair = scrape_current()
         if pair not in seen_pairs:
             seen_pairs.add(pair)
     except Exception as e:
@@ -261,9 +194,9 @@ if new_ids:
     print(f"[info] new ids appeared after paging: {new_ids}")
     for did in new_ids:
         try:
-            ok = activate_pill_by_id(did)
-            time.sleep(0.5)
-            pair = scrape_current()
+            with timing.span("matchup", data_id=did, second_pass=True):
+                ok = activate_pill_by_id(did)
+                pair = scrape_current()
             if pair not in seen_pairs:
                 seen_pairs.add(pair)
         except Exception as e:
@@ -1,258 +1,251 @@
 # -*- coding: utf-8 -*-
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import (
-    StaleElementReferenceException, TimeoutException, ElementClickInterceptedException
+import time, csv, datetime, os, sys, argparse
+from fantasycast_session import (
+    URL, build_options, start_driver, open_fantasycast, save_cookies, enter_frame_path,
+    switch_into_matchup_iframe, load_pair_map, save_pair_map, week_key
 )
-import time, re, csv, datetime, os
-import chromedriver_autoinstaller  # pip install chromedriver-autoinstaller
+from fantasycast_dom import (
+    extract_state, list_pills, start_pill_switch, await_pill_switch, read_row, capture_row,
+    plan_pills, pill_pair_count, scrape_matchups
+)
+from fantasycast_network import (
+    enable_performance_logging, capture_json_payloads, save_payloads, load_payloads, extract_ctw_rows
+)
+from fantasycast_http import load_settings, make_session, default_urls, fetch_rows
+from fantasycast_blocking import load_blocking_config, apply_launch_flags, install_url_blocking, resource_stats
+import timing
 
-URL = "https://fantasy.espn.com/football/fantasycast?leagueId=31028552"
 OUTFILE = "fantasycast_ctw.csv"
 
-# ----------- setup -----------
-opts = webdriver.ChromeOptions()
-opts.add_argument("--window-size=1400,1000")
-opts.add_argument("--disable-gpu")
-opts.add_argument("--no-default-browser-check")
-opts.add_argument("--no-first-run")
-opts.add_argument("--lang=es-ES")
+# ----------- args -----------
+parser = argparse.ArgumentParser(description="Scrape FantasyCast Chance to Win into fantasycast_ctw.csv")
+parser.add_argument("--http", action="store_true",
+                    help="try the browserless HTTP fetch (fantasycast_http) first; Chrome only if it has no numbers")
+parser.add_argument("--network", action="store_true",
+                    help="read Chance to Win from the app's JSON payloads instead of clicking every pill")
+parser.add_argument("--save-payloads", action="store_true",
+                    help="with --network, save captured payloads to debug_artifacts/")
+parser.add_argument("--from-payloads", metavar="FILE",
+                    help="parse a saved payloads file and print the rows (no browser)")
+parser.add_argument("--workers", type=int, default=1,
+                    help="scrape data-ids in N tabs of the same browser")
+parser.add_argument("--block-resources", action="store_true",
+                    help="block images/fonts/media and ad/analytics hosts (see resource_blocking in config.json)")
+parser.add_argument("--resource-stats", action="store_true",
+                    help="report requests/bytes/memory of the page load (implied by --block-resources)")
+args = parser.parse_args()
+
+if args.from_payloads:
+    for a, p1, b, p2 in extract_ctw_rows(load_payloads(args.from_payloads)):
+        print(f"{a}: {p1}")
+        print(f"{b}: {p2}")
+        print("-" * 30)
+    sys.exit(0)
 
-# headless-only setup (no user-data-dir)
-opts.add_argument("--headless=new")
-opts.add_argument("--disable-dev-shm-usage")
-opts.add_argument("--no-sandbox")
-opts.add_argument("--remote-debugging-port=9222")
-opts.add_argument("--disable-browser-side-navigation")
-opts.add_argument("--disable-features=VizDisplayCompositor")
+# ----------- CSV setup -----------
+if not os.path.exists(OUTFILE):
+    with open(OUTFILE, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["timestamp", "teamA", "pctA", "teamB", "pctB"])
 
-# install correct driver
-chromedriver_autoinstaller.install()
+def append_rows(rows):
+    """Print and append (ts, teamA, pctA, teamB, pctB) rows to the CSV."""
+    with timing.span("csv_write", rows=len(rows)), open(OUTFILE, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        for ts, a, p1, b, p2 in rows:
+            print(f"{a}: {p1}")
+            print(f"{b}: {p2}")
+            print("-" * 30)
+            writer.writerow([ts, a, p1, b, p2])
+
+# ----------- browserless first with --http (Chrome only when HTTP has no numbers) -----------
+timing.configure("scrapewp_ci")
+settings = load_settings()
+if args.http:
+    api_url, page_url = default_urls(settings)
+    with make_session(settings["swid"], settings["espn_s2"]) as session, timing.span("http_mode") as sp:
+        http_rows = fetch_rows(session, api_url, page_url)
+        sp["rows"] = len(http_rows)
+    if http_rows:
+        append_rows(http_rows)
+        print(f"[info] HTTP mode: {len(http_rows)} matchups without a browser")
+        sys.exit(0)
+    print("[warn] HTTP mode: no Chance to Win values; starting Chrome")
+# which week the data-id map belongs to and how many matchups to expect (config.json /
+# env; otherwise the pill strip's distinct team pairs are counted in scrape_matchups)
+WEEK_KEY = week_key(settings["league_id"], settings["year"], settings["week"])
+EXPECTED_MATCHUPS = settings["matchups"]
 
-driver = webdriver.Chrome(options=opts)
+# ----------- setup -----------
+opts = build_options()
+blocking = load_blocking_config()
+block_resources = args.block_resources or blocking["enabled"] or os.getenv("BLOCK_RESOURCES", "").lower() in ("1", "true", "yes")
+resource_stats_on = block_resources or args.resource_stats
+if args.network or resource_stats_on:
+    enable_performance_logging(opts)
+if block_resources:
+    apply_launch_flags(opts, blocking)
+
+driver = start_driver(opts)
 wait = WebDriverWait(driver, 30)
+if block_resources:
+    install_url_blocking(driver, blocking)
 
-driver.get(URL)
+# ----------- page + consent (skipped when a saved consent cookie is restored) -----------
+page_start = time.perf_counter()
+open_fantasycast(driver)
 print("[info] Headless Chrome started successfully")
 
-
-# ----------- consent -----------
-def dismiss_consent(max_wait=25):
-    end = time.time() + max_wait
-    btn_x = [
-        "//button[normalize-space()='Aceptar']",
-        "//button[contains(., 'Aceptar todo') or contains(., 'Aceptar todas')]",
-        "//button[contains(., 'Estoy de acuerdo') or contains(., 'Consentir') or contains(., 'Continuar')]",
-        "//span[normalize-space()='Aceptar']/ancestor::button",
-        "//button[normalize-space()='Accept']",
-        "//button[contains(., 'Accept All') or contains(., 'Agree') or contains(., 'Continue')]",
-        "//span[normalize-space()='Accept']/ancestor::button",
-    ]
-    iframe_sel = (
-        "iframe[id^='sp_message_iframe'],iframe[title*='privacy' i],"
-        "iframe[title*='consent' i],iframe[src*='consent' i],iframe[src*='privacy' i]"
-    )
-    while time.time() < end:
-        driver.switch_to.default_content()
-        for xp in btn_x:
-            els = driver.find_elements(By.XPATH, xp)
-            if els:
-                driver.execute_script("arguments[0].click();", els[0]); return True
-        for fr in driver.find_elements(By.CSS_SELECTOR, iframe_sel):
-            try:
-                driver.switch_to.frame(fr)
-                for xp in btn_x:
-                    els = driver.find_elements(By.XPATH, xp)
-                    if els:
-                        driver.execute_script("arguments[0].click();", els[0]); return True
-            finally:
-                driver.switch_to.default_content()
-        time.sleep(0.3)
-    return False
-
-print(f"[info] Consent dismissed? {dismiss_consent()}")
-
 # ----------- find the fantasy iframe by visible text anchor -----------
-def switch_into_matchup_iframe():
-    for _ in range(3):
-        time.sleep(2.0)
-    driver.switch_to.default_content()
-
-    def has_ctw():
-        try:
-            return bool(driver.find_elements(By.XPATH, "//*[contains(normalize-space(),'Chance to Win')]"))
-        except Exception:
-            return False
-
-    if has_ctw():
-        return True
-
-    def dfs(depth=0, max_depth=4):
-        if depth > max_depth:
-            return False
-        frames = driver.find_elements(By.TAG_NAME, "iframe")
-        for i in range(len(frames)):
-            try:
-                driver.switch_to.default_content()
-                frames = driver.find_elements(By.TAG_NAME, "iframe")
-                if i >= len(frames):
-                    continue
-                f = frames[i]
-                driver.switch_to.frame(f)
-                if has_ctw():
-                    return True
-                if dfs(depth+1, max_depth):
-                    return True
-            except StaleElementReferenceException:
-                continue
-            finally:
-                driver.switch_to.parent_frame()
-        return False
-
-    return dfs()
-
-if not switch_into_matchup_iframe():
+# iframe indices from the top document down to the frame showing 'Chance to Win'
+with timing.span("find_iframe") as sp:
+    MATCHUP_FRAME_PATH = switch_into_matchup_iframe(driver)
+    sp["path"] = MATCHUP_FRAME_PATH
+if MATCHUP_FRAME_PATH is None:
     raise RuntimeError("Could not find the FantasyCast iframe with 'Chance to Win'")
 
 wait.until(EC.visibility_of_element_located((By.XPATH, "//*[contains(normalize-space(),'Chance to Win')]")))
 print("[info] In matchup iframe.")
-
-# ----------- scraping helpers -----------
-def get_current_team_names():
-    panel = WebDriverWait(driver, 15).until(
-        EC.visibility_of_element_located(
-            (By.XPATH, "//*[contains(normalize-space(),'Chance to Win')]/ancestor::*[self::div or self::section][1]")
-        )
-    )
-    cand = []
-    cand += panel.find_elements(By.CSS_SELECTOR, "span.teamName")
-    cand += panel.find_elements(By.XPATH, ".//h1|.//h2|.//h3|.//span[contains(@class,'TeamName')]")
-    names, seen_local = [], set()
-    for e in cand:
-        t = (e.text or "").strip()
-        if t and t not in seen_local:
-            names.append(t); seen_local.add(t)
-        if len(names) == 2:
-            break
-    return names[0], names[1]
-
-def get_ctw_percents():
-    panel = WebDriverWait(driver, 10).until(
-        EC.visibility_of_element_located(
-            (By.XPATH, "//*[contains(normalize-space(),'Chance to Win')]/ancestor::*[self::div or self::section][1]")
-        )
-    )
-    percs = [e.text.strip() for e in panel.find_elements(By.CSS_SELECTOR, "div.totalPerc") if e.text.strip()]
-    if len(percs) < 2:
-        extra = [e.text.strip() for e in panel.find_elements(By.XPATH, ".//*[contains(text(),'%')]")]
-        percs = [p for p in extra if '%' in p][:2]
-    while len(percs) < 2:
-        percs.append("")
-    return percs[0], percs[1]
-
-def get_unique_data_ids():
-    ids = set()
-    for n in driver.find_elements(By.XPATH, "//div[contains(@class,'Thumbnails__Item') and contains(@class,'pointer') and @data-id]"):
-        did = n.get_attribute("data-id")
-        if did and did.isdigit():
-            ids.add(int(did))
-    return sorted(ids)
-
-def activate_pill_by_id(did):
+if resource_stats_on:
     try:
-        before = get_current_team_names()
-    except Exception:
-        before = None
-
-    link, slide_container = None, None
-    for _ in range(4):
-        links = driver.find_elements(
-            By.XPATH,
-            f"//div[contains(@class,'Thumbnails__Item') and @data-id='{did}']//a[contains(@class,'ScoreCell__Link')]"
-        )
-        if links:
-            link = links[-1]
-            try:
-                slide_container = driver.find_element(
-                    By.XPATH, f"//div[contains(@class,'Thumbnails__Item') and @data-id='{did}']"
-                )
-            except Exception:
-                pass
-            break
-        time.sleep(0.2)
-
-    if not link:
-        raise TimeoutException(f"No clickable link for data-id={did}")
-
-    driver.execute_script("""
-      const el = arguments[0];
-      try { el.scrollIntoView({block:'nearest', inline:'center'}); } catch(e){}
-    """, link)
-
-    try:
-        driver.execute_script("arguments[0].click();", link)
-    except Exception:
-        try: link.click()
-        except Exception: pass
-
-    for _ in range(24):
-        try:
-            if slide_container:
-                cls = slide_container.get_attribute("class") or ""
-                if "selected" in cls or "Thumbnails__Item--active" in cls:
-                    return True
-            if before:
-                now = get_current_team_names()
-                if now != before:
-                    return True
-        except StaleElementReferenceException:
-            return True
-        time.sleep(0.33)
-    return False
-
-# ----------- CSV setup -----------
-if not os.path.exists(OUTFILE):
-    with open(OUTFILE, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["timestamp", "teamA", "pctA", "teamB", "pctB"])
+        resource_stats(driver, (time.perf_counter() - page_start) * 1000, block_resources)
+    except Exception as e:
+        print(f"[warn] could not read resource stats: {e}")
 
-def scrape_current():
-    a, b = get_current_team_names()
-    p1, p2 = get_ctw_percents()
-    ts = datetime.datetime.now().isoformat(timespec="seconds")
+# the page loaded fine, so keep consent + session cookies for the next run
+try:
+    print(f"[info] saved {save_cookies(driver)} cookies")
+except Exception as e:
+    print(f"[warn] could not save cookies: {e}")
 
-    # print
-    print(f"{a}: {p1}")
-    print(f"{b}: {p2}")
-    print("-" * 30)
+# ----------- scraping helpers -----------
+def read_current(state=None):
+    # one round trip for names + percentages
+    return read_row(driver, state)
 
-    # append to CSV
-    with open(OUTFILE, "a", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow([ts, a, p1, b, p2])
+# pair -> row for every matchup written this run; data-id -> pair learned this week
+captured = {}
+pair_map = load_pair_map(WEEK_KEY)
 
-    return (a, b)
+def capture(row, did=None):
+    """Write row unless its pair was already captured; remember which pill showed it."""
+    if not capture_row(captured, pair_map, row, did):
+        return False
+    append_rows([row])
+    return True
+
+# ----------- parallel tabs (--workers N) -----------
+def scrape_ids_in_tabs(ids, n_tabs, timeout=8):
+    """
+    Split data-ids across n_tabs tabs of this one browser (keeps CI memory
+    to a single Chrome). Each round starts one pill switch per tab, then
+    collects every tab's result, so the in-page waits overlap and a round
+    costs about as long as its slowest matchup.
+    Returns {data-id: (ts, teamA, pctA, teamB, pctB)}.
+    """
+    main = driver.current_window_handle
+    driver.switch_to.default_content()
+    for _ in range(n_tabs - 1):
+        driver.execute_script("window.open(arguments[0], '_blank');", URL)
+
+    tabs = [main]
+    for h in driver.window_handles:
+        if h == main:
+            continue
+        driver.switch_to.window(h)
+        # tabs load in parallel and switch_into_matchup_iframe polls for readiness
+        if switch_into_matchup_iframe(driver) is not None:
+            tabs.append(h)
+        else:
+            print(f"[warn] tab {h} never showed 'Chance to Win'; not using it")
+    print(f"[info] scraping {len(ids)} data-ids across {len(tabs)} tabs")
+
+    results = {}
+    for start in range(0, len(ids), len(tabs)):
+        batch = list(zip(tabs, ids[start:start + len(tabs)]))
+        with timing.span("tab_round", data_ids=[did for _, did in batch]):
+            started = []
+            for h, did in batch:
+                driver.switch_to.window(h)
+                enter_frame_path(driver, MATCHUP_FRAME_PATH)
+                try:
+                    start_pill_switch(driver, did, timeout)
+                    started.append((h, did))
+                except Exception as e:
+                    print(f"[warn] data-id {did} failed to start: {e}")
+            for h, did in started:
+                driver.switch_to.window(h)
+                enter_frame_path(driver, MATCHUP_FRAME_PATH)
+                try:
+                    if await_pill_switch(driver, did, timeout):
+                        results[did] = read_current()
+                    else:
+                        print(f"[warn] data-id {did} did not switch")
+                except Exception as e:
+                    print(f"[warn] data-id {did} failed: {e}")
+
+    for h in tabs[1:]:
+        driver.switch_to.window(h)
+        driver.close()
+    driver.switch_to.window(main)
+    enter_frame_path(driver, MATCHUP_FRAME_PATH)
+    return results
+
+# ----------- network capture mode -----------
+if args.network:
+    with timing.span("network_capture"):
+        payloads = capture_json_payloads(driver)
+    if args.save_payloads:
+        save_payloads(payloads)
+    rows = extract_ctw_rows(payloads)
+    if rows:
+        ts = datetime.datetime.now().isoformat(timespec="seconds")
+        append_rows([(ts, a, p1, b, p2) for a, p1, b, p2 in rows])
+        print(f"[info] network mode: {len(rows)} matchups from payloads")
+        driver.quit()
+        sys.exit(0)
+    print("[warn] network mode: no Chance to Win values in payloads; clicking pills instead")
 
 # ----------- scrape all matchups -----------
-seen_pairs = set()
-try:
-    seen_pairs.add(scrape_current())
-except Exception as e:
-    print(f"[warn] initial scrape failed: {e}")
-
-all_ids = get_unique_data_ids()
-print(f"[info] data-ids found: {all_ids}")
-
-for did in all_ids:
+print(f"[info] expecting {EXPECTED_MATCHUPS or '?'} matchups ({WEEK_KEY}, {len(pair_map)} data-ids cached)")
+if args.workers > 1:
     try:
-        ok = activate_pill_by_id(did)
-        time.sleep(0.5)
-        pair = scrape_current()
-        if pair not in seen_pairs:
-            seen_pairs.add(pair)
+        with timing.span("matchup", data_id="current"):
+            state = extract_state(driver)
+            capture(read_current(state), state.get("selected"))
     except Exception as e:
-        print(f"[warn] data-id {did} failed: {e}")
+        print(f"[warn] initial scrape failed: {e}")
+
+    with timing.span("list_pills") as sp:
+        pills = list_pills(driver)
+        all_ids = sorted({p["id"] for p in pills})
+        sp["count"] = len(all_ids)
+    print(f"[info] data-ids found: {all_ids}")
+    expected = EXPECTED_MATCHUPS or pill_pair_count(pills)
+    todo, rest = plan_pills(all_ids, pair_map, captured)
+    clicked = 0
+    # like scrape_matchups: the pills the cached map says are captured only
+    # get a round when the expected count still isn't reached (stale map)
+    for ids in (todo, rest):
+        if not ids or (expected is not None and len(captured) >= expected) or (ids is rest and expected is None):
+            continue
+        clicked += len(ids)
+        results = scrape_ids_in_tabs(ids, min(args.workers, len(ids)))
+        # merge in data-id order so the CSV layout doesn't depend on which tab finished first
+        for did in sorted(results):
+            capture(results[did], did)
+else:
+    _, clicked, all_ids = scrape_matchups(driver, pair_map, EXPECTED_MATCHUPS, captured=captured,
+                                          on_row=lambda row: append_rows([row]))
+
+print(f"[info] captured {len(captured)}/{EXPECTED_MATCHUPS or '?'} matchups "
+      f"clicking {clicked} of {len(all_ids)} pills")
+try:
+    save_pair_map(WEEK_KEY, pair_map)
+except OSError as e:
+    print(f"[warn] could not save data-id map: {e}")
 
 driver.quit()
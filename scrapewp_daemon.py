@@ -0,0 +1,221 @@
+# scrapewp_daemon.py
+"""
+Long-running FantasyCast scraper that keeps one warm headless Chrome.
+
+The browser is started once, consent is dismissed once and the session
+stays parked inside the matchup iframe. Scrapes run on an internal
+schedule and on demand through a local HTTP endpoint; the page is only
+reloaded when it looks stale or gets older than --max-page-age.
+
+A full scrape captures each matchup once: pills whose matchup is already
+known from the week's data-id map are skipped, and the loop stops once
+matchup_count (config.json / MATCHUP_COUNT) matchups are in.
+
+Usage:
+    python scrapewp_daemon.py [--port 8765] [--interval 900] [--max-page-age 3600]
+    curl -X POST http://127.0.0.1:8765/scrape          # all matchups, appended to the CSV
+    curl -X POST "http://127.0.0.1:8765/scrape?all=0"  # just the selected matchup
+    curl http://127.0.0.1:8765/health
+"""
+import os
+import csv
+import json
+import time
+import queue
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fantasycast_session import (
+    build_options, start_driver, open_fantasycast, save_cookies, dismiss_consent, enter_frame_path,
+    switch_into_matchup_iframe, load_pair_map, save_pair_map, week_key
+)
+from fantasycast_dom import extract_state, read_row, scrape_matchups
+from fantasycast_http import load_settings
+import timing
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTFILE = os.path.join(SCRIPT_DIR, "fantasycast_ctw.csv")
+
+
+def append_rows(rows, outfile=OUTFILE):
+    new_file = not os.path.exists(outfile)
+    with open(outfile, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(["timestamp", "teamA", "pctA", "teamB", "pctB"])
+        writer.writerows(rows)
+
+
+class WarmSession:
+    """One Chrome kept logged in and parked in the matchup iframe."""
+
+    def __init__(self, debugging_port=9222):
+        self.settings = load_settings()
+        self.week_key = None
+        self.pair_map = {}
+        self.driver = start_driver(build_options(debugging_port))
+        self.frame_path = None
+        self.loaded_at = 0.0
+        self.load(first=True)
+
+    def pairs(self):
+        """This week's data-id -> pair map, reloaded when the week rolls over."""
+        key = week_key(self.settings["league_id"], self.settings["year"], self.settings["week"])
+        if key != self.week_key:
+            self.week_key, self.pair_map = key, load_pair_map(key)
+        return self.pair_map
+
+    def scrape_matchups(self):
+        captured, clicked, ids = scrape_matchups(self.driver, self.pairs(), self.settings["matchups"])
+        print(f"[info] captured {len(captured)}/{self.settings['matchups'] or '?'} matchups "
+              f"clicking {clicked} of {len(ids)} pills")
+        try:
+            save_pair_map(self.week_key, self.pair_map)
+        except OSError as e:
+            print(f"[warn] could not save data-id map: {e}")
+        return list(captured.values())
+
+    def load(self, first=False):
+        if first:
+            open_fantasycast(self.driver)
+        else:
+            print("[info] reloading FantasyCast")
+            self.driver.refresh()
+            # consent is remembered after the first load, so don't wait long for it again
+            print(f"[info] Consent dismissed? {dismiss_consent(self.driver, max_wait=3)}")
+        self.frame_path = switch_into_matchup_iframe(self.driver)
+        if self.frame_path is None:
+            raise RuntimeError("Could not find the FantasyCast iframe with 'Chance to Win'")
+        self.loaded_at = time.time()
+        print(f"[info] In matchup iframe (path={self.frame_path}).")
+        try:
+            save_cookies(self.driver)
+        except Exception as e:
+            print(f"[warn] could not save cookies: {e}")
+
+    def healthy(self):
+        try:
+            enter_frame_path(self.driver, self.frame_path)
+            extract_state(self.driver, timeout=3)
+            return True
+        except Exception as e:
+            print(f"[warn] page looks stale: {e}")
+            return False
+
+    def scrape(self, all_pills=True, max_page_age=3600):
+        if self.frame_path is None or time.time() - self.loaded_at > max_page_age or not self.healthy():
+            self.load()
+
+        def run():
+            if all_pills:
+                return self.scrape_matchups()
+            return [read_row(self.driver)]
+
+        try:
+            return run()
+        except Exception as e:
+            print(f"[warn] scrape failed ({e}); reloading once")
+            self.load()
+            return run()
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+def make_handler(jobs, status):
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _trigger(self):
+            url = urlparse(self.path)
+            if url.path == "/health":
+                return self._send(200, status)
+            if url.path != "/scrape":
+                return self._send(404, {"ok": False, "error": "unknown path"})
+            all_pills = parse_qs(url.query).get("all", ["1"])[0] not in ("0", "false")
+            reply = queue.Queue(maxsize=1)
+            jobs.put((all_pills, reply))
+            try:
+                return self._send(200, reply.get(timeout=300))
+            except queue.Empty:
+                return self._send(504, {"ok": False, "error": "scrape timed out"})
+
+        do_GET = _trigger
+        do_POST = _trigger
+
+        def log_message(self, fmt, *args):
+            print(f"[http] {self.address_string()} {fmt % args}")
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm-browser FantasyCast scraper daemon")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--interval", type=float, default=900,
+                        help="seconds between scheduled scrapes (0 = only on trigger)")
+    parser.add_argument("--max-page-age", type=float, default=3600,
+                        help="reload the page once it is older than this many seconds")
+    parser.add_argument("--debugging-port", type=int, default=9222)
+    args = parser.parse_args()
+
+    timing.configure("scrapewp_daemon")
+    session = WarmSession(args.debugging_port)
+    jobs = queue.Queue()
+    status = {"started": time.strftime("%Y-%m-%dT%H:%M:%S"), "last_scrape": None, "last_seconds": None}
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(jobs, status))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"[info] listening on http://{args.host}:{args.port} (interval={args.interval}s)")
+
+    # The driver is only ever touched from this thread; HTTP triggers queue up here.
+    next_due = time.time() if args.interval > 0 else float("inf")
+    try:
+        while True:
+            try:
+                all_pills, reply = jobs.get(timeout=max(0.0, min(next_due - time.time(), 60.0)))
+            except queue.Empty:
+                if time.time() < next_due:
+                    continue
+                all_pills, reply = True, None
+
+            start = time.perf_counter()
+            try:
+                with timing.span("scrape", all_pills=all_pills, trigger=reply is not None) as sp:
+                    rows = session.scrape(all_pills=all_pills, max_page_age=args.max_page_age)
+                    sp["rows"] = len(rows)
+                append_rows(rows)
+                result = {"ok": True, "rows": [list(r) for r in rows]}
+            except Exception as e:
+                result = {"ok": False, "error": str(e)}
+            elapsed = round(time.perf_counter() - start, 3)
+            result["seconds"] = elapsed
+            status.update(last_scrape=time.strftime("%Y-%m-%dT%H:%M:%S"), last_seconds=elapsed)
+            print(f"[info] scrape ({'trigger' if reply else 'schedule'}) -> "
+                  f"{len(result.get('rows', []))} rows in {elapsed}s")
+
+            if reply is not None:
+                reply.put(result)
+            elif args.interval > 0:
+                next_due = time.time() + args.interval
+    except KeyboardInterrupt:
+        print("[info] shutting down")
+    finally:
+        server.shutdown()
+        session.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+# season_sim.py
+"""
+Rest-of-season and playoff-odds simulator.
+
+Decided weeks come from the League schedule (team.schedule / outcomes /
+scores); each team's weekly score distribution comes from the final
+scores in data/scores_latest.csv, shrunk toward the league mean. The
+remaining regular season is simulated as one (sims x teams x weeks)
+NumPy array per chunk and chunks can be spread over several processes.
+Standings follow the league's settings: wins, then its playoff seed
+tiebreak (head-to-head, points for or division record), with division
+winners seeded first when the league has divisions.
+
+Usage:
+    python season_sim.py [--sims 200000] [--processes 4] [--fake]
+"""
+import os
+import csv
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+SCORES_FILE = os.path.join(SCRIPT_DIR, "data", "scores_latest.csv")
+
+# Weeks of league-average scoring mixed into each team's own mean
+SHRINK_WEEKS = 3.0
+DEFAULT_MEAN, DEFAULT_STD = 110.0, 25.0
+# settings.playoff_seed_tie_rule values handled; anything else falls back to points for
+TIE_RULES = ("H2H_RECORD", "TOTAL_POINTS_SCORED", "INTRA_DIVISION_RECORD")
+
+
+def weekly_finals(scores_csv=SCORES_FILE):
+    """Final score per (week, team) from the tracker CSV (last row of the week wins)."""
+    finals = {}
+    if not os.path.exists(scores_csv):
+        return finals
+    with open(scores_csv, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for rec in reader:
+            if len(rec) != 6:
+                continue
+            _, week, home, hs, away, as_ = rec
+            try:
+                finals[(int(week), home.strip())] = float(hs)
+                finals[(int(week), away.strip())] = float(as_)
+            except ValueError:
+                continue
+    return finals
+
+
+def score_model(team_names, finals, before_week=None):
+    """Per-team (mean, std) of weekly scores; std is pooled across the league."""
+    by_team = {name: [] for name in team_names}
+    for (week, team), score in finals.items():
+        if team in by_team and (before_week is None or week < before_week) and score > 0:
+            by_team[team].append(score)
+    all_scores = [s for v in by_team.values() for s in v]
+    if len(all_scores) < 2:
+        return np.full(len(team_names), DEFAULT_MEAN), DEFAULT_STD
+    league_mean = float(np.mean(all_scores))
+    resid = [s - np.mean(v) for v in by_team.values() if len(v) > 1 for s in v]
+    std = float(np.std(resid)) if len(resid) > 1 else float(np.std(all_scores))
+    means = np.array([
+        (sum(by_team[n]) + SHRINK_WEEKS * league_mean) / (len(by_team[n]) + SHRINK_WEEKS)
+        for n in team_names
+    ])
+    return means, std
+
+
+def league_inputs(league, scores_csv=SCORES_FILE):
+    """
+    Arrays describing the season so far:
+    names[T], wins[T], points_for[T], opponents[T, R] for the R undecided
+    regular-season weeks, plus the score model (means[T], std).
+    """
+    teams = list(league.teams)
+    names = [t.team_name.strip() for t in teams]
+    index = {t.team_id: i for i, t in enumerate(teams)}
+    n_teams = len(teams)
+    n_weeks = getattr(league.settings, "reg_season_count", None) or len(teams[0].schedule)
+
+    wins = np.zeros(n_teams)
+    points_for = np.zeros(n_teams)
+    # head-to-head and division results of decided weeks, for the seeding tiebreaks
+    h2h_wins = np.zeros((n_teams, n_teams))
+    games = np.zeros((n_teams, n_teams))
+    remaining = []
+    for w in range(n_weeks):
+        for i, t in enumerate(teams):
+            j = index[t.schedule[w].team_id]
+            if j != i:  # a bye lists the team as its own opponent
+                games[i, j] += 1
+        if any(w >= len(t.outcomes) or t.outcomes[w] == "U" for t in teams):
+            remaining.append(w)
+            continue
+        for i, t in enumerate(teams):
+            j = index[t.schedule[w].team_id]
+            if j == i:
+                continue
+            result = {"W": 1.0, "T": 0.5}.get(t.outcomes[w], 0.0)
+            wins[i] += result
+            h2h_wins[i, j] += result
+            points_for[i] += float(t.scores[w] or 0.0)
+
+    opponents = np.array([[index[t.schedule[w].team_id] for w in remaining] for t in teams], dtype=np.intp)
+    opponents = opponents.reshape(n_teams, len(remaining))
+
+    # tracked finals first; the League's own decided scores fill in anything the CSV lacks
+    finals = weekly_finals(scores_csv)
+    for w in range(n_weeks):
+        if w not in remaining:
+            for name, t in zip(names, teams):
+                finals.setdefault((w + 1, name), float(t.scores[w] or 0.0))
+    means, std = score_model(names, finals, before_week=remaining[0] + 1 if remaining else None)
+
+    divisions = np.array([getattr(t, "division_id", 0) or 0 for t in teams])
+    tie_rule = getattr(league.settings, "playoff_seed_tie_rule", None) or "TOTAL_POINTS_SCORED"
+    if tie_rule not in TIE_RULES:
+        print(f"[warn] playoff_seed_tie_rule {tie_rule!r} not modelled; breaking ties on points for")
+    return {
+        "names": names, "wins": wins, "points_for": points_for, "opponents": opponents,
+        "means": means, "std": std,
+        "playoff_teams": int(getattr(league.settings, "playoff_team_count", 4) or 4),
+        "remaining_weeks": [w + 1 for w in remaining],
+        "tie_rule": tie_rule, "divisions": divisions, "h2h_wins": h2h_wins, "games": games,
+    }
+
+
+def _win_pct(wins_vs, games_vs):
+    """Win share against a subset of opponents; 0.5 (neutral) when there were no games."""
+    return np.where(games_vs > 0, wins_vs / np.maximum(games_vs, 1), 0.5)
+
+
+def _seed_order(inputs, wins, pf, result):
+    """
+    Team indices per simulation in seed order: wins, then the league's tie
+    rule, then points for; division winners first when there are divisions.
+    """
+    n, n_teams = wins.shape
+    opp = inputs["opponents"]
+    divisions = inputs["divisions"]
+    rule = inputs["tie_rule"]
+    rows = np.arange(n_teams)
+
+    if rule == "H2H_RECORD":
+        # season head-to-head wins[s, i, j]; only opponents tied on wins count
+        h2h = np.broadcast_to(inputs["h2h_wins"], (n, n_teams, n_teams)).astype(np.float32)
+        for r in range(opp.shape[1]):
+            h2h[:, rows, opp[:, r]] += result[:, :, r]
+        tied = (wins[:, :, None] == wins[:, None, :]) & ~np.eye(n_teams, dtype=bool)[None]
+        tiebreak = _win_pct((h2h * tied).sum(axis=2), (inputs["games"][None] * tied).sum(axis=2))
+    elif rule == "INTRA_DIVISION_RECORD":
+        same_div = divisions[:, None] == divisions[None, :]
+        div_wins = (inputs["h2h_wins"] * same_div).sum(axis=1)[None, :] + \
+            (result * same_div[rows[:, None], opp][None]).sum(axis=2)
+        tiebreak = _win_pct(div_wins, (inputs["games"] * same_div).sum(axis=1)[None, :])
+    else:
+        tiebreak = np.zeros_like(pf)
+    order = np.lexsort((-pf, -tiebreak, -wins), axis=1)
+
+    if len(set(divisions.tolist())) > 1:
+        pos = np.empty_like(order)
+        pos[np.arange(n)[:, None], order] = rows[None, :]
+        winner = np.zeros((n, n_teams), dtype=bool)
+        for d in set(divisions.tolist()):
+            members = np.flatnonzero(divisions == d)
+            best = members[pos[:, members].argmin(axis=1)]
+            winner[np.arange(n), best] = True
+        order = np.lexsort((pos, ~winner), axis=1)
+    return order
+
+
+def _simulate_chunk(args):
+    """Simulate n seasons; returns (playoff counts[T], seed counts[T, T], total wins[T])."""
+    inputs, n, seed = args
+    rng = np.random.default_rng(seed)
+    means, std = inputs["means"].astype(np.float32), np.float32(inputs["std"])
+    opp = inputs["opponents"]
+    n_teams, n_rem = opp.shape
+
+    scores = rng.standard_normal((n, n_teams, n_rem), dtype=np.float32) * std + means[None, :, None]
+    # opponent's score in the same week: gather along the team axis week by week
+    opp_scores = np.take_along_axis(scores, np.broadcast_to(opp[None, :, :], scores.shape), axis=1)
+    # byes list the team as its own opponent: neither a win nor a tie
+    played = opp != np.arange(n_teams)[:, None]
+    result = ((scores > opp_scores) + 0.5 * (scores == opp_scores)) * played[None, :, :]
+    wins = inputs["wins"][None, :] + result.sum(axis=2)
+    pf = inputs["points_for"][None, :] + scores.sum(axis=2, dtype=np.float64)
+
+    order = _seed_order(inputs, wins, pf, result)
+    seed_of = np.empty_like(order)
+    seed_of[np.arange(n)[:, None], order] = np.arange(n_teams)[None, :]
+
+    seed_counts = np.zeros((n_teams, n_teams), dtype=np.int64)
+    np.add.at(seed_counts, (np.broadcast_to(np.arange(n_teams), seed_of.shape), seed_of), 1)
+    playoff = (seed_of < inputs["playoff_teams"]).sum(axis=0)
+    return playoff, seed_counts, wins.sum(axis=0)
+
+
+def simulate_season(inputs, n_sims=200_000, seed=None, processes=1, chunk=50_000):
+    """
+    Playoff and seed probabilities per team.
+    Returns [{"team", "playoff", "seeds": [p_seed1, ...], "mean_wins"}] sorted by playoff odds.
+    """
+    n_teams = len(inputs["names"])
+    seeds = np.random.SeedSequence(seed).spawn((n_sims + chunk - 1) // chunk)
+    jobs = [(inputs, min(chunk, n_sims - i * chunk), s) for i, s in enumerate(seeds)]
+
+    playoff = np.zeros(n_teams)
+    seed_counts = np.zeros((n_teams, n_teams))
+    wins = np.zeros(n_teams)
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_simulate_chunk, jobs))
+    else:
+        results = map(_simulate_chunk, jobs)
+    for p, s, w in results:
+        playoff += p
+        seed_counts += s
+        wins += w
+
+    out = [
+        {"team": name, "playoff": playoff[i] / n_sims, "seeds": list(seed_counts[i] / n_sims),
+         "mean_wins": wins[i] / n_sims}
+        for i, name in enumerate(inputs["names"])
+    ]
+    return sorted(out, key=lambda r: (-r["playoff"], -r["mean_wins"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate the rest of the regular season")
+    parser.add_argument("--sims", type=int, default=200_000)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--fake", action="store_true", help="use fake_league.FakeLeague (offline)")
+    args = parser.parse_args()
+
+    if args.fake:
+        from fake_league import FakeLeague
+        league = FakeLeague(current_week=6)
+    else:
+        from score_tracker import load_config_and_env
+        from espn_cache import cached_league
+        espn_s2, swid, year, _, _ = load_config_and_env()
+        league = cached_league(31028552, year, espn_s2, swid)
+
+    inputs = league_inputs(league)
+    print(f"[info] {len(inputs['names'])} teams, remaining weeks: {inputs['remaining_weeks']}, "
+          f"score std {inputs['std']:.1f}")
+
+    start = time.perf_counter()
+    results = simulate_season(inputs, n_sims=args.sims, seed=args.seed, processes=args.processes)
+    elapsed = time.perf_counter() - start
+
+    n_seeds = inputs["playoff_teams"]
+    print(f"{'team':<28}{'wins':>6}{'playoffs':>10}" + "".join(f"{'#' + str(k + 1):>7}" for k in range(n_seeds)))
+    for r in results:
+        print(f"{r['team'][:27]:<28}{r['mean_wins']:>6.1f}{r['playoff']:>10.1%}"
+              + "".join(f"{p:>7.1%}" for p in r["seeds"][:n_seeds]))
+    print(f"[info] {args.sims:,} seasons in {elapsed:.2f}s ({args.processes} process(es))")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+# snapshot_archive.py
+"""
+Append-only archive of scores.csv snapshots.
+
+scores.csv only ever grows, so instead of copying the whole file into
+data/scores_<ts>.csv on every tick we append just the new bytes to
+data/archive/segments.log. data/archive/manifest.csv maps each snapshot
+id to the [base, end) byte range of the log that rebuilds it exactly.
+
+Usage:
+    python snapshot_archive.py add [--csv scores.csv] [--ts 2025-09-14T12-58-25Z]
+    python snapshot_archive.py rebuild 2025-09-14T12-58-25Z [-o out.csv]
+    python snapshot_archive.py list
+"""
+import os
+import csv
+import argparse
+from datetime import datetime, timezone
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+ARCHIVE_DIR = os.path.join(SCRIPT_DIR, "data", "archive")
+LEGACY_DIR = os.path.join(SCRIPT_DIR, "data")
+
+SEGMENTS_FILE = "segments.log"
+MANIFEST_FILE = "manifest.csv"
+MANIFEST_FIELDS = ["snapshot", "base", "end", "rows"]
+
+# How many bytes at each end of the previous snapshot to compare when
+# deciding whether the source file was appended to or rewritten.
+CHECK_BYTES = 4096
+
+
+def snapshot_id_now():
+    """Snapshot id in the same format the workflow used for data/scores_<ts>.csv."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H-%M-%SZ")
+
+
+def read_manifest(archive_dir=ARCHIVE_DIR):
+    """Return manifest entries (oldest first) as dicts with int offsets."""
+    path = os.path.join(archive_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        return [
+            {"snapshot": r["snapshot"], "base": int(r["base"]), "end": int(r["end"]), "rows": int(r["rows"])}
+            for r in csv.DictReader(f)
+        ]
+
+
+def _last_entry(archive_dir):
+    """Read only the tail of the manifest to find the previous snapshot."""
+    path = os.path.join(archive_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(max(0, size - 1024))
+        lines = f.read().decode("utf-8").splitlines()
+    for line in reversed(lines):
+        parts = line.split(",")
+        if len(parts) == 4 and parts[0] != "snapshot":
+            return {"snapshot": parts[0], "base": int(parts[1]), "end": int(parts[2]), "rows": int(parts[3])}
+    return None
+
+
+def _read_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(length)
+
+
+def _is_append_of(csv_path, csv_size, seg_path, prev):
+    """
+    True if csv_path still starts with the previous snapshot's bytes.
+    Only the head and tail of the previous snapshot are compared, which is
+    enough to catch the file being rewritten while keeping the check O(1).
+    """
+    prev_len = prev["end"] - prev["base"]
+    if csv_size < prev_len:
+        return False
+    n = min(CHECK_BYTES, prev_len)
+    if _read_range(seg_path, prev["base"], n) != _read_range(csv_path, 0, n):
+        return False
+    tail_start = prev_len - n
+    return _read_range(seg_path, prev["base"] + tail_start, n) == _read_range(csv_path, tail_start, n)
+
+
+def archive_snapshot(csv_path, archive_dir=ARCHIVE_DIR, snapshot_id=None):
+    """
+    Record the current contents of csv_path as a snapshot.
+    Appends only the bytes added since the previous snapshot; if the file
+    was rewritten instead of appended, the whole file starts a new base.
+    """
+    snapshot_id = snapshot_id or snapshot_id_now()
+    os.makedirs(archive_dir, exist_ok=True)
+    seg_path = os.path.join(archive_dir, SEGMENTS_FILE)
+    manifest_path = os.path.join(archive_dir, MANIFEST_FILE)
+
+    csv_size = os.path.getsize(csv_path)
+    seg_size = os.path.getsize(seg_path) if os.path.exists(seg_path) else 0
+    prev = _last_entry(archive_dir)
+
+    if prev and prev["end"] == seg_size and _is_append_of(csv_path, csv_size, seg_path, prev):
+        base = prev["base"]
+        new_bytes = _read_range(csv_path, prev["end"] - prev["base"], csv_size - (prev["end"] - prev["base"]))
+        rows = prev["rows"] + new_bytes.count(b"\n")
+        print(f"[DEBUG] Snapshot {snapshot_id}: appending {len(new_bytes)} new bytes")
+    else:
+        base = seg_size
+        new_bytes = _read_range(csv_path, 0, csv_size)
+        # first line is the header
+        rows = max(0, new_bytes.count(b"\n") - 1)
+        print(f"[DEBUG] Snapshot {snapshot_id}: starting new base at {base} ({len(new_bytes)} bytes)")
+
+    if new_bytes:
+        with open(seg_path, "ab") as f:
+            f.write(new_bytes)
+
+    entry = {"snapshot": snapshot_id, "base": base, "end": seg_size + len(new_bytes), "rows": rows}
+    header = not os.path.exists(manifest_path)
+    with open(manifest_path, "a", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=MANIFEST_FIELDS, lineterminator="\n")
+        if header:
+            writer.writeheader()
+        writer.writerow(entry)
+    return entry
+
+
+def rebuild_snapshot(snapshot_id, archive_dir=ARCHIVE_DIR, legacy_dir=LEGACY_DIR):
+    """
+    Return the exact bytes of scores_<snapshot_id>.csv.
+    Falls back to the old full-copy file in data/ for snapshots taken
+    before the archive existed, or to data/canonical/ once those have been
+    compacted.
+    """
+    for entry in read_manifest(archive_dir):
+        if entry["snapshot"] == snapshot_id:
+            seg_path = os.path.join(archive_dir, SEGMENTS_FILE)
+            return _read_range(seg_path, entry["base"], entry["end"] - entry["base"])
+
+    legacy_path = os.path.join(legacy_dir, f"scores_{snapshot_id}.csv")
+    if os.path.exists(legacy_path):
+        with open(legacy_path, "rb") as f:
+            return f.read()
+
+    # Legacy copies folded away by compact_data.py
+    import compact_data
+    canonical_dir = os.path.join(legacy_dir, "canonical")
+    if os.path.exists(os.path.join(canonical_dir, compact_data.MANIFEST_FILE)):
+        return compact_data.rebuild(snapshot_id, canonical_dir)
+    raise KeyError(f"Unknown snapshot: {snapshot_id}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Delta-encoded archive of scores.csv snapshots")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_add = sub.add_parser("add", help="archive the current scores.csv")
+    p_add.add_argument("--csv", default=os.path.join(SCRIPT_DIR, "scores.csv"))
+    p_add.add_argument("--ts", default=None, help="snapshot id (default: now, UTC)")
+
+    p_rebuild = sub.add_parser("rebuild", help="rebuild scores_<ts>.csv")
+    p_rebuild.add_argument("ts")
+    p_rebuild.add_argument("-o", "--out", default=None, help="output path (default: stdout)")
+
+    sub.add_parser("list", help="list archived snapshots")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    if args.cmd == "add":
+        entry = archive_snapshot(args.csv, args.archive_dir, args.ts)
+        print(f"[INFO] Archived {entry['snapshot']} ({entry['rows']} rows)")
+    elif args.cmd == "rebuild":
+        data = rebuild_snapshot(args.ts, args.archive_dir)
+        if args.out:
+            with open(args.out, "wb") as f:
+                f.write(data)
+            print(f"[INFO] Wrote {len(data)} bytes to {args.out}")
+        else:
+            os.write(1, data)
+    elif args.cmd == "list":
+        for entry in read_manifest(args.archive_dir):
+            print(f"{entry['snapshot']}  rows={entry['rows']}  bytes=[{entry['base']}, {entry['end']})")
+
+
+if __name__ == "__main__":
+    main()
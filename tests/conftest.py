@@ -0,0 +1,11 @@
+# tests/conftest.py
+# The modules are flat scripts at the repo root; make them importable.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Timing spans would land in the real data/metrics/spans.jsonl that the
+# summaries and the blocking baseline read. Set before timing is imported:
+# probes left running by fetch_matchup_rows record after their test returns.
+os.environ["METRICS"] = "0"
@@ -0,0 +1,74 @@
+# tests/test_compact_data.py
+import csv
+import os
+import subprocess
+import sys
+
+import compact_data
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+
+
+def _snapshot(data_dir, sid, header, rows):
+    path = os.path.join(data_dir, f"scores_{sid}.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f, lineterminator="\n")
+        w.writerow(header)
+        w.writerows(rows)
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _snapshots(data_dir):
+    early = [["2025-09-11 07:15:18", "Charlies shortbus ", "0.0"],
+             ["2025-09-11 07:15:18", "Smith, Jones & Co", "0.0"]]
+    later = [["2025-09-14 13:00:00", 2, "Charlies shortbus ", 12.5, 'The "Best"', 3.0],
+             ["2025-09-14 13:00:00", 2, "Smith, Jones & Co", 7.0, "Tongue Dart", 9.25]]
+    return {
+        "2025-09-11T07-20-00Z": _snapshot(data_dir, "2025-09-11T07-20-00Z", ["timestamp", "team", "score"], early),
+        # the switch-over snapshot: old rows kept under the new header
+        "2025-09-14T13-05-00Z": _snapshot(data_dir, "2025-09-14T13-05-00Z",
+                                          ["timestamp", "week", "home_team", "home_score", "away_team", "away_score"],
+                                          early + later),
+        "2025-09-14T13-35-00Z": _snapshot(data_dir, "2025-09-14T13-35-00Z",
+                                          ["timestamp", "week", "home_team", "home_score", "away_team", "away_score"],
+                                          early + later + [["2025-09-14 13:30:00", 2, "Smith, Jones & Co", 15.0,
+                                                            "Tongue Dart", 9.25]]),
+    }
+
+
+def test_compact_verify_rebuild_is_byte_exact(tmp_path):
+    data_dir, out_dir = str(tmp_path / "data"), str(tmp_path / "canonical")
+    os.makedirs(data_dir)
+    originals = _snapshots(data_dir)
+
+    assert compact_data.compact(data_dir, out_dir, workers=2) == (3, 5)
+    assert compact_data.verify(out_dir, workers=2) == []
+    for sid, raw in originals.items():
+        assert compact_data.rebuild(sid, out_dir) == raw
+
+
+def test_verify_flags_a_snapshot_that_no_longer_matches(tmp_path):
+    data_dir, out_dir = str(tmp_path / "data"), str(tmp_path / "canonical")
+    os.makedirs(data_dir)
+    _snapshots(data_dir)
+    # same (timestamp, matchup) as the 13:05 snapshot but a different score
+    _snapshot(data_dir, "2025-09-14T13-06-00Z", ["timestamp", "week", "home_team", "home_score", "away_team", "away_score"],
+              [["2025-09-14 13:00:00", 2, "Charlies shortbus ", 12.0, 'The "Best"', 3.0]])
+    compact_data.compact(data_dir, out_dir, workers=1)
+    assert compact_data.verify(out_dir, workers=1) == ["2025-09-14T13-06-00Z"]
+
+
+def test_cli_options_follow_the_subcommand(tmp_path):
+    data_dir, out_dir = str(tmp_path / "data"), str(tmp_path / "canonical")
+    os.makedirs(data_dir)
+    originals = _snapshots(data_dir)
+    script = os.path.join(REPO_DIR, "compact_data.py")
+    common = ["--data-dir", data_dir, "--out-dir", out_dir, "--workers", "2"]
+
+    subprocess.run([sys.executable, script, "compact", *common], check=True, capture_output=True)
+    subprocess.run([sys.executable, script, "verify", "--out-dir", out_dir], check=True, capture_output=True)
+    out = subprocess.run([sys.executable, script, "rebuild", "2025-09-14T13-35-00Z", "--out-dir", out_dir],
+                         check=True, capture_output=True).stdout
+    assert out == originals["2025-09-14T13-35-00Z"]
@@ -0,0 +1,67 @@
+# tests/test_espn_cache.py
+import os
+import threading
+
+from espn_cache import ResponseCache
+
+
+class FakeRequester:
+    league_id, year = 1, 2025
+
+    def __init__(self):
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def league_get(self, params=None, headers=None, extend="", **kwargs):
+        with self._lock:
+            self.calls += 1
+        return {"params": params, "payload": "x" * 50000}
+
+
+def test_concurrent_misses_on_one_key_all_succeed(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    requester = FakeRequester()
+    cache.install(requester)
+
+    start, errors, results = threading.Barrier(8), [], []
+
+    def probe():
+        start.wait()
+        try:
+            results.append(requester.league_get(params={"view": "proTeamSchedules_wl"}))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=probe) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == [] and len(results) == 8
+    assert cache.hits + cache.misses == 8 and cache.misses == requester.calls
+    assert [n for n in os.listdir(tmp_path) if n.endswith(".tmp")] == []
+    assert requester.league_get(params={"view": "proTeamSchedules_wl"}) == results[0]
+    assert cache.hits + cache.misses == 9 and requester.calls == cache.misses
+
+
+def test_live_views_get_the_short_ttl(tmp_path):
+    cache = ResponseCache(str(tmp_path), static_ttl=100, live_ttl=5)
+    assert cache.ttl_for({"view": ["mTeam", "mMatchupScore"]}) == 5
+    assert cache.ttl_for({"view": "mSettings"}) == 100
+
+
+def test_bypass_refetches_and_refreshes_the_entry(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    requester = FakeRequester()
+    cache.install(requester)
+    params = {"view": "mSettings"}
+
+    requester.league_get(params=params)
+    requester.league_get(params=params)
+    assert requester.calls == 1
+    with cache.bypass():
+        requester.league_get(params=params)
+    assert requester.calls == 2
+    requester.league_get(params=params)
+    assert requester.calls == 2 and cache.hits == 2
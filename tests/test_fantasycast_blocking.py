@@ -0,0 +1,74 @@
+# tests/test_fantasycast_blocking.py
+import json
+
+import fantasycast_blocking as blocking
+
+
+class Recorder:
+    def __init__(self):
+        self.args, self.cdp = [], []
+
+    def add_argument(self, arg):
+        self.args.append(arg)
+
+    def execute_cdp_cmd(self, cmd, params):
+        self.cdp.append((cmd, params))
+        return {}
+
+
+def _config(tmp_path, section):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"league_id": 1, "resource_blocking": section}), encoding="utf-8")
+    return str(path)
+
+
+def test_defaults_without_config(tmp_path):
+    cfg = blocking.load_blocking_config(str(tmp_path / "missing.json"))
+    assert cfg == {"enabled": False, "types": blocking.DEFAULT_TYPES,
+                   "hosts": sorted(set(blocking.DEFAULT_BLOCK_HOSTS)), "allow": []}
+
+    (tmp_path / "broken.json").write_text("{", encoding="utf-8")
+    assert blocking.load_blocking_config(str(tmp_path / "broken.json")) == cfg
+
+
+def test_config_adds_hosts_and_allow_wins(tmp_path):
+    cfg = blocking.load_blocking_config(_config(tmp_path, {
+        "enabled": True, "block_types": ["image", "stylesheet"],
+        "block_hosts": ["Example-Ads.com"], "allow": ["connect.facebook.net"],
+    }))
+    assert cfg["enabled"] and cfg["types"] == ["image", "stylesheet"]
+    assert "example-ads.com" in cfg["hosts"]
+    # allow matches the host and its parent/child forms
+    assert "connect.facebook.net" not in cfg["hosts"] and "facebook.net" not in cfg["hosts"]
+    assert "doubleclick.net" in cfg["hosts"]
+
+
+def test_types_expand_to_url_patterns_and_launch_flags(tmp_path):
+    cfg = blocking.load_blocking_config(_config(tmp_path, {"block_types": ["font", "stylesheet", "unknown"],
+                                                           "block_hosts": []}))
+    driver = Recorder()
+    patterns = blocking.install_url_blocking(driver, cfg)
+    assert patterns == blocking.TYPE_PATTERNS["font"] + blocking.TYPE_PATTERNS["stylesheet"]
+    assert driver.cdp == [("Network.enable", {}), ("Network.setBlockedURLs", {"urls": patterns})]
+
+    opts = blocking.apply_launch_flags(Recorder(), cfg)
+    (rules,) = opts.args  # no image type, so no imagesEnabled flag
+    assert rules.startswith("--host-resolver-rules=")
+    assert "MAP doubleclick.net ~NOTFOUND, MAP *.doubleclick.net ~NOTFOUND" in rules
+
+    images = blocking.apply_launch_flags(Recorder(), dict(cfg, types=["image"], hosts=[]))
+    assert images.args == ["--blink-settings=imagesEnabled=false"]
+
+
+def test_baseline_is_the_median_of_unblocked_loads(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    spans = [("scrapewp_ci", 900.0, {"requests": 300, "bytes": 9e6, "blocking": False}),
+             ("scrapewp_ci", 1100.0, {"requests": 340, "bytes": 11e6, "blocking": False}),
+             ("scrapewp_ci", 1000.0, {"requests": 320, "bytes": 10e6, "blocking": False}),
+             ("scrapewp_ci", 400.0, {"requests": 90, "bytes": 2e6, "blocking": True}),
+             ("scrapewp_daemon", 5000.0, {"requests": 999, "bytes": 1e9, "blocking": False})]
+    path.write_text("".join(json.dumps({"run": f"r{i}", "script": script, "span": "page_resources",
+                                        "ms": ms, "attrs": attrs}) + "\n"
+                            for i, (script, ms, attrs) in enumerate(spans)), encoding="utf-8")
+    assert blocking._baseline(str(path)) == {"requests": 320, "bytes": 10e6, "ms": 1000.0}
+    assert blocking._baseline(str(tmp_path / "none.jsonl")) is None
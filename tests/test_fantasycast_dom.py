@@ -0,0 +1,57 @@
+# tests/test_fantasycast_dom.py
+import fantasycast_dom
+
+# pills 0-5 of a 3-matchup strip: every matchup shows up on two pills
+PILLS = {0: ("A", "B"), 1: ("A", "B"), 2: ("C", "D"), 3: ("C", "D"), 4: ("E", "F"), 5: ("E", "F")}
+
+
+class FakeStrip:
+    def __init__(self, selected=0):
+        self.selected = selected
+        self.clicks = []
+
+    def state(self, *args, **kwargs):
+        return {"teams": list(PILLS[self.selected]), "percents": ["60%", "40%"], "selected": str(self.selected)}
+
+    def pills(self, driver):
+        return [{"id": did, "teams": list(PILLS[did])} for did in PILLS]
+
+    def activate(self, driver, did, timeout=8.0):
+        self.clicks.append(did)
+        self.selected = did
+        return True
+
+
+def _patch(monkeypatch, strip):
+    monkeypatch.setattr(fantasycast_dom, "extract_state", strip.state)
+    monkeypatch.setattr(fantasycast_dom, "list_pills", strip.pills)
+    monkeypatch.setattr(fantasycast_dom, "activate_pill", strip.activate)
+
+
+def test_each_matchup_is_captured_once(monkeypatch):
+    strip = FakeStrip()
+    _patch(monkeypatch, strip)
+    rows = []
+    pair_map = {}
+    captured, clicked, ids = fantasycast_dom.scrape_matchups(None, pair_map, expected=3, on_row=rows.append)
+    assert [(r[1], r[3]) for r in rows] == [("A", "B"), ("C", "D"), ("E", "F")]
+    assert len(captured) == 3 and ids == list(PILLS)
+    # pill 1 repeats the matchup already on screen, but nothing told us yet
+    assert strip.clicks == [1, 2, 3, 4]
+    assert pair_map[0] == ("A", "B") and pair_map[4] == ("E", "F")
+
+
+def test_cached_pair_map_skips_known_pills(monkeypatch):
+    strip = FakeStrip()
+    _patch(monkeypatch, strip)
+    captured, clicked, _ = fantasycast_dom.scrape_matchups(None, dict(PILLS), expected=3)
+    assert len(captured) == 3
+    assert strip.clicks == [2, 4] and clicked == 2
+
+
+def test_expected_count_comes_from_pill_names(monkeypatch):
+    strip = FakeStrip()
+    _patch(monkeypatch, strip)
+    captured, _, _ = fantasycast_dom.scrape_matchups(None, {})
+    # stops after the third distinct pair instead of clicking pill 5
+    assert len(captured) == 3 and strip.clicks == [1, 2, 3, 4]
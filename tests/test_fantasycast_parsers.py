@@ -0,0 +1,103 @@
+# tests/test_fantasycast_parsers.py
+import os
+import functools
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+from lxml import html as lxml_html
+
+import fantasycast_http
+from fantasycast_network import extract_ctw_rows
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+CAPTURED_PAGE = os.path.join(REPO_DIR, "debug_artifacts", "timeout_before_tabs.html")
+
+
+def _doc(path):
+    with open(path, "rb") as f:
+        return lxml_html.fromstring(f.read())
+
+
+def _payload(home, away, status_period=5):
+    body = {
+        "status": {"currentMatchupPeriod": status_period},
+        "teams": [{"id": 1, "name": "Team A"}, {"id": 2, "name": "Team B"},
+                  {"id": 3, "name": "Team C"}, {"id": 4, "name": "Team D"}],
+        "schedule": [
+            {"matchupPeriodId": 5, "home": dict({"teamId": 1}, **home[0]), "away": dict({"teamId": 2}, **away[0])},
+            {"matchupPeriodId": 5, "home": dict({"teamId": 3}, **home[1]), "away": dict({"teamId": 4}, **away[1])},
+        ],
+    }
+    return [{"url": "test", "body": body}]
+
+
+def test_panel_rows_reads_captured_matchup_header():
+    doc = _doc(os.path.join(TESTS_DIR, "fixtures", "fantasycast_matchup_header.html"))
+    assert fantasycast_http.panel_rows(doc) == [("Big Booty Completions", "52%", "Charlies shortbus", "48%")]
+
+
+@pytest.mark.skipif(not os.path.exists(CAPTURED_PAGE), reason="captured page not checked out")
+def test_embedded_states_reads_next_data_assignment():
+    # the captured page assigns __NEXT_DATA__ = {...} followed by more script
+    doc = _doc(CAPTURED_PAGE)
+    states = fantasycast_http.embedded_states(doc)
+    assert any(s.get("props", {}).get("pageProps", {}).get("page", {}).get("config") for s in states)
+    # league config only: no schedule, so nothing for extract_ctw_rows
+    assert fantasycast_http.embedded_payloads(doc) == []
+
+
+def test_fractions_and_percentages():
+    fractions = _payload([{"winProbability": 0.34}, {"winProbability": 0.9}],
+                         [{"winProbability": 0.66}, {"winProbability": 0.1}])
+    assert extract_ctw_rows(fractions) == [("Team A", "34%", "Team B", "66%"), ("Team C", "90%", "Team D", "10%")]
+    percents = _payload([{"winProbability": 34}, {"winProbability": 90}],
+                        [{"winProbability": 66}, {"winProbability": 10}])
+    assert extract_ctw_rows(percents) == [("Team A", "34%", "Team B", "66%"), ("Team C", "90%", "Team D", "10%")]
+
+
+def test_scale_is_decided_per_payload():
+    # a 0.8% underdog in a percentage payload is not 80%
+    rows = extract_ctw_rows(_payload([{"winProbability": 99.2}, {"winProbability": 55}],
+                                     [{"winProbability": 0.8}, {"winProbability": 45}]))
+    assert rows[0] == ("Team A", "99%", "Team B", "1%")
+
+
+def test_missing_side_is_the_complement():
+    rows = extract_ctw_rows(_payload([{"winProbability": 50}, {"winProbability": 70}], [{}, {}]))
+    assert rows == [("Team A", "50%", "Team B", "50%"), ("Team C", "70%", "Team D", "30%")]
+    assert extract_ctw_rows(_payload([{"winProbability": 0.25}, {"winProbability": 0.75}], [{}, {}]))[1] == \
+        ("Team C", "75%", "Team D", "25%")
+
+
+def test_static_fixture_page_rows():
+    doc = _doc(os.path.join(REPO_DIR, "bench_fixtures", "fantasycast", "static.html"))
+    rows = extract_ctw_rows(fantasycast_http.embedded_payloads(doc))
+    assert len(rows) == 6 and rows[0] == ("Charlies shortbus", "34%", "Tongue Dart", "66%")
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fixture_server():
+    handler = functools.partial(QuietHandler, directory=os.path.join(REPO_DIR, "bench_fixtures", "fantasycast"))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_rows_prefers_the_api_and_falls_back_to_the_page(fixture_server):
+    session = fantasycast_http.make_session(retries=0)
+    from_api = fantasycast_http.fetch_rows(session, f"{fixture_server}/league.json", f"{fixture_server}/static.html")
+    assert len(from_api) == 6 and from_api[0][1:] == ("Charlies shortbus", "34%", "Tongue Dart", "66%")
+
+    from_page = fantasycast_http.fetch_rows(session, f"{fixture_server}/missing.json", f"{fixture_server}/static.html")
+    assert [r[1:] for r in from_page] == [r[1:] for r in from_api]
+
+    assert fantasycast_http.fetch_rows(session, f"{fixture_server}/missing.json", f"{fixture_server}/gone.html") == []
@@ -0,0 +1,172 @@
+# tests/test_fantasycast_session.py
+import json
+import time
+from datetime import datetime, timezone
+
+import fantasycast_session
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def test_week_key_prefers_the_configured_week():
+    assert fantasycast_session.week_key(1, 2025, 3, now=_utc(2025, 9, 23, 13)) == "1:2025:w3"
+
+
+def test_fallback_week_key_spans_thursday_to_monday_night():
+    keys = {fantasycast_session.week_key(1, 2025, now=when) for when in (
+        _utc(2025, 9, 19, 0, 20),  # TNF kickoff
+        _utc(2025, 9, 21, 17, 0),  # Sunday early games
+        _utc(2025, 9, 23, 2, 30),  # MNF, early Tuesday UTC
+    )}
+    assert len(keys) == 1
+    assert fantasycast_session.week_key(1, 2025, now=_utc(2025, 9, 16, 2, 30)) not in keys  # last week's MNF
+    assert fantasycast_session.week_key(1, 2025, now=_utc(2025, 9, 23, 13, 0)) not in keys  # Tuesday waivers
+
+
+class CookieDriver:
+    """Just the CDP cookie calls save_cookies/restore_cookies make."""
+
+    def __init__(self, cookies=(), cdp=True):
+        self.cookies, self.cdp, self.set = list(cookies), cdp, None
+
+    def execute_cdp_cmd(self, cmd, params):
+        if not self.cdp:
+            raise RuntimeError("no CDP")
+        if cmd == "Network.getAllCookies":
+            return {"cookies": self.cookies}
+        if cmd == "Network.setCookies":
+            self.set = params["cookies"]
+            return {}
+        raise AssertionError(cmd)
+
+    def get_cookies(self):
+        return self.cookies[:1]
+
+
+def _cookie(name, expires=-1, **extra):
+    return dict({"name": name, "value": "v", "domain": ".espn.com", "path": "/", "secure": True,
+                 "httpOnly": False, "sameSite": "Lax", "expires": expires, "size": 12, "session": False}, **extra)
+
+
+def test_cookies_round_trip_without_expired_ones(tmp_path):
+    path = str(tmp_path / "cookies.json")
+    later = time.time() + 3600
+    browser = CookieDriver([_cookie("OptanonConsent", later), _cookie("SWID"), _cookie("old", time.time() - 60)])
+    assert fantasycast_session.save_cookies(browser, path) == 2
+    with open(path, encoding="utf-8") as f:
+        saved = json.load(f)["cookies"]
+    assert [c["name"] for c in saved] == ["OptanonConsent", "SWID"]
+    assert set(saved[0]) == set(fantasycast_session.COOKIE_FIELDS)  # CDP-only fields dropped
+
+    fresh = CookieDriver()
+    assert fantasycast_session.restore_cookies(fresh, path) is True
+    assert fresh.set == saved
+
+
+def test_restore_without_a_usable_consent_cookie(tmp_path):
+    path = tmp_path / "cookies.json"
+    assert fantasycast_session.restore_cookies(CookieDriver(), str(path)) is False  # no file yet
+
+    path.write_text("{truncated", encoding="utf-8")
+    assert fantasycast_session.restore_cookies(CookieDriver(), str(path)) is False
+
+    path.write_text(json.dumps({"cookies": [_cookie("OptanonConsent", time.time() - 60), _cookie("SWID")]}),
+                    encoding="utf-8")
+    driver = CookieDriver()
+    assert fantasycast_session.restore_cookies(driver, str(path)) is False  # consent cookie expired
+    assert [c["name"] for c in driver.set] == ["SWID"]
+
+    path.write_text(json.dumps({"cookies": [_cookie("OptanonConsent")]}), encoding="utf-8")
+    assert fantasycast_session.restore_cookies(CookieDriver(cdp=False), str(path)) is False
+
+
+def test_save_falls_back_to_current_domain_cookies(tmp_path):
+    path = str(tmp_path / "state" / "cookies.json")
+    assert fantasycast_session.save_cookies(CookieDriver([_cookie("SWID"), _cookie("espn_s2")], cdp=False), path) == 1
+
+
+class Frame:
+    def __init__(self, src, *children, ctw=False, id=""):
+        self.src, self.children, self.ctw, self.id = src, list(children), ctw, id
+
+
+class FrameElement:
+    def __init__(self, frame):
+        self.frame = frame
+
+    def get_attribute(self, name):
+        return getattr(self.frame, name)
+
+
+class FrameDriver:
+    """A page as a tree of Frames; only the calls the iframe lookup makes."""
+
+    def __init__(self, top):
+        self.top = self.current = top
+        self.current_url = "https://fantasy.espn.com/football/fantasycast?leagueId=1&_=123"
+        driver = self
+
+        class SwitchTo:
+            def default_content(self):
+                driver.current = driver.top
+
+            def frame(self, element):
+                driver.current = element.frame
+
+        self.switch_to = SwitchTo()
+
+    def execute_script(self, script):
+        return "complete"
+
+    def find_elements(self, by, value):
+        if value == "iframe":
+            return [FrameElement(f) for f in self.current.children]
+        return [object()] if self.current.ctw else []
+
+
+def _page(*ads):
+    app = Frame("https://fantasy.espn.com/app?v=1", Frame("https://fantasy.espn.com/matchup?v=2", ctw=True), id="app")
+    return Frame("top", *[Frame(f"https://ads.example/{a}") for a in ads], app)
+
+
+def test_frame_path_is_cached_and_follows_shifted_indices(tmp_path):
+    state = str(tmp_path / "frame_path.json")
+    driver = FrameDriver(_page("a"))
+    assert fantasycast_session.switch_into_matchup_iframe(driver, timeout=0.5, poll=0.01, state_file=state) == [1, 0]
+    assert driver.current.ctw
+    saved = fantasycast_session.load_frame_state(state)["https://fantasy.espn.com/football/fantasycast"]
+    assert saved["path"] == [1, 0] and saved["frames"][0] == {"id": "app", "src": "https://fantasy.espn.com/app"}
+
+    # two more ads ahead of the app frame: same fingerprints, new indices, re-saved
+    driver = FrameDriver(_page("a", "b", "c"))
+    assert fantasycast_session.switch_into_matchup_iframe(driver, timeout=0.5, poll=0.01, state_file=state) == [3, 0]
+    assert fantasycast_session.load_frame_state(state)["https://fantasy.espn.com/football/fantasycast"]["path"] == [3, 0]
+
+
+def test_stale_frame_path_falls_back_to_the_search(tmp_path):
+    state = str(tmp_path / "frame_path.json")
+    fantasycast_session.switch_into_matchup_iframe(FrameDriver(_page("a")), timeout=0.5, poll=0.01, state_file=state)
+
+    # the app frame moved to another URL: the fingerprint no longer matches
+    page = _page()
+    page.children[0].src = "https://fantasy.espn.com/app-v2"
+    driver = FrameDriver(page)
+    assert fantasycast_session.switch_into_matchup_iframe(driver, timeout=0.3, poll=0.01, state_file=state) == [0, 0]
+    assert fantasycast_session.load_frame_state(state)["https://fantasy.espn.com/football/fantasycast"]["frames"][0]["src"] \
+        == "https://fantasy.espn.com/app-v2"
+
+    # no 'Chance to Win' anywhere: give up after the timeout, back at the top document
+    page.children[0].children[0].ctw = False
+    driver = FrameDriver(page)
+    assert fantasycast_session.switch_into_matchup_iframe(driver, timeout=0.2, poll=0.01, state_file=state) is None
+    assert driver.current is driver.top
+
+
+def test_unwritable_state_file_does_not_fail_the_lookup(tmp_path):
+    blocker = tmp_path / "not-a-dir"
+    blocker.write_text("", encoding="utf-8")
+    state = str(blocker / "frame_path.json")
+    assert fantasycast_session.switch_into_matchup_iframe(FrameDriver(_page("a")), timeout=0.5, poll=0.01,
+                                                          state_file=state) == [1, 0]
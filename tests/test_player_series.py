@@ -0,0 +1,44 @@
+# tests/test_player_series.py
+import os
+
+import player_series
+
+
+def _row(ts, week, players):
+    return {"timestamp": ts, "week": week, "home_team": "Team A", "home_score": 0,
+            "away_team": "Team B", "away_score": 0, "players": players}
+
+
+def test_curve_round_trips_through_week_log(tmp_path):
+    root = str(tmp_path)
+    ticks = [
+        ("2025-09-14 13:00:00", [("Team A", 1, "Ja'Marr Chase", "WR", "WR", 0.0),
+                                 ("Team B", 2, "Josh Allen", "QB", "QB", 0.0)]),
+        ("2025-09-14 13:15:00", [("Team A", 1, "Ja'Marr Chase", "WR", "WR", 6.5),
+                                 ("Team B", 2, "Josh Allen", "QB", "QB", 0.0)]),
+        ("2025-09-14 13:30:00", [("Team A", 1, "Ja'Marr Chase", "WR", "WR", 6.5),
+                                 ("Team B", 2, "Josh Allen", "QB", "QB", 4.2)]),
+    ]
+    for ts, players in ticks:
+        player_series.record([_row(ts, 2, players)], root)
+
+    # only changes are logged: 2 + 1 + 1 observations over three lines
+    with open(os.path.join(root, "week-02.jsonl"), encoding="utf-8") as f:
+        assert len(f.readlines()) == 3
+
+    player_series._loaded.clear()  # force a replay from disk
+    series = player_series.load(root)
+    assert len(series) == 4
+    assert [(when.strftime("%H:%M"), pts) for when, pts, _, _ in series.curve("Chase")] == [("13:00", 0.0), ("13:15", 6.5)]
+    assert series.at("Josh Allen", "2025-09-14 13:20:00") == (0.0, "QB", "Team B")
+    assert series.at("Josh Allen", "2025-09-14 13:45:00") == (4.2, "QB", "Team B")
+
+
+def test_record_ignores_replayed_ticks(tmp_path):
+    root = str(tmp_path)
+    rows = [_row("2025-09-14 13:00:00", 1, [("Team A", 1, "Ja'Marr Chase", "WR", "WR", 3.0)])]
+    assert player_series.record(rows, root)[1] == 1
+    assert player_series.record(rows, root)[1] == 0
+    player_series._loaded.clear()
+    assert player_series.record(rows, root)[1] == 0
+    assert len(player_series.load(root, weeks=[1])) == 1
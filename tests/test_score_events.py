@@ -0,0 +1,52 @@
+# tests/test_score_events.py
+from score_events import ScoreEventDetector
+
+
+def _row(ts, hs, as_, week=3):
+    return {"timestamp": ts, "week": week, "home_team": "Team A", "home_score": hs,
+            "away_team": "Team B", "away_score": as_}
+
+
+def _types(events):
+    return [(e["type"], e["team"]) for e in events]
+
+
+def test_big_play_lead_change_and_correction(tmp_path):
+    seen = []
+    det = ScoreEventDetector([seen.append], big_play=6.0, state_path=str(tmp_path / "state.json"))
+    assert det.process([_row("13:00", 10.0, 4.0)]) == []
+    assert _types(det.process([_row("13:15", 10.0, 12.0)])) == [("big_play", "Team B"), ("lead_change", "Team B")]
+    assert _types(det.process([_row("13:30", 9.5, 12.0)])) == [("stat_correction", "Team A")]
+    assert _types(seen) == [("big_play", "Team B"), ("lead_change", "Team B"), ("stat_correction", "Team A")]
+    assert seen[0]["delta"] == 8.0 and seen[0]["previous"] == 4.0
+
+
+def test_reset_reported_once_and_recovery_is_quiet(tmp_path):
+    det = ScoreEventDetector(state_path=str(tmp_path / "state.json"))
+    det.process([_row("13:00", 20.0, 10.0)])
+    assert _types(det.process([_row("13:15", 0.0, 10.0)])) == [("score_reset", "Team A")]
+    assert det.process([_row("13:30", 0.0, 10.0)]) == []
+    assert det.process([_row("13:45", 21.0, 10.0)]) == []  # not a 21-point big play
+
+
+def test_state_carries_over_between_runs(tmp_path):
+    state = str(tmp_path / "state.json")
+    det = ScoreEventDetector(state_path=state)
+    det.process([_row("13:00", 20.0, 10.0)])
+    det.process([_row("13:15", 0.0, 10.0)])
+    det.save()
+
+    det = ScoreEventDetector(state_path=state)
+    assert det.process([_row("13:30", 0.0, 10.0)]) == []  # the reset was already reported
+    assert _types(det.process([_row("13:45", 20.0, 30.0)])) == [("big_play", "Team B"), ("lead_change", "Team B")]
+
+
+def test_new_week_drops_old_state_and_bad_sinks_are_contained(tmp_path):
+    def broken(event):
+        raise RuntimeError("down")
+
+    det = ScoreEventDetector([broken], state_path=str(tmp_path / "state.json"))
+    det.process([_row("13:00", 20.0, 10.0, week=1)])
+    det.process([_row("13:00", 1.0, 0.0, week=3)])
+    assert det.week == 3 and not any(k.startswith("1|") for k in det.scores)
+    assert _types(det.process([_row("13:15", 1.0, 9.0, week=3)])) == [("big_play", "Team B"), ("lead_change", "Team B")]
@@ -0,0 +1,60 @@
+# tests/test_score_history.py
+import csv
+from datetime import datetime
+
+import score_history
+
+HEADER = ["timestamp", "week", "home_team", "home_score", "away_team", "away_score"]
+
+
+def _write(path, rows, mode="w"):
+    with open(path, mode, newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        if mode == "w":
+            w.writerow(HEADER)
+        w.writerows(rows)
+
+
+def test_queries_and_incremental_refresh(tmp_path):
+    path = str(tmp_path / "scores.csv")
+    index = str(tmp_path / ".cache" / "score_history.pkl")
+    _write(path, [
+        ["2025-09-14 13:00:00", 2, "Smith, Jones & Co", 10.0, 'The "Best"', 4.0],
+        ["2025-09-14 13:00:00", 2, "Team C", 1.0, "Team D", 2.0],
+        ["2025-09-14 14:00:00", 2, "Smith, Jones & Co", 20.5, 'The "Best"', 18.0],
+    ])
+    hist = score_history.load(path, index)
+    assert len(hist) == 3
+
+    row = hist.score_at('The "Best"', "Smith, Jones & Co", "2025-09-14 13:30:00")
+    assert (row["home_score"], row["away_score"], row["week"]) == (10.0, 4.0, 2)
+    assert hist.score_at("Team C", "Team D", "2025-09-14 12:00:00") is None
+
+    _write(path, [["2025-09-21 13:00:00", 3, 'The "Best"', 7.0, "Smith, Jones & Co", 3.0]], mode="a")
+    hist = score_history.load(path, index)  # picks up the pickle and reads only the new line
+    assert len(hist) == 4
+    assert hist.score_at("Smith, Jones & Co", 'The "Best"', "2025-09-22 00:00:00")["week"] == 3
+    assert hist.score_at("Smith, Jones & Co", 'The "Best"', "2025-09-22 00:00:00", week=2)["home_score"] == 20.5
+
+    assert [r["timestamp"].hour for r in hist.matchup_range("Smith, Jones & Co", 'The "Best"',
+                                                            since="2025-09-14 13:30:00")] == [14, 13]
+    assert list(hist.team_series("Smith, Jones & Co")) == [
+        (datetime(2025, 9, 14, 13), 2, 10.0, 'The "Best"', 4.0),
+        (datetime(2025, 9, 14, 14), 2, 20.5, 'The "Best"', 18.0),
+        (datetime(2025, 9, 21, 13), 3, 3.0, 'The "Best"', 7.0),
+    ]
+
+
+def test_half_written_line_waits_and_rewrite_rebuilds(tmp_path):
+    path = str(tmp_path / "scores.csv")
+    _write(path, [["2025-09-14 13:00:00", 2, "Team A", 1.0, "Team B", 2.0]])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("2025-09-14 13:05:00,2,Team A,3.0")
+    hist = score_history.ScoreHistory(path)
+    assert hist.refresh() == 1
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(",Team B,2.0\n")
+    assert hist.refresh() == 1 and len(hist) == 2
+
+    _write(path, [["2025-09-21 13:00:00", 3, "Team A", 9.0, "Team B", 9.5]])  # rewritten from scratch
+    assert hist.refresh() == 1 and len(hist) == 1
@@ -0,0 +1,60 @@
+# tests/test_score_store.py
+import os
+
+import score_store
+
+
+def _rows(ts, week, scores):
+    return [{"timestamp": ts, "week": week, "home_team": h, "home_score": hs,
+             "away_team": a, "away_score": as_} for h, hs, a, as_ in scores]
+
+
+def test_append_query_and_compact_round_trip(tmp_path):
+    root = str(tmp_path / "store")
+    score_store.append_rows(_rows("2025-09-14 13:00:00", 2, [("Team A", 1, "Team B", 2), ("Team C", 3, "Team D", 4)]), root)
+    score_store.append_rows(_rows("2025-09-14 14:00:00", 2, [("Team A", 10.5, "Team B", 2)]), root)
+    score_store.append_rows(_rows("2025-09-21 13:00:00", 3, [("Team B", 7, "Team A", 8)]), root)
+
+    week2 = score_store.load_week(2, root=root)
+    assert len(week2) == 3 and len(os.listdir(os.path.join(root, "week=2"))) == 2
+
+    df = score_store.history(team="Team A", columns=["timestamp", "home_score"], root=root)
+    assert list(df.columns) == ["timestamp", "home_score"] and len(df) == 3
+    df = score_store.history(week=2, since="2025-09-14 13:30:00", root=root)
+    assert df[["home_team", "home_score", "week"]].values.tolist() == [["Team A", 10.5, 2]]
+
+    before = score_store.history(root=root).sort_values(["week", "timestamp", "home_team"]).reset_index(drop=True)
+    score_store.compact(root=root)
+    assert len(os.listdir(os.path.join(root, "week=2"))) == 1
+    after = score_store.history(root=root).sort_values(["week", "timestamp", "home_team"]).reset_index(drop=True)
+    assert after.astype(str).equals(before.astype(str))
+
+
+def test_backfill_reads_matchup_rows_from_the_tracker_csv(tmp_path):
+    path = tmp_path / "scores.csv"
+    path.write_text("timestamp,week,home_team,home_score,away_team,away_score\n"
+                    "2025-09-01 10:00:00,Team A,5\n"  # early timestamp,team,score row
+                    '2025-09-14 13:00:00,2,"Smith, Jones",1.5,Team B,2\n', encoding="utf-8")
+    root = str(tmp_path / "store")
+    score_store.backfill(str(path), root)
+    df = score_store.history(root=root)
+    assert df[["home_team", "home_score", "away_team", "week"]].values.tolist() == [["Smith, Jones", 1.5, "Team B", 2]]
+    assert score_store.history(root=str(tmp_path / "missing")).empty
+
+
+def test_auto_compact_folds_finished_weeks_and_long_current_weeks(tmp_path):
+    root = str(tmp_path / "store")
+    for minute in range(4):
+        ts = f"2025-09-14 13:{minute:02d}:00"
+        score_store.append_rows(_rows(ts, 2, [("Team A", minute, "Team B", 1)]), root)
+        score_store.append_rows(_rows(ts, 3, [("Team A", minute, "Team B", 2)]), root)
+
+    score_store.auto_compact(3, root, max_parts=4)
+    assert len(os.listdir(os.path.join(root, "week=2"))) == 1
+    assert len(os.listdir(os.path.join(root, "week=3"))) == 4
+
+    score_store.append_rows(_rows("2025-09-14 13:05:00", 3, [("Team A", 9, "Team B", 2)]), root)
+    score_store.auto_compact(3, root, max_parts=4)
+    assert len(os.listdir(os.path.join(root, "week=3"))) == 1
+    assert score_store.load_week(3, root=root)["home_score"].tolist() == [0.0, 1.0, 2.0, 3.0, 9.0]
+    assert len(score_store.load_week(2, root=root)) == 4
@@ -0,0 +1,70 @@
+# tests/test_score_tracker.py
+import json
+
+from fake_league import FakeLeague
+from score_tracker import fetch_matchup_rows, filter_changed_rows
+
+
+def _scores(rows):
+    return [(r["week"], r["home_team"], r["home_score"], r["away_team"], r["away_score"]) for r in rows]
+
+
+def test_box_scores_for_the_first_candidate_win():
+    league = FakeLeague(current_week=3)
+    rows, week = fetch_matchup_rows(league, [3, 2])
+    assert week == 3 and len(rows) == 6
+    assert all(r["players"] for r in rows)
+    assert league.calls == [("box_scores", 3)]
+
+
+def test_failed_week_falls_back_to_the_next_candidate():
+    league = FakeLeague(current_week=3, fail_weeks={3})
+    rows, week = fetch_matchup_rows(league, [3, 2])
+    assert week == 2 and len(rows) == 6
+    assert league.calls == [("box_scores", 3), ("box_scores", 2)]
+
+
+def test_empty_box_scores_fall_back_to_scoreboard():
+    league = FakeLeague(current_week=3, empty_weeks={3})
+    rows, week = fetch_matchup_rows(league, [3])
+    assert week == 3 and len(rows) == 6
+    assert "players" not in rows[0]  # scoreboard rows carry no lineups
+    assert league.calls == [("box_scores", 3), ("scoreboard", 3)]
+
+
+def test_nothing_found_returns_no_rows():
+    league = FakeLeague(current_week=3, fail_weeks={3})
+    assert fetch_matchup_rows(league, [3]) == ([], None)
+
+
+def test_thread_pool_returns_the_serial_result():
+    for kwargs in ({}, {"fail_weeks": {3}}, {"empty_weeks": {3}}):
+        serial, serial_week = fetch_matchup_rows(FakeLeague(current_week=3, **kwargs), [3, 2])
+        pooled, pooled_week = fetch_matchup_rows(FakeLeague(current_week=3, **kwargs), [3, 2], max_workers=4)
+        assert pooled_week == serial_week
+        assert _scores(pooled) == _scores(serial)
+
+
+def _row(ts, hs, as_):
+    return {"timestamp": ts, "week": 3, "home_team": "Team A", "home_score": hs,
+            "away_team": "Team B", "away_score": as_}
+
+
+def test_filter_changed_rows_keeps_moves_and_heartbeats(tmp_path):
+    state = str(tmp_path / "scores_state.json")
+    assert len(filter_changed_rows([_row("2025-09-21 13:00:00", 10.0, 5.0)], state)) == 1
+    assert filter_changed_rows([_row("2025-09-21 13:05:00", 10.0, 5.0)], state, heartbeat_minutes=15) == []
+    assert len(filter_changed_rows([_row("2025-09-21 13:06:00", 10.0, 5.5)], state)) == 1
+    # 15 minutes after the last written row, not the first
+    assert filter_changed_rows([_row("2025-09-21 13:20:00", 10.0, 5.5)], state, heartbeat_minutes=15) == []
+    assert len(filter_changed_rows([_row("2025-09-21 13:21:00", 10.0, 5.5)], state, heartbeat_minutes=15)) == 1
+
+    with open(state, encoding="utf-8") as f:
+        assert json.load(f) == {"3|Team A|Team B": {"home_score": 10.0, "away_score": 5.5,
+                                                    "written_at": "2025-09-21 13:21:00"}}
+
+
+def test_filter_changed_rows_survives_a_corrupt_state_file(tmp_path):
+    state = tmp_path / "scores_state.json"
+    state.write_text("{not json", encoding="utf-8")
+    assert len(filter_changed_rows([_row("2025-09-21 13:00:00", 1.0, 2.0)], str(state))) == 1
@@ -0,0 +1,52 @@
+# tests/test_season_sim.py
+from types import SimpleNamespace
+
+import pytest
+
+import season_sim
+from fake_league import FakeLeague, FakeTeam
+
+# week -> (home, away, winner); week 5 is still to play
+SCHEDULE = [
+    [("A", "B", "A"), ("C", "D", "C")],
+    [("A", "C", "A"), ("B", "D", "B")],
+    [("A", "D", "A"), ("B", "C", "B")],
+    [("A", "B", "A"), ("C", "D", "D")],
+    [("A", "C", None), ("B", "D", None)],
+]
+
+
+def _tiny_league(tie_rule="TOTAL_POINTS_SCORED"):
+    """A is 4-0 with one week left and two playoff spots: B can reach 3 wins at most."""
+    teams = {name: FakeTeam(i + 1, f"Team {name}") for i, name in enumerate("ABCD")}
+    for games in SCHEDULE:
+        for home, away, winner in games:
+            h, a = teams[home], teams[away]
+            h.schedule.append(a)
+            a.schedule.append(h)
+            for team, won in ((h, winner == home), (a, winner == away)):
+                team.outcomes.append("U" if winner is None else "W" if won else "L")
+                team.scores.append(0.0 if winner is None else 120.0 if won else 90.0)
+    settings = SimpleNamespace(reg_season_count=5, playoff_team_count=2, playoff_seed_tie_rule=tie_rule)
+    return SimpleNamespace(teams=list(teams.values()), settings=settings)
+
+
+@pytest.mark.parametrize("tie_rule", season_sim.TIE_RULES)
+def test_clinched_team_and_playoff_slots(tmp_path, tie_rule):
+    inputs = season_sim.league_inputs(_tiny_league(tie_rule), str(tmp_path / "missing.csv"))
+    assert inputs["wins"].tolist() == [4.0, 2.0, 1.0, 1.0]
+    assert inputs["remaining_weeks"] == [5]
+
+    odds = {r["team"]: r for r in season_sim.simulate_season(inputs, n_sims=20_000, seed=7, chunk=5_000)}
+    assert sum(r["playoff"] for r in odds.values()) == pytest.approx(2.0)
+    assert odds["Team A"]["playoff"] == 1.0 and odds["Team A"]["seeds"][0] == 1.0
+    for r in odds.values():
+        assert sum(r["seeds"]) == pytest.approx(1.0)
+    assert 4.0 <= odds["Team A"]["mean_wins"] <= 5.0
+
+
+def test_seeded_runs_repeat_and_fake_league_sums_to_slots(tmp_path):
+    inputs = season_sim.league_inputs(FakeLeague(n_teams=8, current_week=10, seed=3), str(tmp_path / "missing.csv"))
+    first = season_sim.simulate_season(inputs, n_sims=4_000, seed=11, chunk=1_000)
+    assert season_sim.simulate_season(inputs, n_sims=4_000, seed=11, chunk=1_000) == first
+    assert sum(r["playoff"] for r in first) == pytest.approx(inputs["playoff_teams"])
@@ -0,0 +1,53 @@
+# tests/test_snapshot_archive.py
+import os
+
+import pytest
+
+import snapshot_archive
+
+HEADER = b"timestamp,week,home_team,home_score,away_team,away_score\n"
+
+
+def _line(i):
+    return f'2025-09-14 13:{i // 60:02d}:{i % 60:02d},2,"Smith, Jones",{i}.5,Team B,{i}.0\n'.encode()
+
+
+def test_every_snapshot_rebuilds_byte_identical(tmp_path):
+    csv_path, archive = tmp_path / "scores.csv", str(tmp_path / "archive")
+    lines = [_line(i) for i in range(300)]  # > CHECK_BYTES, so head and tail checks differ
+    states = [
+        HEADER + b"".join(lines[:100]),                      # first snapshot
+        HEADER + b"".join(lines[:250]),                      # appended
+        HEADER + b"".join(lines[:250]),                      # no-op tick
+        HEADER + b"".join(lines[:250]) + lines[250][:20],    # half-written last line
+        HEADER + b"".join(lines[:300]),                      # line completed
+        HEADER + b"".join(lines[:299]) + _line(999),         # last row rewritten (tail check)
+        b"timestamp,team,score\n2025-09-11 07:15:18,Charlies shortbus ,0.0\n",  # whole file replaced
+        HEADER + b"".join(lines[:10]),                       # rewritten, shorter than the file before
+    ]
+    entries = []
+    for n, data in enumerate(states):
+        csv_path.write_bytes(data)
+        entries.append(snapshot_archive.archive_snapshot(str(csv_path), archive, f"snap-{n}"))
+
+    for n, data in enumerate(states):
+        assert snapshot_archive.rebuild_snapshot(f"snap-{n}", archive) == data
+
+    bases = [e["base"] for e in entries]
+    assert bases[0] == bases[1] == bases[2] == bases[3] == bases[4]  # appends share one base
+    assert len(set(bases[5:])) == 3  # every rewrite starts a new one
+    assert entries[2]["end"] == entries[1]["end"]  # the no-op added no bytes
+    assert [e["rows"] for e in entries[:3]] == [100, 250, 250]
+    assert os.path.getsize(os.path.join(archive, snapshot_archive.SEGMENTS_FILE)) == \
+        len(states[4]) + sum(len(s) for s in states[5:])
+    assert [e["snapshot"] for e in snapshot_archive.read_manifest(archive)] == [f"snap-{n}" for n in range(len(states))]
+
+
+def test_rebuild_falls_back_to_legacy_copies(tmp_path):
+    legacy = tmp_path / "data"
+    legacy.mkdir()
+    (legacy / "scores_2025-09-14T12-58-25Z.csv").write_bytes(HEADER + _line(1))
+    archive = str(legacy / "archive")
+    assert snapshot_archive.rebuild_snapshot("2025-09-14T12-58-25Z", archive, str(legacy)) == HEADER + _line(1)
+    with pytest.raises(KeyError):
+        snapshot_archive.rebuild_snapshot("2025-09-14T12-00-00Z", archive, str(legacy))
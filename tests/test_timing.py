@@ -0,0 +1,43 @@
+# tests/test_timing.py
+import json
+
+import pytest
+
+import timing
+
+
+def test_percentile_interpolates_between_ranks():
+    assert timing._percentile([10.0], 0.95) == 10.0
+    assert timing._percentile([1.0, 2.0, 3.0, 4.0], 0.50) == 2.5
+    assert timing._percentile([float(i) for i in range(1, 101)], 0.95) == pytest.approx(95.05)
+    assert timing._percentile([1.0, 5.0], 1.0) == 5.0
+
+
+def test_summarize_groups_by_script_and_span():
+    spans = [{"run": "r1", "script": "scrapewp_ci", "span": "load", "ms": ms, "ok": ok}
+             for ms, ok in ((100.0, True), (300.0, False), (200.0, True))]
+    spans += [{"run": "r1", "script": "scrapewp_ci", "span": "consent", "ms": 900.0, "ok": True},
+              {"run": "r2", "script": "score_tracker", "span": "poll", "ms": 50.0}]
+    assert timing.summarize(spans) == [
+        ("score_tracker", "poll", 1, 0, 50.0, 50.0, 50.0),
+        ("scrapewp_ci", "consent", 1, 0, 900.0, 900.0, 900.0),
+        ("scrapewp_ci", "load", 3, 1, 200.0, 290.0, 300.0),
+    ]
+
+
+def test_spans_round_trip_through_the_metrics_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "spans.jsonl")
+    monkeypatch.setattr(timing, "_state", dict(timing._state, enabled=True, path=path, script="t", run="t-1"))
+    with timing.span("fetch", week=3) as sp:
+        sp["rows"] = 6
+    with pytest.raises(ValueError):
+        with timing.span("parse"):
+            raise ValueError("bad")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"run": "t-2", "scr')  # torn line from a killed run
+
+    spans = timing.load_spans(path, script="t")
+    assert [(s["span"], s["ok"]) for s in spans] == [("fetch", True), ("parse", False)]
+    assert spans[0]["attrs"] == {"week": 3, "rows": 6} and spans[1]["error"] == "ValueError: bad"
+    assert timing.load_spans(path, script="other") == []
+    assert json.loads(open(path, encoding="utf-8").readline())["run"] == "t-1"
@@ -0,0 +1,42 @@
+# tests/test_winprob_mc.py
+import csv
+
+import player_series
+import winprob_mc
+
+
+def _tick(ts, chase_pts, chase_played, allen_pts, allen_played):
+    return {"timestamp": ts, "week": 3, "home_team": "Team A", "home_score": chase_pts,
+            "away_team": "Team B", "away_score": allen_pts,
+            "players": [("Team A", 1, "Ja'Marr Chase", "WR", "WR", chase_pts, 15.0, chase_played),
+                        ("Team B", 2, "Josh Allen", "QB", "QB", allen_pts, 22.0, allen_played)]}
+
+
+def test_row_matchups_match_box_score_layout():
+    rows = [_tick("2025-09-21 13:00:00", 4.0, 25, 10.0, 50),
+            {"timestamp": "2025-09-21 13:00:00", "week": 3, "home_team": "Team C", "home_score": 1,
+             "away_team": "Team D", "away_score": 2}]  # scoreboard row: no lineups
+    assert winprob_mc.row_matchups(rows) == [
+        ("Team A", "Team B", [("WR", 4.0, 15.0, 25)], [("QB", 10.0, 22.0, 50)])]
+    (result,) = winprob_mc.simulate(winprob_mc.row_matchups(rows), n_sims=5000, seed=0)
+    assert result["home_team"] == "Team A" and 0.0 < result["home_win"] < 0.5
+
+
+def test_backtest_scores_replayed_ticks(tmp_path):
+    root = str(tmp_path / "players")
+    rows = [_tick("2025-09-21 13:00:00", 0.0, 0, 0.0, 0),
+            _tick("2025-09-21 15:00:00", 12.0, 60, 6.0, 60),
+            _tick("2025-09-21 17:00:00", 20.0, 100, 9.0, 100)]
+    for r in rows:
+        player_series.record([r], root)
+    scores = tmp_path / "scores.csv"
+    with open(scores, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["timestamp", "week", "home_team", "home_score", "away_team", "away_score"])
+        for r in rows:
+            writer.writerow([r["timestamp"], 3, "Team A", r["home_score"], "Team B", r["away_score"]])
+
+    cal = winprob_mc.backtest(root, str(scores), every_minutes=60, n_sims=2000)
+    assert cal["n"] == 3
+    # the last tick is a finished game: certain and right
+    assert cal["table"][-1][2] >= 1 and cal["brier"] < 0.25
@@ -0,0 +1,168 @@
+# timing.py
+"""
+Per-phase timing spans written as JSON lines.
+
+Every span appends one record to data/metrics/spans.jsonl:
+
+    {"run": "scrapewp_ci-20251005T171502-4242", "script": "scrapewp_ci",
+     "span": "dismiss_consent", "at": "2025-10-05T17:15:09", "ms": 812.4,
+     "ok": true, "attrs": {...}}
+
+configure() names the run and also records a "run" span for the whole
+process at exit. Set METRICS=0 to turn recording off, METRICS_FILE to
+write somewhere else.
+
+Usage:
+    python timing.py [--script scrapewp_ci] [--since 2025-10-01] [--last 20]
+"""
+import os
+import sys
+import json
+import time
+import atexit
+import argparse
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+METRICS_FILE = os.path.join(SCRIPT_DIR, "data", "metrics", "spans.jsonl")
+
+_lock = threading.Lock()
+_state = {"script": None, "run": None, "path": None, "enabled": None, "started": None}
+
+
+def _enabled():
+    if _state["enabled"] is None:
+        _state["enabled"] = os.getenv("METRICS", "1").strip().lower() not in ("0", "false", "no", "off")
+    return _state["enabled"]
+
+
+def configure(script, path=None):
+    """Name this process's run and record its total duration at exit."""
+    _state["script"] = script
+    _state["run"] = f"{script}-{datetime.now().strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+    _state["path"] = path or os.getenv("METRICS_FILE") or METRICS_FILE
+    _state["started"] = time.perf_counter()
+
+    _state["failed"] = False
+    previous_hook = sys.excepthook
+
+    def hook(*exc):
+        _state["failed"] = True
+        previous_hook(*exc)
+
+    def finish():
+        record("run", (time.perf_counter() - _state["started"]) * 1000, ok=not _state["failed"])
+
+    sys.excepthook = hook
+    atexit.register(finish)
+
+
+def record(name, ms, ok=True, error=None, **attrs):
+    if not _enabled():
+        return
+    script = _state["script"] or os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0]
+    rec = {
+        "run": _state["run"] or f"{script}-{os.getpid()}", "script": script, "span": name,
+        "at": datetime.now().isoformat(timespec="seconds"), "ms": round(ms, 2), "ok": ok,
+    }
+    if error:
+        rec["error"] = error
+    if attrs:
+        rec["attrs"] = attrs
+    path = _state["path"] or os.getenv("METRICS_FILE") or METRICS_FILE
+    line = json.dumps(rec, ensure_ascii=False, default=str) + "\n"
+    try:
+        with _lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(line)
+    except OSError as e:
+        print(f"[warn] could not write timing span {name}: {e}")
+
+
+@contextmanager
+def span(name, **attrs):
+    """
+    Time the enclosed block. Yields the attrs dict so the block can add
+    fields it only learns while running (row counts, data-ids, ...).
+    """
+    start = time.perf_counter()
+    try:
+        yield attrs
+    except BaseException as e:
+        record(name, (time.perf_counter() - start) * 1000, ok=False, error=f"{type(e).__name__}: {e}"[:300], **attrs)
+        raise
+    record(name, (time.perf_counter() - start) * 1000, **attrs)
+
+
+# ----------- summary -----------
+def _percentile(sorted_values, q):
+    pos = (len(sorted_values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def load_spans(path=METRICS_FILE, script=None, since=None, last_runs=None):
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue  # torn line from a killed run
+            if script and rec.get("script") != script:
+                continue
+            if since and rec.get("at", "") < since:
+                continue
+            spans.append(rec)
+    if last_runs:
+        runs = []
+        for rec in spans:
+            if rec["run"] not in runs:
+                runs.append(rec["run"])
+        keep = set(runs[-last_runs:])
+        spans = [r for r in spans if r["run"] in keep]
+    return spans
+
+
+def summarize(spans):
+    """[(script, span, count, failures, p50_ms, p95_ms, max_ms)] sorted by script then p95."""
+    groups = {}
+    for rec in spans:
+        groups.setdefault((rec["script"], rec["span"]), []).append(rec)
+    out = []
+    for (script, name), recs in groups.items():
+        ms = sorted(r["ms"] for r in recs)
+        out.append((script, name, len(ms), sum(1 for r in recs if not r.get("ok", True)),
+                    _percentile(ms, 0.50), _percentile(ms, 0.95), ms[-1]))
+    return sorted(out, key=lambda r: (r[0], -r[5]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="p50/p95 per phase from the timing spans")
+    parser.add_argument("--file", default=os.getenv("METRICS_FILE") or METRICS_FILE)
+    parser.add_argument("--script", default=None, help="only spans from this script")
+    parser.add_argument("--since", default=None, help="ISO date/time lower bound")
+    parser.add_argument("--last", type=int, default=None, help="only the last N runs")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.file):
+        print(f"[info] no spans recorded yet ({args.file})")
+        return
+    spans = load_spans(args.file, args.script, args.since, args.last)
+    runs = len({r["run"] for r in spans})
+    print(f"[info] {len(spans)} spans from {runs} runs in {args.file}")
+    current = None
+    for script, name, n, failed, p50, p95, worst in summarize(spans):
+        if script != current:
+            current = script
+            print(f"\n{script}")
+            print(f"  {'span':<28}{'n':>6}{'fail':>6}{'p50 ms':>11}{'p95 ms':>11}{'max ms':>11}")
+        print(f"  {name:<28}{n:>6}{failed:>6}{p50:>11.1f}{p95:>11.1f}{worst:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,358 @@
+# winprob_mc.py
+"""
+Local Monte Carlo win probabilities from live box scores (no browser).
+
+For every starter we take points so far plus the unplayed share of their
+projection, draw the rest of their game from a normal distribution (sized
+by position) and add it up per team. All starters of all matchups are
+simulated in one (sims x players) array per batch, so 100k draws for a
+whole week take milliseconds.
+
+Live runs reuse score_tracker.fetch_matchup_rows() (same week probing and
+response cache as the tracker); its box score rows carry every player's
+slot, points, projection and share of the game played. backtest replays
+the same inputs from the player series week logs at past ticks and
+scores the predictions against the finals in scores.csv.
+
+Usage:
+    python winprob_mc.py [--sims 100000] [--fake]        # live (or fake League) probabilities
+    python winprob_mc.py bench [--sims 100000]           # throughput + calibration report
+    python winprob_mc.py backtest [--every 60] [--week 3]
+"""
+import os
+import csv
+import time
+import argparse
+from datetime import datetime
+
+import numpy as np
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTFILE = os.path.join(SCRIPT_DIR, "mc_winprob.csv")
+CTW_FILE = os.path.join(SCRIPT_DIR, "fantasycast_ctw.csv")
+SCORES_FILE = os.path.join(SCRIPT_DIR, "scores.csv")
+
+# Std dev of a full game as a fraction of the projection, by lineup slot
+SLOT_CV = {"QB": 0.40, "RB": 0.55, "WR": 0.60, "TE": 0.70, "RB/WR/TE": 0.60, "K": 0.50, "D/ST": 0.80}
+DEFAULT_CV = 0.60
+MIN_SIGMA = 1.0
+BENCH_SLOTS = ("BE", "IR")
+
+
+def _num(value):
+    try:
+        v = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return v if np.isfinite(v) else 0.0
+
+
+def lineup_arrays(matchups):
+    """
+    Flatten every starter into arrays. matchups is [(home, away, home
+    players, away players)] with players as (slot, points, projected,
+    played %). Returns (current[team], mu[player], sigma[player],
+    team_of[player], pairs) where team index 2*i is matchup i's home side
+    and 2*i+1 its away side.
+    """
+    current, mu, sigma, team_of, pairs = [], [], [], [], []
+    for i, (home, away, home_players, away_players) in enumerate(matchups):
+        pairs.append((home, away))
+        for side, lineup in ((2 * i, home_players), (2 * i + 1, away_players)):
+            total = 0.0
+            for slot, points, projected, played in lineup:
+                if slot in BENCH_SLOTS:
+                    continue
+                pts, proj = _num(points), _num(projected)
+                remaining = 1.0 - min(max(_num(played), 0.0), 100.0) / 100.0
+                total += pts
+                if remaining <= 0:
+                    continue
+                mu.append(proj * remaining)
+                sigma.append(max(proj * SLOT_CV.get(slot, DEFAULT_CV), MIN_SIGMA) * np.sqrt(remaining))
+                team_of.append(side)
+            current.append(total)
+    return (np.asarray(current, dtype=np.float64), np.asarray(mu, dtype=np.float32),
+            np.asarray(sigma, dtype=np.float32), np.asarray(team_of, dtype=np.intp), pairs)
+
+
+def box_score_matchups(box_scores):
+    """lineup_arrays() input from espn_api (or FakeLeague) BoxScore objects."""
+    def players(lineup):
+        return [(getattr(p, "slot_position", None), getattr(p, "points", 0.0),
+                 getattr(p, "projected_points", 0.0), getattr(p, "game_played", 0)) for p in lineup]
+    return [(b.home_team.team_name, b.away_team.team_name, players(b.home_lineup), players(b.away_lineup))
+            for b in box_scores]
+
+
+def row_matchups(rows):
+    """lineup_arrays() input from fetch_matchup_rows() rows (box score rows carry 'players')."""
+    out = []
+    for r in rows:
+        if not r.get("players"):
+            continue
+        sides = {r["home_team"]: [], r["away_team"]: []}
+        for team, _, _, _, slot, points, *extra in r["players"]:
+            projected, played = (list(extra) + [0.0, 0])[:2]
+            sides.setdefault(team, []).append((slot, points, projected, played))
+        out.append((r["home_team"], r["away_team"], sides[r["home_team"]], sides[r["away_team"]]))
+    return out
+
+
+def simulate(matchups, n_sims=100_000, seed=None, batch=25_000):
+    """
+    Win probabilities for every matchup (see lineup_arrays for the layout).
+    Returns [{"home_team", "away_team", "home_win", "away_win", "home_mean", "away_mean"}].
+    """
+    current, mu, sigma, team_of, pairs = lineup_arrays(matchups)
+    n_teams = len(current)
+    if n_teams == 0:
+        return []
+    rng = np.random.default_rng(seed)
+
+    # players x teams one-hot, so per-team totals are a single matmul per batch
+    onehot = np.zeros((len(mu), n_teams), dtype=np.float32)
+    onehot[np.arange(len(mu)), team_of] = 1.0
+
+    wins = np.zeros(len(pairs), dtype=np.float64)
+    sums = np.zeros(n_teams, dtype=np.float64)
+    done = 0
+    while done < n_sims:
+        n = min(batch, n_sims - done)
+        draws = rng.standard_normal((n, len(mu)), dtype=np.float32) * sigma + mu
+        np.maximum(draws, 0.0, out=draws)
+        totals = draws @ onehot + current.astype(np.float32)
+        home, away = totals[:, 0::2], totals[:, 1::2]
+        wins += (home > away).sum(axis=0) + 0.5 * (home == away).sum(axis=0)
+        sums += totals.sum(axis=0)
+        done += n
+
+    p_home = wins / n_sims
+    means = sums / n_sims
+    return [
+        {"home_team": h, "away_team": a, "home_win": float(p_home[i]), "away_win": float(1 - p_home[i]),
+         "home_mean": round(float(means[2 * i]), 2), "away_mean": round(float(means[2 * i + 1]), 2)}
+        for i, (h, a) in enumerate(pairs)
+    ]
+
+
+def to_ctw_rows(results, ts=None):
+    """Rows in the fantasycast_ctw.csv layout: timestamp, teamA, pctA, teamB, pctB."""
+    ts = ts or datetime.now().isoformat(timespec="seconds")
+    return [[ts, r["home_team"], f"{round(r['home_win'] * 100)}%", r["away_team"], f"{round(r['away_win'] * 100)}%"]
+            for r in results]
+
+
+def append_ctw_rows(rows, outfile=OUTFILE):
+    new_file = not os.path.exists(outfile)
+    with open(outfile, "a", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(["timestamp", "teamA", "pctA", "teamB", "pctB"])
+        writer.writerows(rows)
+
+
+# ----------- benchmark / calibration -----------
+def _parse_ts(value):
+    for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"):
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def final_results(scores_csv=SCORES_FILE):
+    """
+    Final score of every tracked meeting in scores.csv (last row wins).
+    Returns {frozenset(pair): [(first_seen, last_seen, home, home_score, away, away_score), ...]}.
+    """
+    finals = {}
+    with open(scores_csv, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for rec in reader:
+            if len(rec) != 6:
+                continue
+            ts, week, home, hs, away, as_ = rec
+            key = (week, home.strip(), away.strip())
+            entry = finals.setdefault(key, [_parse_ts(ts), _parse_ts(ts), 0.0, 0.0])
+            entry[1], entry[2], entry[3] = _parse_ts(ts), _num(hs), _num(as_)
+    by_pair = {}
+    for (week, home, away), (first, last, hs, as_) in finals.items():
+        by_pair.setdefault(frozenset((home, away)), []).append((first, last, home, hs, away, as_))
+    return by_pair
+
+
+def _meeting(games, ts):
+    """The meeting whose tracked window is closest to ts."""
+    return min(games, key=lambda g: 0 if g[0] <= ts <= g[1] else min(abs((ts - g[0]).total_seconds()),
+                                                                   abs((ts - g[1]).total_seconds())))
+
+
+def score_predictions(preds, buckets=10):
+    """Brier score and reliability table of [(p, outcome)] pairs, or None when empty."""
+    if not preds:
+        return None
+    p = np.array([x[0] for x in preds])
+    y = np.array([x[1] for x in preds])
+    idx = np.minimum((p * buckets).astype(int), buckets - 1)
+    table = []
+    for k in range(buckets):
+        mask = idx == k
+        if mask.any():
+            table.append((k / buckets, (k + 1) / buckets, int(mask.sum()), float(p[mask].mean()), float(y[mask].mean())))
+    return {"n": len(preds), "brier": float(np.mean((p - y) ** 2)), "table": table}
+
+
+def calibration(ctw_csv, finals, buckets=10):
+    """Brier score and reliability table of a CTW-format file against final results."""
+    preds = []
+    with open(ctw_csv, "r", newline="", encoding="utf-8") as f:
+        for r in csv.DictReader(f):
+            ts = _parse_ts(r.get("timestamp") or "")
+            a, b = (r.get("teamA") or "").strip(), (r.get("teamB") or "").strip()
+            pct = (r.get("pctA") or "").strip()
+            games = finals.get(frozenset((a, b)))
+            if ts is None or not games or not pct.endswith("%"):
+                continue
+            first, last, home, hs, away, as_ = _meeting(games, ts)
+            if hs == as_:
+                continue
+            a_won = (hs > as_) if a == home else (as_ > hs)
+            preds.append((float(pct.rstrip("%")) / 100.0, 1.0 if a_won else 0.0))
+    return score_predictions(preds, buckets)
+
+
+def _print_calibration(label, cal):
+    print(f"[info] calibration of {label}: n={cal['n']} brier={cal['brier']:.4f}")
+    for lo, hi, n, mean_p, hit in cal["table"]:
+        print(f"  {lo:4.0%}-{hi:4.0%}  n={n:5d}  predicted={mean_p:5.1%}  observed={hit:5.1%}")
+
+
+def week_finals(scores_csv=SCORES_FILE):
+    """{week: [(home, home_score, away, away_score)]}, the last row of each tracked meeting."""
+    finals = {}
+    with open(scores_csv, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for rec in reader:
+            if len(rec) == 6 and rec[1].strip().isdigit():
+                _, week, home, hs, away, as_ = rec
+                finals[(int(week), home.strip(), away.strip())] = (_num(hs), _num(as_))
+    out = {}
+    for (week, home, away), (hs, as_) in finals.items():
+        out.setdefault(week, []).append((home, hs, away, as_))
+    return out
+
+
+def backtest(series_root=None, scores_csv=SCORES_FILE, every_minutes=60, weeks=None, n_sims=20_000, seed=0):
+    """
+    Re-run the engine at past ticks from the player series week logs (at
+    most one tick per every_minutes per week) and score each home-win
+    probability against that week's final in scores.csv. Ties are skipped.
+    """
+    import player_series
+
+    series_root = series_root or player_series.SERIES_DIR
+    finals = week_finals(scores_csv)
+    preds = []
+    for week in weeks or player_series._log_weeks(series_root):
+        games = [g for g in finals.get(week, []) if g[1] != g[3]]
+        if not games:
+            continue
+        series = player_series.load(series_root, [week])
+        last = None
+        for t in series.week_ticks(week):
+            if last is not None and t - last < every_minutes * 60:
+                continue
+            last = t
+            lineups = series.lineups_at(week, t)
+            played = [g for g in games if g[0] in lineups and g[2] in lineups]
+            matchups = [(home, away, lineups[home], lineups[away]) for home, _, away, _ in played]
+            for r, (_, hs, _, as_) in zip(simulate(matchups, n_sims=n_sims, seed=seed), played):
+                preds.append((r["home_win"], 1.0 if hs > as_ else 0.0))
+    return score_predictions(preds)
+
+
+def bench(n_sims):
+    from fake_league import FakeLeague
+
+    print("[info] throughput (fake 12-team league, 6 matchups)")
+    league = FakeLeague(n_teams=12, seed=1)
+    bs = box_score_matchups(league.box_scores())
+    simulate(bs, n_sims=1000)  # warm-up
+    for sims in (10_000, n_sims):
+        start = time.perf_counter()
+        simulate(bs, n_sims=sims, seed=0)
+        elapsed = time.perf_counter() - start
+        print(f"  {sims:>9,} sims x {len(bs)} matchups: {elapsed * 1000:8.1f} ms "
+              f"({sims * len(bs) / elapsed:,.0f} matchup-draws/s)")
+
+    if not os.path.exists(SCORES_FILE):
+        print("[warn] scores.csv not found; skipping calibration")
+        return
+    finals = final_results(SCORES_FILE)
+    for label, path in (("ESPN Chance to Win", CTW_FILE), ("Monte Carlo", OUTFILE)):
+        if not os.path.exists(path):
+            continue
+        cal = calibration(path, finals)
+        if cal is None:
+            print(f"[info] {label}: no predictions matched a final result")
+            continue
+        _print_calibration(f"{label} ({os.path.basename(path)})", cal)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo win probabilities from box scores")
+    parser.add_argument("cmd", nargs="?", default="run", choices=["run", "bench", "backtest"])
+    parser.add_argument("--sims", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--fake", action="store_true", help="use fake_league.FakeLeague (offline)")
+    parser.add_argument("--no-write", action="store_true", help="don't append to mc_winprob.csv")
+    parser.add_argument("--every", type=float, default=60, help="backtest: minutes between replayed ticks")
+    parser.add_argument("--week", type=int, action="append", default=None, help="backtest: only these weeks")
+    args = parser.parse_args()
+
+    if args.cmd == "bench":
+        bench(args.sims)
+        return
+    if args.cmd == "backtest":
+        start = time.perf_counter()
+        cal = backtest(every_minutes=args.every, weeks=args.week, n_sims=min(args.sims, 20_000),
+                       seed=args.seed or 0)
+        if cal is None:
+            print("[info] backtest: no logged tick matched a tracked final (need data/players and scores.csv)")
+        else:
+            _print_calibration("Monte Carlo backtest", cal)
+            print(f"[info] backtest took {time.perf_counter() - start:.1f}s")
+        return
+
+    from score_tracker import load_config_and_env, get_week_candidates, fetch_matchup_rows
+    if args.fake:
+        from fake_league import FakeLeague
+        league, week_hint = FakeLeague(), None
+    else:
+        from espn_cache import cached_league
+        espn_s2, swid, year, week_hint, _ = load_config_and_env()
+        league = cached_league(31028552, year, espn_s2, swid)
+    rows, week = fetch_matchup_rows(league, get_week_candidates(league, week_hint))
+    matchups = row_matchups(rows)
+    if rows and not matchups:
+        print("[warn] only scoreboard totals available (no lineups); nothing to simulate")
+
+    start = time.perf_counter()
+    results = simulate(matchups, n_sims=args.sims, seed=args.seed)
+    elapsed = time.perf_counter() - start
+    for r in results:
+        print(f"{r['home_team']}: {r['home_win']:.1%} (mean {r['home_mean']})")
+        print(f"{r['away_team']}: {r['away_win']:.1%} (mean {r['away_mean']})")
+        print("-" * 30)
+    print(f"[info] week {week}: {len(results)} matchups x {args.sims:,} sims in {elapsed * 1000:.1f} ms")
+
+    if results and not args.no_write:
+        append_ctw_rows(to_ctw_rows(results))
+
+
+if __name__ == "__main__":
+    main()